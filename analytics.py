@@ -0,0 +1,258 @@
+#Analyses de l'économie en colonnes NumPy : répartition des richesses et des niveaux,
+#valeur des artefacts par rareté et rendement par pioche.
+#
+#Les champs utiles des archéologues et des artefacts sont rangés une fois dans des
+#colonnes (lecture en flux de la base, database.streaming), puis toutes les statistiques
+#sont calculées de façon vectorisée. Utilisé par analyze.py (--export).
+
+import csv
+from array import array
+from dataclasses import dataclass
+from typing import Iterator
+
+try:
+    import numpy as np
+except ImportError:  # dépendance optionnelle
+    np = None
+
+import config
+from database.streaming import read_database_artifact_columns, stream_database
+from utils.loot import get_loot_engine
+
+
+PERCENTILES = (10, 25, 50, 75, 90, 99)
+PLAYER_FIELDS = ("coins", "level", "experience", "excavations", "pickaxe", "artifacts")
+UNKNOWN = -1
+
+
+@dataclass
+class EconomyColumns:
+    """Colonnes de l'économie. Les pioches et les raretés sont des codes qui renvoient
+    aux listes pickaxes et rarities (UNKNOWN : propriétaire ou pioche inconnus)."""
+
+    players: dict
+    artifacts: dict
+    stacks: dict
+    pickaxes: list
+    rarities: list
+
+
+class ColumnBuilder:
+    """Range les archéologues d'un parcours de la base (événements de stream_database)
+    dans des colonnes, à compléter par les colonnes d'artefacts avec build()."""
+
+    def __init__(self):
+        self.pickaxes = list(config.PICKAXES)
+        self._pickaxe_codes = {pickaxe: code for code, pickaxe in enumerate(self.pickaxes)}
+        self._players = {name: array("q") for name in PLAYER_FIELDS}
+        self._stacks = {"rarity": [], "count": array("q"), "value": array("q"), "pickaxe": array("b")}
+        self._pickaxe_of = {}
+
+    def _pickaxe_code(self, pickaxe: str) -> int:
+        code = self._pickaxe_codes.get(pickaxe)
+        if code is None:
+            code = self._pickaxe_codes[pickaxe] = len(self.pickaxes)
+            self.pickaxes.append(pickaxe)
+        return code
+
+    def add(self, record: dict, artifact_count: int):
+        """Prend en compte un archéologue."""
+        players = self._players
+        pickaxe = self._pickaxe_code(record.get("pickaxe", "basic"))
+        players["coins"].append(record.get("coins", 0))
+        players["level"].append(record.get("level", 1))
+        players["experience"].append(record.get("experience", 0))
+        players["excavations"].append(record.get("total_excavations", 0))
+        players["pickaxe"].append(pickaxe)
+        players["artifacts"].append(artifact_count)
+        self._pickaxe_of[str(record["user_id"])] = pickaxe
+
+        stacks = self._stacks
+        for key, (count, total_value) in record.get("stacks", {}).items():
+            stacks["rarity"].append(key.split("|", 1)[0])
+            stacks["count"].append(count)
+            stacks["value"].append(total_value)
+            stacks["pickaxe"].append(pickaxe)
+
+    def build(self, artifact_columns: dict) -> EconomyColumns:
+        """Colonnes NumPy, artefacts compris (read_artifact_columns)."""
+        rarities = list(artifact_columns["rarities"])
+        rarity_codes = {rarity: code for code, rarity in enumerate(rarities)}
+        for rarity in self._stacks["rarity"]:
+            if rarity not in rarity_codes:
+                rarity_codes[rarity] = len(rarities)
+                rarities.append(rarity)
+
+        # Pioche actuelle du propriétaire de chaque artefact
+        owner_pickaxe = np.array(
+            [self._pickaxe_of.get(owner, UNKNOWN) for owner in artifact_columns["owners"]],
+            dtype=np.int8,
+        )
+        owner = np.frombuffer(artifact_columns["owner"], dtype=np.int32)
+        artifacts = {
+            "rarity": np.frombuffer(artifact_columns["rarity"], dtype=np.int16),
+            "value": np.frombuffer(artifact_columns["value"], dtype=np.int32).astype(np.int64),
+            "pickaxe": owner_pickaxe[owner] if len(owner) else np.zeros(0, dtype=np.int8),
+        }
+        stacks = {
+            "rarity": np.array([rarity_codes[rarity] for rarity in self._stacks["rarity"]], dtype=np.int16),
+            "count": np.frombuffer(self._stacks["count"], dtype=np.int64),
+            "value": np.frombuffer(self._stacks["value"], dtype=np.int64),
+            "pickaxe": np.frombuffer(self._stacks["pickaxe"], dtype=np.int8),
+        }
+        players = {name: np.frombuffer(column, dtype=np.int64) for name, column in self._players.items()}
+        return EconomyColumns(players, artifacts, stacks, list(self.pickaxes), rarities)
+
+
+def load_columns() -> EconomyColumns:
+    """Lit la base configurée en colonnes (un parcours des archéologues, un des artefacts)."""
+    builder = ColumnBuilder()
+    for event in stream_database():
+        if event[0] == "archaeologist":
+            builder.add(event[1], event[2])
+    return builder.build(read_database_artifact_columns())
+
+
+def gini(values) -> float:
+    """Coefficient de Gini (0 : égalité parfaite, 1 : tout chez un seul joueur)."""
+    values = np.sort(np.asarray(values, dtype=np.float64))
+    total = values.sum()
+    if len(values) == 0 or total <= 0:
+        return 0.0
+    ranks = np.arange(1, len(values) + 1)
+    return float(2 * (ranks * values).sum() / (len(values) * total) - (len(values) + 1) / len(values))
+
+
+def top_share(values, fraction: float) -> float:
+    """Part du total détenue par la fraction la plus riche des joueurs (au moins un)."""
+    values = np.asarray(values)
+    total = values.sum()
+    if len(values) == 0 or total <= 0:
+        return 0.0
+    count = max(1, int(np.ceil(len(values) * fraction)))
+    return float(np.partition(values, len(values) - count)[len(values) - count:].sum() / total)
+
+
+def distribution(values) -> dict:
+    """Moyenne, centiles (PERCENTILES) et extrêmes d'une colonne."""
+    if len(values) == 0:
+        return {}
+    result = {"mean": round(float(values.mean()), 2), "min": round(values.min().item(), 2)}
+    for percentile, value in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+        result[f"p{percentile}"] = round(float(value), 2)
+    result["max"] = round(values.max().item(), 2)
+    return result
+
+
+def expected_value_per_dig(pickaxe: str) -> float:
+    """Espérance de gain d'une fouille selon la table de butin de la pioche."""
+    table = get_loot_engine().table(pickaxe)
+    total_weight = sum(table.weights)
+    return sum(
+        weight / total_weight * (low + (span - 1) / 2)
+        for weight, (low, span) in zip(table.weights, table.rewards)
+    )
+
+
+def rarity_report(columns: EconomyColumns) -> dict:
+    """Valeur des artefacts détenus par rareté. Les artefacts d'une pile comptent chacun
+    pour la valeur moyenne de la pile."""
+    artifacts, stacks = columns.artifacts, columns.stacks
+    stacked = stacks["count"] > 0
+    unit_values = np.repeat(stacks["value"][stacked] / stacks["count"][stacked], stacks["count"][stacked])
+    unit_rarities = np.repeat(stacks["rarity"][stacked], stacks["count"][stacked])
+    values = np.concatenate([artifacts["value"].astype(np.float64), unit_values])
+    rarities = np.concatenate([artifacts["rarity"], unit_rarities])
+
+    report = {}
+    for code, rarity in enumerate(columns.rarities):
+        selected = values[rarities == code]
+        if len(selected) == 0:
+            continue
+        total = artifacts["value"][artifacts["rarity"] == code].sum() + stacks["value"][stacks["rarity"] == code].sum()
+        report[rarity] = {"count": len(selected), "total_value": int(total), **distribution(selected)}
+    return report
+
+
+def pickaxe_report(columns: EconomyColumns) -> dict:
+    """Rendement par pioche actuelle : richesse des joueurs rapportée à leurs fouilles,
+    à comparer à l'espérance des tables de butin. Les artefacts vendus n'y figurent plus
+    que par les pièces de leur vente."""
+    players, artifacts, stacks = columns.players, columns.artifacts, columns.stacks
+    count = len(columns.pickaxes)
+
+    def by_pickaxe(pickaxe, weights=None):
+        known = pickaxe != UNKNOWN
+        return np.bincount(
+            pickaxe[known], weights=None if weights is None else weights[known], minlength=count
+        )
+
+    holders = by_pickaxe(players["pickaxe"])
+    coins = by_pickaxe(players["pickaxe"], players["coins"])
+    excavations = by_pickaxe(players["pickaxe"], players["excavations"])
+    held = by_pickaxe(players["pickaxe"], players["artifacts"])
+    held_value = by_pickaxe(artifacts["pickaxe"], artifacts["value"]) + by_pickaxe(stacks["pickaxe"], stacks["value"])
+
+    report = {}
+    for code, pickaxe in enumerate(columns.pickaxes):
+        if not holders[code]:
+            continue
+        report[pickaxe] = {
+            "players": int(holders[code]),
+            "mean_coins": round(float(coins[code] / holders[code]), 2),
+            "median_coins": float(np.median(players["coins"][players["pickaxe"] == code])),
+            "excavations": int(excavations[code]),
+            "held_artifacts": int(held[code]),
+            "held_value": int(held_value[code]),
+            "held_value_per_excavation": (
+                round(float(held_value[code] / excavations[code]), 2) if excavations[code] else None
+            ),
+            "wealth_per_excavation": (
+                round(float((coins[code] + held_value[code]) / excavations[code]), 2) if excavations[code] else None
+            ),
+            "expected_value_per_dig": round(expected_value_per_dig(pickaxe), 2),
+        }
+    return report
+
+
+def economy_report(columns: EconomyColumns) -> dict:
+    """Rapport complet : pièces, niveaux, raretés et pioches."""
+    players = columns.players
+    coins = players["coins"]
+    return {
+        "players": len(coins),
+        "coins": {
+            "total": int(coins.sum()),
+            **distribution(coins),
+            "gini": round(gini(coins), 4),
+            "top_1_percent_share": round(top_share(coins, 0.01), 4),
+            "top_10_percent_share": round(top_share(coins, 0.10), 4),
+        },
+        "levels": distribution(players["level"]),
+        "excavations": distribution(players["excavations"]),
+        "rarities": rarity_report(columns),
+        "pickaxes": pickaxe_report(columns),
+    }
+
+
+def flatten(report: dict) -> Iterator[tuple]:
+    """Lignes (section, groupe, mesure, valeur) d'un rapport, pour l'export CSV. Les valeurs
+    de premier niveau vont dans la section "summary"."""
+    for section, content in report.items():
+        if not isinstance(content, dict):
+            yield "summary", "", section, content
+            continue
+        for key, value in content.items():
+            if isinstance(value, dict):
+                for metric, item in value.items():
+                    yield section, key, metric, item
+            else:
+                yield section, "", key, value
+
+
+def write_csv(report: dict, output_file: str):
+    """Écrit un rapport en CSV : une mesure par ligne."""
+    with open(output_file, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(("section", "group", "metric", "value"))
+        writer.writerows(flatten(report))
@@ -1,116 +1,233 @@
+import argparse
+import heapq
 import json
-from pathlib import Path
 from datetime import datetime
 from collections import defaultdict
 
+import analytics
 import config
-from database import DatabaseManager
+from database.counters import summarize
+from database.streaming import read_database_artifact_columns, read_database_counters, stream_database
 
 
-def analyze_statistics():
-    """Affiche des statistiques sur la base de données."""
-    db = DatabaseManager()
-    
+class Statistics:
+    """Statistiques accumulées en une seule passe sur la base, en mémoire bornée."""
+
+    def __init__(self, top_size: int = 5, recent_size: int = 3, leaderboard_size: int = 50):
+        self.archaeologists = 0
+        self.total_excavations = 0
+        self.total_artifacts = 0
+        self.total_coins = 0
+        self.total_levels = 0
+        self.level_count = defaultdict(int)
+        self.rarity_count = defaultdict(int)
+        # Tas bornés : le plus petit élément retenu est en tête et cède sa place au besoin
+        self._sizes = {"top": top_size, "recent": recent_size, "leaderboard": leaderboard_size}
+        self._heaps = {"top": [], "recent": [], "leaderboard": []}
+        self._sequence = 0
+        # Vrai si la base a été parcourue (classements et activité récente calculés)
+        self.scanned = False
+
+    def _keep(self, heap: str, key: tuple, row: tuple):
+        # Le numéro d'arrivée départage les ex æquo (premier arrivé, premier classé)
+        entry = (key, -self._sequence, row)
+        entries = self._heaps[heap]
+        if len(entries) < self._sizes[heap]:
+            heapq.heappush(entries, entry)
+        elif entry > entries[0]:
+            heapq.heapreplace(entries, entry)
+
+    def _sorted(self, heap: str) -> list:
+        return [row for _, _, row in sorted(self._heaps[heap], reverse=True)]
+
+    def use_counters(self, counters: dict):
+        """Remplace les totaux par les compteurs globaux de la base."""
+        summary = summarize(counters)
+        self.archaeologists = summary["archaeologists"]
+        self.total_excavations = summary["excavations"]
+        self.total_coins = summary["coins"]
+        self.total_artifacts = summary["total_artifacts"]
+        self.total_levels = sum(level * count for level, count in summary["levels"].items())
+        self.level_count = defaultdict(int, summary["levels"])
+        self.rarity_count = defaultdict(int, summary["artifacts"])
+
+    def add(self, record: dict, artifact_count: int):
+        """Prend en compte un archéologue."""
+        level = record.get("level", 1)
+        experience = record.get("experience", 0)
+        coins = record.get("coins", 0)
+        username = record["username"]
+
+        self._sequence += 1
+        self.archaeologists += 1
+        self.total_excavations += record.get("total_excavations", 0)
+        self.total_artifacts += artifact_count
+        self.total_coins += coins
+        self.total_levels += level
+        self.level_count[level] += 1
+
+        self._keep("top", (level, experience), (username, level, experience, artifact_count))
+        self._keep("recent", (record["joined_at"],), (username, record["joined_at"]))
+        self._keep("leaderboard", (level, experience, coins), (username, level, experience, coins, artifact_count))
+
+    @property
+    def top(self) -> list:
+        return self._sorted("top")
+
+    @property
+    def recent(self) -> list:
+        return self._sorted("recent")
+
+    @property
+    def leaderboard(self) -> list:
+        return self._sorted("leaderboard")
+
+
+def collect_statistics(scan: bool = True, columns: analytics.ColumnBuilder = None, **sizes) -> Statistics:
+    """Rassemble les statistiques : les totaux viennent des compteurs globaux de la base
+    (lus instantanément) ; les classements demandent un parcours en flux de la base.
+    Sans compteurs (base ancienne), tout est calculé pendant le parcours.
+    Un ColumnBuilder reçoit aussi les archéologues du parcours (analyses en colonnes)."""
+    stats = Statistics(**sizes)
+    counters = read_database_counters()
+    if scan or counters is None or columns is not None:
+        stats.scanned = True
+        for event in stream_database():
+            if event[0] == "archaeologist":
+                stats.add(event[1], event[2])
+                if columns is not None:
+                    columns.add(event[1], event[2])
+            else:
+                stats.rarity_count[event[1]] += event[2]
+    if counters is not None:
+        stats.use_counters(counters)
+    return stats
+
+
+def verify_counters(rebuild: bool = False):
+    """Vérifie (ou recalcule) les compteurs globaux en chargeant la base."""
+    from database import get_database
+
+    db = get_database()
+    differences = db.rebuild_counters() if rebuild else db.verify_counters()
+    db.close()
+
+    if not differences:
+        print("Compteurs globaux corrects.")
+        return
+    print("Compteurs recalculés :" if rebuild else "Compteurs incorrects :")
+    for name, (stored, actual) in differences.items():
+        print(f"  {name:24} enregistré {stored:>12,}  réel {actual:>12,}")
+
+
+def analyze_statistics(scan: bool = True):
+    """Affiche des statistiques sur la base de données.
+    scan=False se limite aux compteurs globaux (sans top 5 ni activité récente), sauf
+    si la base n'a pas de compteurs : elle est alors parcourue quand même."""
+    stats = collect_statistics(scan)
+
     print("\n" + "="*60)
     print("STATISTIQUES ARCHEOLOBOT")
     print("="*60)
-    
-    # Récupère les données
-    archaeologists = db.get_all_archaeologists()
-    
-    if not archaeologists:
+
+    if not stats.archaeologists:
         print("\nAucune donnée pour le moment.")
         print("="*60 + "\n")
         return
-    
+
     # Statistiques globales
     print("\nSTATISTIQUES GLOBALES")
     print("-" * 60)
-    print(f"Nombre d'archéologues: {len(archaeologists)}")
-    
-    total_excavations = sum(a.total_excavations for a in archaeologists)
-    print(f"Fouilles totales: {total_excavations}")
-    
-    total_artifacts = sum(len(a.artifacts) for a in archaeologists)
-    print(f"Artefacts découverts: {total_artifacts}")
-    
-    total_coins = sum(a.coins for a in archaeologists)
-    print(f"Pièces totales en circulation: 💰 {total_coins:,}")
-    
-    avg_level = sum(a.level for a in archaeologists) / len(archaeologists)
-    print(f"Niveau moyen: {avg_level:.1f}")
-    
+    print(f"Nombre d'archéologues: {stats.archaeologists}")
+    print(f"Fouilles totales: {stats.total_excavations}")
+    print(f"Artefacts découverts: {stats.total_artifacts}")
+    print(f"Pièces totales en circulation: 💰 {stats.total_coins:,}")
+    print(f"Niveau moyen: {stats.total_levels / stats.archaeologists:.1f}")
+
     # Top 5
     print("\nTOP 5 ARCHÉOLOGUES")
     print("-" * 60)
-    sorted_arch = sorted(archaeologists, key=lambda a: (a.level, a.experience), reverse=True)
-    for idx, arch in enumerate(sorted_arch[:5], 1):
+    if not stats.scanned:
+        print("  (non calculé)")
+    for idx, (username, level, experience, artifact_count) in enumerate(stats.top, 1):
         medal = ["🥇", "🥈", "🥉", "4️⃣", "5️⃣"][idx-1]
-        print(f"{medal} {arch.username:20} | Niv {arch.level:2} | {arch.experience:4} XP | {len(arch.artifacts)} artefacts")
-    
+        print(f"{medal} {username:20} | Niv {level:2} | {experience:4} XP | {artifact_count} artefacts")
+
     # Statistiques par rareté
     print("\nARTEFACTS PAR RARETÉ")
     print("-" * 60)
-    rarity_count = defaultdict(int)
-    for arch in archaeologists:
-        for artifact_id in arch.artifacts:
-            artifact = db.get_artifact(artifact_id)
-            if artifact:
-                rarity_count[artifact.rarity] += 1
-    
     for rarity in config.RARITY_LEVELS:
-        count = rarity_count[rarity]
+        count = stats.rarity_count[rarity]
         if count > 0:
             print(f"  {rarity.capitalize():12} {count:3} artefacts")
-    
+
     # Archéologues par niveau
     print("\nDISTRIBUTION DES NIVEAUX")
     print("-" * 60)
-    level_count = defaultdict(int)
-    for arch in archaeologists:
-        level_count[arch.level] += 1
-    
-    for level in sorted(level_count.keys()):
-        count = level_count[level]
-        bar = "█" * count
+    largest = max(stats.level_count.values())
+    for level in sorted(stats.level_count.keys()):
+        count = stats.level_count[level]
+        # Barres à l'échelle : au plus 40 caractères quel que soit le nombre de joueurs
+        bar = "█" * max(1, count * 40 // largest)
         print(f"  Niveau {level:2}: {bar} ({count})")
-    
+
     # Activité
     print("\nACTIVITÉ RÉCENTE")
     print("-" * 60)
-    recent = sorted(
-        archaeologists,
-        key=lambda a: a.joined_at,
-        reverse=True
-    )[:3]
-    
-    for arch in recent:
-        join_date = datetime.fromisoformat(arch.joined_at)
-        print(f"  • {arch.username:20} inscrit le {join_date.strftime('%Y-%m-%d')}")
-    
+    if not stats.scanned:
+        print("  (non calculé)")
+    for username, joined_at in stats.recent:
+        join_date = datetime.fromisoformat(joined_at)
+        print(f"  • {username:20} inscrit le {join_date.strftime('%Y-%m-%d')}")
+
     print("\n" + "="*60 + "\n")
 
 
-def export_statistics(output_file: str = "statistics.json"):
-    """Exporte les statistiques en JSON."""
-    db = DatabaseManager()
-    archaeologists = db.get_all_archaeologists()
-    
+def export_statistics(output_file: str = "statistics.json", fmt: str = None):
+    """Exporte les statistiques en JSON ou en CSV (d'après l'extension par défaut), avec
+    le rapport économique en colonnes NumPy (analytics) si numpy est installé."""
+    fmt = fmt or ("csv" if output_file.lower().endswith(".csv") else "json")
+    columns = analytics.ColumnBuilder() if analytics.np is not None else None
+    stats = collect_statistics(columns=columns)
+
     data = {
         "timestamp": datetime.now().isoformat(),
-        "total_archaeologists": len(archaeologists),
-        "total_excavations": sum(a.total_excavations for a in archaeologists),
-        "total_artifacts": sum(len(a.artifacts) for a in archaeologists),
-        "leaderboard": db.get_leaderboard(limit=50),
+        "total_archaeologists": stats.archaeologists,
+        "total_excavations": stats.total_excavations,
+        "total_artifacts": stats.total_artifacts,
+        "total_coins": stats.total_coins,
     }
-    
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-    
+    economy = {}
+    if columns is not None:
+        economy = analytics.economy_report(columns.build(read_database_artifact_columns()))
+    else:
+        print("numpy n'est pas installé : rapport économique omis")
+
+    if fmt == "csv":
+        # Une mesure par ligne : le classement n'y figure pas
+        analytics.write_csv({**data, **economy}, output_file)
+    else:
+        data["leaderboard"] = stats.leaderboard
+        if economy:
+            data["economy"] = economy
+        with open(output_file, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
     print(f"Statistiques exportées dans {output_file}")
 
 
 if __name__ == "__main__":
-    analyze_statistics()
-    # Décommenter pour exporter:
-    # export_statistics()
+    parser = argparse.ArgumentParser(description="Statistiques Archeolobot")
+    parser.add_argument("--quick", action="store_true", help="Compteurs globaux seulement (sans parcours)")
+    parser.add_argument("--export", metavar="FICHIER", help="Exporte les statistiques (JSON ou CSV)")
+    parser.add_argument("--format", choices=("json", "csv"), help="Format d'export (par défaut : extension du fichier)")
+    parser.add_argument("--verify-counters", action="store_true", help="Vérifie les compteurs globaux")
+    parser.add_argument("--rebuild-counters", action="store_true", help="Recalcule les compteurs globaux")
+    args = parser.parse_args()
+
+    if args.verify_counters or args.rebuild_counters:
+        verify_counters(rebuild=args.rebuild_counters)
+    elif args.export:
+        export_statistics(args.export, args.format)
+    else:
+        analyze_statistics(scan=not args.quick)
@@ -0,0 +1 @@
+#Outils de mesure de performance du stockage.
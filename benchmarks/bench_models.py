@@ -0,0 +1,139 @@
+#Compare les modèles à __slots__ avec les anciennes dataclasses (asdict / cls(**data)),
+#et les collections d'artefacts en array('q') avec les anciennes listes d'UUID.
+#
+#Usage: python -m benchmarks.bench_models [--count N] [--artifacts-per-player N]
+
+import argparse
+import json
+import random
+import time
+import tracemalloc
+import uuid
+from dataclasses import dataclass, asdict, field
+from datetime import datetime
+
+from database.models import Archaeologist, Artifact, OwnedArtifacts
+from benchmarks.synthetic import generate_database
+
+
+@dataclass
+class LegacyArtifact:
+    name: str
+    rarity: str
+    description: str
+    value: int
+    discovered_by: str
+    discovered_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    artifact_id: str = ""
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LegacyArtifact":
+        return cls(**data)
+
+
+@dataclass
+class LegacyArchaeologist:
+    user_id: str
+    username: str
+    level: int = 1
+    experience: int = 0
+    coins: int = 0
+    artifacts: list[str] = field(default_factory=list)
+    total_excavations: int = 0
+    pickaxe: str = "basic"
+    joined_at: str = field(default_factory=lambda: datetime.now().isoformat())
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LegacyArchaeologist":
+        # Copie de la liste comme le faisait DatabaseManager pour ne pas la partager.
+        return cls(**{**data, "artifacts": list(data.get("artifacts", []))})
+
+
+def measure(label: str, model, records: list):
+    #Mesure la mémoire propre à chaque objet (hors liste d'artefacts) puis les temps
+    #de désérialisation/sérialisation sur les vrais enregistrements.
+    bare = [{**record, "artifacts": []} if "artifacts" in record else record for record in records]
+    tracemalloc.start()
+    objects = [model.from_dict(record) for record in bare]
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+
+    started = time.perf_counter()
+    objects = [model.from_dict(record) for record in records]
+    load_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for obj in objects:
+        obj.to_dict()
+    dump_time = time.perf_counter() - started
+
+    count = len(records)
+    print(
+        f"{label:22} {memory / count:9.0f} o/objet "
+        f"{1e6 * load_time / count:9.2f} µs from_dict "
+        f"{1e6 * dump_time / count:9.2f} µs to_dict"
+    )
+
+
+def measure_ownership(archaeologists: list):
+    #Mémoire, taille JSON et coût du test d'appartenance fait à chaque fouille (un ID
+    #neuf, donc absent) : liste d'UUID contre array('q').
+    rng = random.Random(0)
+    owned_ids = [a["artifacts"] for a in archaeologists]
+    total = sum(len(ids) for ids in owned_ids) or 1
+
+    def uuid_lists():
+        return [[str(uuid.UUID(int=rng.getrandbits(128), version=4)) for _ in ids] for ids in owned_ids]
+
+    def arrays():
+        return [OwnedArtifacts(map(int, ids)) for ids in owned_ids]
+
+    for label, build, fresh_id in (
+        ("Collection (UUID list)", uuid_lists, lambda owned: str(uuid.uuid4())),
+        ("Collection (array)", arrays, lambda owned: owned.to_array()[-1] + 1 if len(owned) else 1),
+    ):
+        tracemalloc.start()
+        collections = build()
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        encoded = sum(len(json.dumps(list(owned))) for owned in collections)
+        probes = [(owned, fresh_id(owned)) for owned in collections]
+        started = time.perf_counter()
+        for owned, new_id in probes:
+            new_id in owned
+        membership = time.perf_counter() - started
+
+        print(
+            f"{label:22} {memory / total:9.1f} o/artefact "
+            f"{encoded / total:7.1f} o JSON/artefact "
+            f"{1e9 * membership / len(probes):9.0f} ns test d'un nouvel ID"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des modèles et collections d'artefacts")
+    parser.add_argument("--count", type=int, default=100_000, help="Nombre d'archéologues")
+    parser.add_argument("--artifacts-per-player", type=int, default=20)
+    args = parser.parse_args()
+
+    data = generate_database(args.count, args.count * args.artifacts_per_player)
+    archaeologists = list(data["archaeologists"].values())
+    artifacts = list(data["artifacts"].values())
+
+    measure("Archaeologist (legacy)", LegacyArchaeologist, archaeologists)
+    measure("Archaeologist (slots)", Archaeologist, archaeologists)
+    measure("Artifact (legacy)", LegacyArtifact, artifacts)
+    measure("Artifact (slots)", Artifact, artifacts)
+    measure_ownership(archaeologists)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#Compare les formats de snapshot (vitesse de sauvegarde/chargement et taille du fichier),
+#avec les artefacts en enregistrements complets ou en table de colonnes.
+#
+#Usage: python -m benchmarks.bench_serializers [--archaeologists N] [--artifacts N] [--layout L]
+#La taille par défaut (100k archéologues, 10M artefacts) demande plusieurs Go de RAM ;
+#--scale 0.01 donne un aperçu rapide.
+
+import argparse
+import os
+import tempfile
+import time
+
+from database.artifact_table import ArtifactTable
+from database.serializers import get_serializer, load_any
+from benchmarks.synthetic import generate_database
+
+
+FORMATS = [
+    ("json", "none"),
+    ("json-compact", "none"),
+    ("msgpack", "none"),
+    ("json-compact", "gzip"),
+    ("json-compact", "zstd"),
+    ("msgpack", "gzip"),
+    ("msgpack", "zstd"),
+]
+
+
+def bench(data: dict, directory: str, reference_size=None):
+    #Mesure chaque format disponible et affiche un tableau comparatif.
+    #Retourne la taille de référence (premier format) pour comparer les dispositions.
+    print(f"{'format':22} {'sauvegarde':>11} {'chargement':>11} {'taille':>12} {'ratio':>7}")
+
+    for name, compression in FORMATS:
+        try:
+            serializer = get_serializer(name, compression)
+        except ValueError as e:
+            print(f"{name + '+' + compression:22} ignoré ({e})")
+            continue
+
+        path = os.path.join(directory, f"snapshot.{serializer.name}")
+
+        started = time.perf_counter()
+        payload = serializer.dumps(data)
+        with open(path, "wb") as f:
+            f.write(payload)
+        save_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        with open(path, "rb") as f:
+            loaded = load_any(f.read())
+        if ArtifactTable.is_snapshot(loaded["artifacts"]):
+            loaded["artifacts"] = ArtifactTable.from_snapshot(loaded["artifacts"])
+        load_time = time.perf_counter() - started
+
+        assert len(loaded["artifacts"]) == len(data["artifacts"])
+        size = os.path.getsize(path)
+        reference_size = reference_size or size
+        os.remove(path)
+
+        print(
+            f"{serializer.name:22} {save_time:10.2f}s {load_time:10.2f}s "
+            f"{size / 1e6:10.1f}MB {size / reference_size:6.2f}x"
+        )
+    return reference_size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des formats de snapshot")
+    parser.add_argument("--archaeologists", type=int, default=100_000)
+    parser.add_argument("--artifacts", type=int, default=10_000_000)
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplie les deux tailles")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--layout", choices=["records", "columns", "both"], default="both")
+    args = parser.parse_args()
+
+    archaeologists = max(1, int(args.archaeologists * args.scale))
+    artifacts = int(args.artifacts * args.scale)
+    print(f"Génération: {archaeologists} archéologues, {artifacts} artefacts...")
+    data = generate_database(archaeologists, artifacts, args.seed)
+
+    with tempfile.TemporaryDirectory() as directory:
+        reference_size = None
+        if args.layout in ("records", "both"):
+            print("\nArtefacts en enregistrements")
+            reference_size = bench(data, directory)
+        if args.layout in ("columns", "both"):
+            print("\nArtefacts en colonnes")
+            data["artifacts"] = ArtifactTable.from_records(
+                (int(artifact_id), record) for artifact_id, record in data["artifacts"].items()
+            )
+            bench(data, directory, reference_size)
+
+
+if __name__ == "__main__":
+    main()
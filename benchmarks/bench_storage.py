@@ -0,0 +1,341 @@
+#Benchmark des backends de stockage à plusieurs échelles (nombre d'archéologues).
+#Pour chaque backend et chaque échelle : latence p50/p99 et débit de chaque méthode
+#publique et d'une charge mixte de commandes, RSS maximal et octets écrits.
+#
+#Usage: python -m benchmarks.bench_storage [--backends json journal sqlite]
+#       [--scales 10000 100000 1000000] [--ops N] [--durability always|interval|os]
+#       [--output results.json] [--compare base.json]
+#Les bases synthétiques sont générées une fois (graine fixe) puis réutilisées depuis
+#--workdir : deux commits mesurés avec les mêmes paramètres lisent les mêmes données.
+#Chaque mesure tourne dans un processus neuf, pour que le RSS maximal lui soit propre.
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import config
+from database.artifact_table import ArtifactTable
+from database.db_manager import DatabaseManager
+from database.durability import DURABILITY_MODES
+from database.serializers import get_serializer
+from database.sqlite_manager import SQLiteDatabaseManager
+from utils.helpers import (
+    generate_excavation_rewards,
+    get_random_artifact_description,
+    get_random_artifact_name,
+)
+from utils.loot import get_loot_engine
+from benchmarks.synthetic import generate_database, synthetic_user_ids
+
+
+BACKENDS = ("json", "journal", "sqlite")
+SCALES = (10_000, 100_000, 1_000_000)
+
+# Charge mixte : fréquence relative de chaque commande du bot.
+MIXED_WORKLOAD = {
+    "excavate": 45,
+    "profile": 15,
+    "collection": 10,
+    "leaderboard": 10,
+    "sell_single": 8,
+    "sell_rarity": 4,
+    "buy_pickaxe": 3,
+    "rank": 5,
+}
+
+
+# ===== Mesures système =====
+
+def bytes_written() -> int:
+    #Octets passés aux appels write du processus (threads de compaction compris).
+    try:
+        with open("/proc/self/io") as f:
+            for line in f:
+                if line.startswith("wchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def peak_rss_mb() -> float:
+    #RSS maximal du processus, en Mo (ru_maxrss est en Ko sous Linux, en octets sous macOS).
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if platform.system() == "Darwin" else peak / 1024
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "inconnu"
+
+
+def summarize(latencies_ns: list, elapsed: float) -> dict:
+    #p50 / p99 (en µs) et débit d'une série d'appels.
+    latencies_ns = sorted(latencies_ns)
+    count = len(latencies_ns)
+    if not count:
+        return {"ops": 0, "p50_us": 0.0, "p99_us": 0.0, "ops_per_s": 0.0}
+    return {
+        "ops": count,
+        "p50_us": latencies_ns[count // 2] / 1000,
+        "p99_us": latencies_ns[min(count - 1, int(count * 0.99))] / 1000,
+        "ops_per_s": count / elapsed if elapsed else 0.0,
+    }
+
+
+# ===== Préparation des bases =====
+
+def snapshot_path(workdir: str, players: int, artifacts_per_player: int, seed: int) -> str:
+    return os.path.join(workdir, f"synthetic-{players}-{artifacts_per_player}-{seed}.json")
+
+
+def prepare_snapshot(path: str, players: int, artifacts_per_player: int, seed: int) -> str:
+    #Génère (une seule fois) le snapshot synthétique d'une échelle.
+    if not os.path.exists(path):
+        data = generate_database(players, players * artifacts_per_player, seed)
+        data["artifacts"] = ArtifactTable.from_records(
+            (int(artifact_id), record) for artifact_id, record in data["artifacts"].items()
+        )
+        payload = get_serializer("json-compact").dumps(data)
+        with open(f"{path}.tmp", "wb") as f:
+            f.write(payload)
+        os.replace(f"{path}.tmp", path)
+    return path
+
+
+def open_backend(backend: str, snapshot: str, directory: str, serializer, durability: str):
+    #Ouvre une copie fraîche du snapshot avec le backend demandé.
+    if backend == "sqlite":
+        manager = SQLiteDatabaseManager(os.path.join(directory, "database.sqlite3"), durability=durability)
+        manager.migrate_from_json(snapshot)
+        return manager
+
+    db_path = os.path.join(directory, "database.json")
+    shutil.copyfile(snapshot, db_path)
+    if backend == "journal":
+        return DatabaseManager(
+            db_path,
+            journal_path=os.path.join(directory, "database.journal"),
+            serializer=serializer,
+            durability=durability,
+        )
+    return DatabaseManager(db_path, serializer=serializer, durability=durability)
+
+
+# ===== Opérations mesurées =====
+
+def random_finds(pickaxe: str, count: int = 1) -> list:
+    return [
+        (get_random_artifact_name(), rarity, get_random_artifact_description(), coins)
+        for coins, rarity in generate_excavation_rewards(pickaxe, count)
+    ]
+
+
+def owned_name(db, user_id: str):
+    #Nom d'un artefact possédé (préparation hors chronométrage), ou None.
+    artifacts = db.get_archaeologist_artifacts(user_id)
+    return artifacts[0].name if artifacts else None
+
+
+def excavate(db, user_id: str):
+    #Séquence de la commande /excavate : une transaction lecture + trouvaille + sauvegarde.
+    with db.transaction("excavate"):
+        archaeologist = db.get_archaeologist(user_id)
+        db.add_finds(archaeologist, random_finds(archaeologist.pickaxe))
+        archaeologist.add_experience(random.randint(config.EXCAVATION_XP_MIN, config.EXCAVATION_XP_MAX))
+        archaeologist.total_excavations += 1
+        db.save_archaeologist(archaeologist)
+
+
+def build_operations(db, user_ids: list, rng: random.Random) -> tuple[dict, dict]:
+    #Chaque opération : (préparation hors chrono -> arguments, appel chronométré).
+    pickaxes = list(config.PICKAXES)
+    rarities = list(config.RARITY_LEVELS)
+
+    def user():
+        return rng.choice(user_ids)
+
+    def sell_single_args():
+        user_id = user()
+        return user_id, owned_name(db, user_id) or "inconnu"
+
+    def creator_args():
+        name, rarity, description, value = random_finds("basic")[0]
+        return name, rarity, description, value, user()
+
+    operations = {
+        "get_archaeologist": (lambda: (user(),), db.get_archaeologist),
+        "create_artifact": (creator_args, db.create_artifact),
+        "add_find": (lambda: (db.get_archaeologist(user()), *random_finds("basic")[0]), db.add_find),
+        "sell_single_artifact": (sell_single_args, db.sell_single_artifact),
+        "sell_artifacts_by_rarity": (lambda: (user(), rng.choice(rarities)), db.sell_artifacts_by_rarity),
+        "get_leaderboard": (lambda: (10, rng.randrange(0, 1000, 10)), db.get_leaderboard),
+        "buy_pickaxe": (lambda: (user(), rng.choice(pickaxes)), db.buy_pickaxe),
+    }
+
+    commands = {
+        "excavate": (lambda: (db, user()), excavate),
+        "profile": (lambda: (user(),), db.get_archaeologist),
+        "collection": (lambda: (user(),), db.get_archaeologist_artifacts_by_rarity),
+        "leaderboard": operations["get_leaderboard"],
+        "sell_single": operations["sell_single_artifact"],
+        "sell_rarity": operations["sell_artifacts_by_rarity"],
+        "buy_pickaxe": operations["buy_pickaxe"],
+        "rank": (lambda: (user(),), db.get_rank),
+    }
+    return operations, commands
+
+
+def measure(operation: tuple, ops: int, budget: float) -> dict:
+    #Chronomètre ops appels (ou moins si le budget de temps est épuisé).
+    prepare, call = operation
+    latencies = []
+    written = bytes_written()
+    started = time.perf_counter()
+    while len(latencies) < ops and time.perf_counter() - started < budget:
+        args = prepare()
+        begin = time.perf_counter_ns()
+        call(*args)
+        latencies.append(time.perf_counter_ns() - begin)
+    elapsed = sum(latencies) / 1e9
+    return {**summarize(latencies, elapsed), "bytes_written": bytes_written() - written}
+
+
+def mixed_workload(commands: dict, rng: random.Random) -> tuple:
+    #Charge mixte : une commande tirée selon MIXED_WORKLOAD à chaque appel.
+    names = list(MIXED_WORKLOAD)
+    weights = list(MIXED_WORKLOAD.values())
+
+    def prepare():
+        prepare_command, call = commands[rng.choices(names, weights)[0]]
+        return call, prepare_command()
+
+    return prepare, lambda call, args: call(*args)
+
+
+def run_case(
+    backend: str, snapshot: str, players: int, ops: int, budget: float, seed: int, data_format: str,
+    durability: str,
+) -> dict:
+    #Mesure un backend sur un snapshot (exécuté dans un processus dédié).
+    random.seed(seed)
+    get_loot_engine().seed(seed)
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory(prefix="bench-storage-") as directory:
+        started = time.perf_counter()
+        db = open_backend(backend, snapshot, directory, get_serializer(data_format), durability)
+        open_time = time.perf_counter() - started
+
+        try:
+            operations, commands = build_operations(db, synthetic_user_ids(players), rng)
+            results = {name: measure(operation, ops, budget) for name, operation in operations.items()}
+            results["mixed"] = measure(mixed_workload(commands, rng), ops, budget)
+        finally:
+            db.close()
+
+    return {"open_s": open_time, "peak_rss_mb": peak_rss_mb(), "operations": results}
+
+
+# ===== Rapport =====
+
+def print_case(backend: str, players: int, result: dict):
+    print(f"\n{backend} — {players:,} archéologues")
+    print(f"  ouverture {result['open_s']:.2f}s, RSS max {result['peak_rss_mb']:.0f} Mo")
+    print(f"  {'opération':26} {'ops':>6} {'p50 (µs)':>10} {'p99 (µs)':>10} {'ops/s':>10} {'écrit':>12}")
+    for name, stats in result["operations"].items():
+        print(
+            f"  {name:26} {stats['ops']:6} {stats['p50_us']:10.1f} {stats['p99_us']:10.1f} "
+            f"{stats['ops_per_s']:10.0f} {stats['bytes_written']:12,}"
+        )
+
+
+def print_comparison(results: dict, baseline: dict):
+    #Écart de p50 et de débit par rapport à un fichier de résultats précédent.
+    print(f"\nComparaison avec {baseline['revision']} (p50, ops/s)")
+    for key, case in results["cases"].items():
+        previous = baseline["cases"].get(key)
+        if previous is None:
+            continue
+        print(f"\n{key}")
+        for name, stats in case["operations"].items():
+            before = previous["operations"].get(name)
+            if not before or not before["p50_us"] or not before["ops_per_s"]:
+                continue
+            print(
+                f"  {name:26} p50 {100 * (stats['p50_us'] / before['p50_us'] - 1):+7.1f}%  "
+                f"ops/s {100 * (stats['ops_per_s'] / before['ops_per_s'] - 1):+7.1f}%"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des backends de stockage")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--scales", nargs="+", type=int, default=list(SCALES), help="Nombres d'archéologues")
+    parser.add_argument("--artifacts-per-player", type=int, default=5)
+    parser.add_argument("--ops", type=int, default=1000, help="Appels mesurés par opération")
+    parser.add_argument("--budget", type=float, default=10.0, help="Secondes maximum par opération")
+    parser.add_argument("--format", default="json-compact", help="Format des snapshots (json, json-compact, msgpack)")
+    parser.add_argument("--durability", choices=DURABILITY_MODES, default=config.DATABASE_DURABILITY)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "bench-storage"))
+    parser.add_argument("--output", help="Fichier JSON où enregistrer les résultats")
+    parser.add_argument("--compare", help="Fichier JSON de résultats précédent à comparer")
+    args = parser.parse_args()
+
+    os.makedirs(args.workdir, exist_ok=True)
+    results = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "parameters": {
+            "artifacts_per_player": args.artifacts_per_player,
+            "ops": args.ops,
+            "budget": args.budget,
+            "format": args.format,
+            "durability": args.durability,
+            "seed": args.seed,
+        },
+        "cases": {},
+    }
+
+    # Un processus neuf par mesure (spawn) : le RSS maximal n'inclut que ce cas.
+    context = multiprocessing.get_context("spawn")
+    for players in args.scales:
+        snapshot = snapshot_path(args.workdir, players, args.artifacts_per_player, args.seed)
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            executor.submit(prepare_snapshot, snapshot, players, args.artifacts_per_player, args.seed).result()
+
+        for backend in args.backends:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                result = executor.submit(
+                    run_case, backend, snapshot, players, args.ops, args.budget, args.seed, args.format,
+                    args.durability,
+                ).result()
+            results["cases"][f"{backend}/{players}"] = result
+            print_case(backend, players, result)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nRésultats enregistrés dans {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            print_comparison(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
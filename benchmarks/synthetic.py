@@ -0,0 +1,58 @@
+#Génération de bases synthétiques pour les benchmarks.
+
+import random
+from datetime import datetime, timedelta
+
+import config
+from database.ids import SEQUENCE_MASK, compose_id
+
+
+def synthetic_user_ids(archaeologists: int) -> list[str]:
+    #IDs Discord des archéologues générés (les mêmes pour une taille donnée).
+    return [str(100000000000000000 + i) for i in range(archaeologists)]
+
+
+def generate_database(archaeologists: int, artifacts: int, seed: int = 42) -> dict:
+    #Construit le contenu brut d'une base (format de database.json).
+    #Les artefacts sont répartis aléatoirement entre les archéologues.
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    user_ids = synthetic_user_ids(archaeologists)
+
+    data = {"archaeologists": {}, "artifacts": {}}
+    owned = {user_id: [] for user_id in user_ids}
+
+    # Découvertes triées dans le temps : les IDs sont croissants, comme en production.
+    offsets_ms = sorted(rng.randrange(30_000_000_000) for _ in range(artifacts))
+    start_ms = int(start.timestamp() * 1000)
+
+    for index, offset_ms in enumerate(offsets_ms):
+        owner = user_ids[rng.randrange(archaeologists)]
+        artifact_id = compose_id(start_ms + offset_ms, 0, index & SEQUENCE_MASK)
+        rarity = rng.choice(config.RARITY_LEVELS)
+        data["artifacts"][str(artifact_id)] = {
+            "name": f"{rng.choice(config.ARTIFACT_PREFIXES)} {rng.choice(config.ARTIFACT_ITEMS)}",
+            "rarity": rarity,
+            "description": rng.choice(config.ARTIFACT_DESCRIPTIONS),
+            "value": rng.randint(40, 1200),
+            "discovered_by": owner,
+            "discovered_at": (start + timedelta(milliseconds=offset_ms)).isoformat(),
+            "artifact_id": artifact_id,
+        }
+        owned[owner].append(artifact_id)
+
+    for index, user_id in enumerate(user_ids):
+        level = rng.randint(1, 60)
+        data["archaeologists"][user_id] = {
+            "user_id": user_id,
+            "username": f"player{index}",
+            "level": level,
+            "experience": level * 100 + rng.randrange(100),
+            "coins": rng.randrange(20000),
+            "artifacts": owned[user_id],
+            "total_excavations": len(owned[user_id]) + rng.randrange(50),
+            "pickaxe": rng.choice(list(config.PICKAXES)),
+            "joined_at": (start + timedelta(seconds=rng.randrange(30_000_000))).isoformat(),
+        }
+
+    return data
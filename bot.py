@@ -6,6 +6,8 @@ from pathlib import Path
 
 from dotenv import load_dotenv
 import config
+from database import close_async_database, get_async_database
+from utils.loot import get_loot_engine
 
 
 class ArcheoloBotClient(commands.Bot):
@@ -18,6 +20,12 @@ class ArcheoloBotClient(commands.Bot):
     
     async def setup_hook(self):
         # Charge les cogs au démarrage.
+        # La base et les tables de butin sont chargées une seule fois ici, puis partagées par tous les cogs.
+        # Les écritures sont groupées par fenêtre (config.DATABASE_FLUSH_WINDOW_MS) et les
+        # inactifs archivés périodiquement (config.ARCHIVE_AFTER_DAYS).
+        get_async_database().start_flusher()
+        get_async_database().start_archiver()
+        get_loot_engine()
         cogs_path = Path("cogs")
         
         for cog_file in cogs_path.glob("*.py"):
@@ -30,6 +38,11 @@ class ArcheoloBotClient(commands.Bot):
                 print(f"Cog chargé: {cog_name}")
             except Exception as e:
                 print(f"Erreur lors du chargement du cog {cog_name}: {e}")
+    
+    async def close(self):
+        # Ferme la connexion Discord puis la base (écritures en attente, compaction/connexion en cours).
+        await super().close()
+        await get_async_database().close()
 
 
 async def main():
@@ -76,4 +89,8 @@ if __name__ == "__main__":
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
-        print("Arrêt demandé, fermeture du bot...")
\ No newline at end of file
+        print("Arrêt demandé, fermeture du bot...")
+    finally:
+        # Filet de sécurité si la fermeture du bot n'a pas abouti (interruption hors de la
+        # boucle, erreur) : les modifications en attente sont écrites.
+        close_async_database()
\ No newline at end of file
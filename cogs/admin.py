@@ -0,0 +1,125 @@
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from database.async_manager import get_async_database
+from database.lanes import get_user_lanes
+from utils.helpers import (
+    get_rarity_emoji,
+    create_embed,
+)
+import config
+
+
+class AdminCog(commands.Cog):
+    #Commandes d'administration du serveur.
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.db = get_async_database()
+        self.lanes = get_user_lanes()
+
+    @app_commands.command(name="stats", description="Statistiques globales du serveur (administrateurs)")
+    @app_commands.describe(action="Afficher les statistiques, vérifier ou réparer les compteurs")
+    @app_commands.choices(action=[
+        app_commands.Choice(name="Afficher", value="show"),
+        app_commands.Choice(name="Vérifier les compteurs", value="verify"),
+        app_commands.Choice(name="Recalculer les compteurs", value="rebuild"),
+    ])
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.guild_only()
+    async def stats(self, interaction: discord.Interaction, action: str = "show"):
+        #Affiche les compteurs globaux (lus sans parcourir la base), ou les vérifie.
+        await interaction.response.defer(ephemeral=True)
+
+        if action != "show":
+            if action == "rebuild":
+                differences = await self.db.rebuild_counters()
+            else:
+                differences = await self.db.verify_counters()
+            await interaction.followup.send(embed=self._counters_embed(action, differences), ephemeral=True)
+            return
+
+        stats = await self.db.get_global_stats()
+        embed = create_embed(
+            title="📊 Statistiques du serveur",
+            color=discord.Color.blurple()
+        )
+        embed.add_field(name="Archéologues", value=f"{stats['archaeologists']:,}", inline=True)
+        embed.add_field(name="Fouilles", value=f"{stats['excavations']:,}", inline=True)
+        embed.add_field(name="Pièces en circulation", value=f"💰 {stats['coins']:,}", inline=True)
+
+        artifacts_text = "\n".join(
+            f"{get_rarity_emoji(rarity)} {rarity.capitalize()}: {stats['artifacts'][rarity]:,}"
+            for rarity in config.RARITY_LEVELS
+            if stats["artifacts"].get(rarity)
+        )
+        embed.add_field(
+            name=f"Artefacts ({stats['total_artifacts']:,})",
+            value=artifacts_text or "Aucun",
+            inline=False
+        )
+
+        levels = stats["levels"]
+        if levels:
+            average = sum(level * count for level, count in levels.items()) / stats["archaeologists"]
+            most_common = sorted(levels.items(), key=lambda item: item[1], reverse=True)[:5]
+            embed.add_field(
+                name="Niveaux",
+                value=(
+                    f"Moyen: {average:.1f} | Maximum: {max(levels)}\n"
+                    + " | ".join(f"Niv {level}: {count:,}" for level, count in most_common)
+                ),
+                inline=False
+            )
+
+        cache = self.db.get_cache_stats()
+        if cache is not None:
+            embed.add_field(
+                name="Cache des archéologues",
+                value=(
+                    f"{cache['entries']:,} joueur(s), {cache['bytes'] / 1024 / 1024:.1f} Mo | "
+                    f"Succès: {cache['hit_rate']:.0%} | Évictions: {cache['evictions']:,}"
+                ),
+                inline=False
+            )
+
+        lanes = self.lanes.get_stats()
+        embed.add_field(
+            name="Files par joueur",
+            value=(
+                f"Actives: {lanes['active_lanes']:,} | En attente: {lanes['queued']:,} | "
+                f"Profondeur max: {lanes['max_depth']}\n"
+                f"Attente moyenne: {lanes['avg_wait_ms']:.1f} ms | Maximum: {lanes['max_wait_ms']:.1f} ms"
+            ),
+            inline=False
+        )
+
+        await interaction.followup.send(embed=embed, ephemeral=True)
+
+    @staticmethod
+    def _counters_embed(action: str, differences: dict) -> discord.Embed:
+        #Résultat d'une vérification ou d'un recalcul des compteurs.
+        if not differences:
+            return create_embed(
+                title="✅ Compteurs globaux corrects",
+                description="Les compteurs correspondent aux données.",
+                color=discord.Color.green()
+            )
+
+        lines = [
+            f"`{name}`: {stored:,} → {actual:,}"
+            for name, (stored, actual) in list(differences.items())[:20]
+        ]
+        if len(differences) > 20:
+            lines.append(f"… et {len(differences) - 20} autre(s)")
+        return create_embed(
+            title="🔧 Compteurs recalculés" if action == "rebuild" else "⚠️ Compteurs incorrects",
+            description="\n".join(lines),
+            color=discord.Color.orange()
+        )
+
+
+async def setup(bot: commands.Bot):
+    #Charge le cog.
+    await bot.add_cog(AdminCog(bot))
@@ -2,7 +2,8 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
-from database.db_manager import DatabaseManager
+from database.async_manager import get_async_database
+from database.lanes import get_user_lanes
 from utils.helpers import (
     get_rarity_emoji,
     create_embed,
@@ -10,25 +11,17 @@ from utils.helpers import (
 import config
 
 
+LEADERBOARD_PAGE_SIZE = 10
+
+
 class CollectionCog(commands.Cog):
     #Commandes liées aux collections et classements.
     
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.db = DatabaseManager()
+        self.db = get_async_database()
+        self.lanes = get_user_lanes()
     
-    def _get_or_create_archaeologist(self, interaction: discord.Interaction):
-        #Récupère ou crée un archéologue.
-        archaeologist = self.db.get_archaeologist(interaction.user.id)
-        
-        if not archaeologist:
-            archaeologist = self.db.create_archaeologist(
-                interaction.user.id,
-                interaction.user.name
-            )
-        
-        return archaeologist
-
     @app_commands.command(name="sell", description="Vendre vos artefacts par nom ou par rareté")
     @app_commands.describe(
         artifact_name="Nom exact de l'artefact à vendre (optionnel)",
@@ -46,10 +39,19 @@ class CollectionCog(commands.Cog):
         #Vendre un artefact par nom OU tous les artefacts jusqu'à une rareté.
         await interaction.response.defer()
 
-        archaeologist = self._get_or_create_archaeologist(interaction)
+        # Les ventes d'un joueur passent dans sa file : pas de mise à jour perdue avec /excavate
+        async with self.lanes.lane(interaction.user.id):
+            archaeologist = await self.db.get_or_create_archaeologist(interaction.user.id, interaction.user.name)
+
+            if artifact_name:
+                coins, sold_id = await self.db.sell_single_artifact(archaeologist.user_id, artifact_name)
+            elif max_rarity:
+                coins, count = await self.db.sell_artifacts_by_rarity(
+                    archaeologist.user_id,
+                    max_rarity.value,
+                )
 
         if artifact_name:
-            coins, sold_id = self.db.sell_single_artifact(archaeologist.user_id, artifact_name)
             if coins == 0:
                 await interaction.followup.send(
                     embed=create_embed(
@@ -71,10 +73,6 @@ class CollectionCog(commands.Cog):
             return
 
         if max_rarity:
-            coins, count = self.db.sell_artifacts_by_rarity(
-                archaeologist.user_id,
-                max_rarity.value,
-            )
             if count == 0:
                 await interaction.followup.send(
                     embed=create_embed(
@@ -112,10 +110,18 @@ class CollectionCog(commands.Cog):
         #Affiche la collection d'artefacts de l'utilisateur.
         await interaction.response.defer()
         
-        archaeologist = self._get_or_create_archaeologist(interaction)
-        artifacts = self.db.get_archaeologist_artifacts(str(archaeologist.user_id))
+        async with self.lanes.lane(interaction.user.id):
+            archaeologist = await self.db.get_or_create_archaeologist(interaction.user.id, interaction.user.name)
+            artifacts_by_rarity = await self.db.get_archaeologist_artifacts_by_rarity(
+                str(archaeologist.user_id)
+            )
+        
+        stacks_by_rarity = {}
+        for stack in archaeologist.get_stacks():
+            stacks_by_rarity.setdefault(stack.rarity, []).append(stack)
         
-        if not artifacts:
+        total = archaeologist.artifact_count
+        if not total:
             embed = create_embed(
                 title="📚 Votre collection",
                 description="Vous n'avez pas encore découvert d'artefacts.",
@@ -127,31 +133,34 @@ class CollectionCog(commands.Cog):
         # Crée un embed pour la collection
         embed = create_embed(
             title=f"📚 Collection de {archaeologist.username}",
-            description=f"Total: {len(artifacts)} artefact(s)",
+            description=f"Total: {total} artefact(s)",
             color=discord.Color.gold()
         )
         
         # Groupe les artefacts par rareté
         for rarity in config.RARITY_LEVELS:
-            rarity_artifacts = [a for a in artifacts if a.rarity == rarity]
-            if rarity_artifacts:
-                artifact_list = "\n".join(
-                    f"• {a.name} (💰 {a.value})" for a in rarity_artifacts
-                )
+            rarity_artifacts = artifacts_by_rarity.get(rarity, [])
+            rarity_stacks = stacks_by_rarity.get(rarity, [])
+            if rarity_artifacts or rarity_stacks:
+                lines = [f"• {s.name} ×{s.count} (💰 {s.total_value})" for s in rarity_stacks]
+                lines += [f"• {a.name} (💰 {a.value})" for a in rarity_artifacts]
+                count = len(rarity_artifacts) + sum(s.count for s in rarity_stacks)
                 embed.add_field(
-                    name=f"{get_rarity_emoji(rarity)} {rarity.capitalize()} ({len(rarity_artifacts)})",
-                    value=artifact_list,
+                    name=f"{get_rarity_emoji(rarity)} {rarity.capitalize()} ({count})",
+                    value="\n".join(lines),
                     inline=False
                 )
         
         await interaction.followup.send(embed=embed)
     
     @app_commands.command(name="leaderboard", description="Affiche le classement des archéologues")
-    async def leaderboard(self, interaction: discord.Interaction):
+    @app_commands.describe(page="Page du classement (10 archéologues par page)")
+    async def leaderboard(self, interaction: discord.Interaction, page: app_commands.Range[int, 1] = 1):
         #Affiche le leaderboard.
         await interaction.response.defer()
         
-        leaderboard_data = self.db.get_leaderboard(limit=10)
+        offset = (page - 1) * LEADERBOARD_PAGE_SIZE
+        leaderboard_data = await self.db.get_leaderboard(limit=LEADERBOARD_PAGE_SIZE, offset=offset)
         
         if not leaderboard_data:
             embed = create_embed(
@@ -167,12 +176,19 @@ class CollectionCog(commands.Cog):
             description="Les meilleurs archéologues de tous les temps",
             color=discord.Color.gold()
         )
+        if page > 1:
+            embed.title += f" (page {page})"
         
         medals = ["🥇", "🥈", "🥉"]
         leaderboard_text = ""
         
-        for idx, (username, level, experience, coins, artifacts) in enumerate(leaderboard_data, 1):
-            medal = medals[idx - 1] if idx <= 3 else f"{idx}️⃣"
+        # Les ex æquo partagent le rang (comme /rank) : celui du premier de la page est compté.
+        previous = leaderboard_data[0][1:4]
+        rank = await self.db.count_ahead(*previous) + 1 if offset else 1
+        for position, (username, level, experience, coins, artifacts) in enumerate(leaderboard_data, offset + 1):
+            if (level, experience, coins) != previous:
+                rank, previous = position, (level, experience, coins)
+            medal = medals[rank - 1] if rank <= 3 else (f"{rank}️⃣" if rank < 10 else f"#{rank}")
             leaderboard_text += (
                 f"{medal} **{username}** | "
                 f"Niveau {level} | "
@@ -184,6 +200,27 @@ class CollectionCog(commands.Cog):
         embed.description = leaderboard_text
         
         await interaction.followup.send(embed=embed)
+    
+    @app_commands.command(name="rank", description="Affiche votre position dans le classement")
+    async def rank(self, interaction: discord.Interaction):
+        #Affiche le rang de l'utilisateur.
+        await interaction.response.defer()
+        
+        async with self.lanes.lane(interaction.user.id):
+            archaeologist = await self.db.get_or_create_archaeologist(interaction.user.id, interaction.user.name)
+            rank = await self.db.get_rank(archaeologist.user_id)
+        total = await self.db.count_archaeologists()
+        
+        embed = create_embed(
+            title=f"🏆 Rang de {archaeologist.username}",
+            description=f"Vous êtes **#{rank}** sur {total} archéologue(s).",
+            color=discord.Color.gold()
+        )
+        embed.add_field(name="Niveau", value=str(archaeologist.level), inline=True)
+        embed.add_field(name="Expérience", value=f"{archaeologist.experience} XP", inline=True)
+        embed.add_field(name="Pièces", value=f"💰 {archaeologist.coins}", inline=True)
+        
+        await interaction.followup.send(embed=embed)
 
 
 async def setup(bot: commands.Bot):
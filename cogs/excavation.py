@@ -2,16 +2,19 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 import random
+from collections import Counter
 
-from database.db_manager import DatabaseManager
+from database.async_manager import get_async_database
+from database.lanes import get_user_lanes
 from utils.helpers import (
     get_random_artifact_name,
     get_random_artifact_description,
     get_rarity_emoji,
     get_rarity_color,
-    generate_excavation_reward,
+    generate_excavation_rewards,
     create_embed,
 )
+import config
 
 
 class ExcavationCog(commands.Cog):
@@ -19,72 +22,111 @@ class ExcavationCog(commands.Cog):
     
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.db = DatabaseManager()
-    
-    def _get_or_create_archaeologist(self, interaction: discord.Interaction):
-        #Récupère ou crée un archéologue.
-        archaeologist = self.db.get_archaeologist(interaction.user.id)
-        
-        if not archaeologist:
-            archaeologist = self.db.create_archaeologist(
-                interaction.user.id,
-                interaction.user.name
-            )
-        
-        return archaeologist
+        self.db = get_async_database()
+        self.lanes = get_user_lanes()
     
     @app_commands.command(name="excavate", description="Commencez une fouille archéologique")
-    async def excavate(self, interaction: discord.Interaction):
-        #Lance une fouille archéologique.
+    @app_commands.describe(count=f"Nombre de fouilles d'affilée (1 à {config.EXCAVATION_BATCH_MAX})")
+    async def excavate(
+        self,
+        interaction: discord.Interaction,
+        count: app_commands.Range[int, 1, config.EXCAVATION_BATCH_MAX] = 1,
+    ):
+        #Lance une ou plusieurs fouilles archéologiques.
         await interaction.response.defer()
         
-        archaeologist = self._get_or_create_archaeologist(interaction)
+        user_id = str(interaction.user.id)
+        username = interaction.user.name
         
-        # Génère un artefact aléatoire avec la pioche actuelle
-        coins_reward, rarity = generate_excavation_reward(archaeologist.pickaxe)
-        artifact_name = get_random_artifact_name()
-        artifact_desc = get_random_artifact_description()
+        def dig(db):
+            # Une seule transaction : les artefacts et la mise à jour du joueur sont écrits ensemble
+            archaeologist = db.get_archaeologist(user_id) or db.create_archaeologist(user_id, username)
+            
+            # Tire toutes les récompenses d'un coup avec la pioche actuelle
+            rewards = generate_excavation_rewards(archaeologist.pickaxe, count)
+            artifacts = db.add_finds(archaeologist, [
+                (get_random_artifact_name(), rarity, get_random_artifact_description(), coins_reward)
+                for coins_reward, rarity in rewards
+            ])
+            
+            # Met à jour les statistiques de l'archéologue, trouvaille par trouvaille
+            xp_gained = 0
+            levels_gained = 0
+            for _ in artifacts:
+                xp = random.randint(config.EXCAVATION_XP_MIN, config.EXCAVATION_XP_MAX)
+                xp_gained += xp
+                levels_gained += archaeologist.add_experience(xp)
+            archaeologist.total_excavations += len(artifacts)
+            
+            db.save_archaeologist(archaeologist)
+            return archaeologist, artifacts, xp_gained, levels_gained
         
-        # Crée l'artefact en base de données
-        artifact = self.db.create_artifact(
-            name=artifact_name,
-            rarity=rarity,
-            description=artifact_desc,
-            value=coins_reward,
-            discovered_by=str(archaeologist.user_id)
-        )
+        async with self.lanes.lane(user_id):
+            archaeologist, artifacts, xp_gained, levels_gained = await self.db.run_transaction(dig, "excavate")
         
-        # Met à jour les statistiques de l'archéologue
-        archaeologist.add_artifact(artifact.artifact_id)
-        xp_gained = random.randint(25, 75)
-        leveled_up = archaeologist.add_experience(xp_gained)
-        archaeologist.total_excavations += 1
+        if len(artifacts) == 1:
+            embed = self._single_embed(artifacts[0], xp_gained)
+        else:
+            embed = self._summary_embed(artifacts, xp_gained)
         
-        self.db.save_archaeologist(archaeologist)
+        if levels_gained:
+            embed.add_field(
+                name="🎉 Montée de niveau!",
+                value=f"Vous êtes maintenant niveau {archaeologist.level}",
+                inline=False
+            )
         
-        # Crée l'embed de résultat
+        await interaction.followup.send(embed=embed)
+    
+    @staticmethod
+    def _single_embed(artifact, xp_gained: int) -> discord.Embed:
+        #Embed du résultat d'une fouille.
         embed = create_embed(
             title="⛏️ Fouille réussie!",
-            color=get_rarity_color(rarity)
+            color=get_rarity_color(artifact.rarity)
         )
         
         embed.add_field(
-            name=f"{get_rarity_emoji(rarity)} {artifact_name}",
-            value=artifact_desc,
+            name=f"{get_rarity_emoji(artifact.rarity)} {artifact.name}",
+            value=artifact.description,
             inline=False
         )
-        embed.add_field(name="Rareté", value=rarity.capitalize(), inline=True)
-        embed.add_field(name="Valeur potentielle", value=f"💰 {coins_reward}", inline=True)
+        embed.add_field(name="Rareté", value=artifact.rarity.capitalize(), inline=True)
+        embed.add_field(name="Valeur potentielle", value=f"💰 {artifact.value}", inline=True)
         embed.add_field(name="XP gagné", value=f"⭐ +{xp_gained} XP", inline=True)
+        return embed
+    
+    @staticmethod
+    def _summary_embed(artifacts: list, xp_gained: int) -> discord.Embed:
+        #Embed récapitulatif de plusieurs fouilles : trouvailles par rareté et meilleure trouvaille.
+        best = max(artifacts, key=lambda a: (config.RARITY_LEVELS.index(a.rarity), a.value))
+        embed = create_embed(
+            title=f"⛏️ {len(artifacts)} fouilles réussies!",
+            color=get_rarity_color(best.rarity)
+        )
         
-        if leveled_up:
-            embed.add_field(
-                name="🎉 Montée de niveau!",
-                value=f"Vous êtes maintenant niveau {archaeologist.level}",
-                inline=False
-            )
-        
-        await interaction.followup.send(embed=embed)
+        by_rarity = Counter(artifact.rarity for artifact in artifacts)
+        embed.add_field(
+            name="Trouvailles",
+            value="\n".join(
+                f"{get_rarity_emoji(rarity)} {rarity.capitalize()}: {by_rarity[rarity]}"
+                for rarity in config.RARITY_LEVELS
+                if by_rarity[rarity]
+            ),
+            inline=False
+        )
+        embed.add_field(
+            name="Meilleure trouvaille",
+            value=f"{get_rarity_emoji(best.rarity)} {best.name} (💰 {best.value})",
+            inline=False
+        )
+        embed.add_field(
+            name="Valeur potentielle",
+            value=f"💰 {sum(artifact.value for artifact in artifacts)}",
+            inline=True
+        )
+        embed.add_field(name="XP gagné", value=f"⭐ +{xp_gained} XP", inline=True)
+        return embed
 
 
 async def setup(bot: commands.Bot):
@@ -2,8 +2,10 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
-from database.db_manager import DatabaseManager
+from database.async_manager import get_async_database
+from database.lanes import get_user_lanes
 from utils.helpers import create_embed
+import config
 
 
 class PlayerCog(commands.Cog):
@@ -11,24 +13,16 @@ class PlayerCog(commands.Cog):
     
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.db = DatabaseManager()
-    
-    def _get_or_create_archaeologist(self, interaction: discord.Interaction):
-        #Récupère ou crée un archéologue.
-        archaeologist = self.db.get_archaeologist(interaction.user.id)
-        
-        if not archaeologist:
-            archaeologist = self.db.create_archaeologist(
-                interaction.user.id,
-                interaction.user.name
-            )
-        
-        return archaeologist
+        self.db = get_async_database()
+        self.lanes = get_user_lanes()
     
     @app_commands.command(name="profile", description="Affiche votre profil d'archéologue")
     async def profile(self, interaction: discord.Interaction):
         #Affiche le profil de l'utilisateur.
-        archaeologist = self._get_or_create_archaeologist(interaction)
+        await interaction.response.defer()
+        
+        async with self.lanes.lane(interaction.user.id):
+            archaeologist = await self.db.get_or_create_archaeologist(interaction.user.id, interaction.user.name)
         
         embed = create_embed(
             title=f"📜 Profil de {archaeologist.username}",
@@ -40,7 +34,7 @@ class PlayerCog(commands.Cog):
         embed.add_field(name="Pièces", value=f"💰 {archaeologist.coins}", inline=True)
         embed.add_field(
             name="Artefacts découverts",
-            value=str(len(archaeologist.artifacts)),
+            value=str(archaeologist.artifact_count),
             inline=True
         )
         embed.add_field(
@@ -49,13 +43,16 @@ class PlayerCog(commands.Cog):
             inline=True
         )
         
-        await interaction.response.send_message(embed=embed)
+        await interaction.followup.send(embed=embed)
 
     @app_commands.command(name="level", description="Affiche votre niveau et progression d'XP")
     async def level(self, interaction: discord.Interaction):
         #Affiche le niveau et la progression XP du joueur.
-        archaeologist = self._get_or_create_archaeologist(interaction)
-        xp_needed = archaeologist.level * 100
+        await interaction.response.defer()
+        
+        async with self.lanes.lane(interaction.user.id):
+            archaeologist = await self.db.get_or_create_archaeologist(interaction.user.id, interaction.user.name)
+        xp_needed = archaeologist.level * config.EXPERIENCE_PER_LEVEL
         embed = create_embed(
             title=f"🎯 Niveau de {archaeologist.username}",
             description=(
@@ -65,8 +62,8 @@ class PlayerCog(commands.Cog):
             color=discord.Color.green()
         )
         embed.add_field(name="Pièces", value=f"💰 {archaeologist.coins}", inline=True)
-        embed.add_field(name="Artefacts", value=str(len(archaeologist.artifacts)), inline=True)
-        await interaction.response.send_message(embed=embed)
+        embed.add_field(name="Artefacts", value=str(archaeologist.artifact_count), inline=True)
+        await interaction.followup.send(embed=embed)
 
 
 async def setup(bot: commands.Bot):
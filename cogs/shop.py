@@ -2,7 +2,8 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
-from database.db_manager import DatabaseManager
+from database.async_manager import get_async_database
+from database.lanes import get_user_lanes
 from config import PICKAXES
 from utils.helpers import create_embed
 
@@ -12,19 +13,8 @@ class ShopCog(commands.Cog):
     
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.db = DatabaseManager()
-    
-    def _get_or_create_archaeologist(self, interaction: discord.Interaction):
-        """Récupère ou crée un archéologue."""
-        archaeologist = self.db.get_archaeologist(interaction.user.id)
-        
-        if not archaeologist:
-            archaeologist = self.db.create_archaeologist(
-                interaction.user.id,
-                interaction.user.name
-            )
-        
-        return archaeologist
+        self.db = get_async_database()
+        self.lanes = get_user_lanes()
     
     @app_commands.command(name="shop", description="Achetez une pioche")
     @app_commands.describe(pickaxe="Choisissez la pioche à acheter")
@@ -39,7 +29,8 @@ class ShopCog(commands.Cog):
         # Le pickaxe est déjà au bon format (key) grâce aux choices
         pickaxe = pickaxe.lower()
         
-        success, message = self.db.buy_pickaxe(str(interaction.user.id), pickaxe)
+        async with self.lanes.lane(interaction.user.id):
+            success, message = await self.db.buy_pickaxe(str(interaction.user.id), pickaxe)
         
         if success:
             embed = create_embed(
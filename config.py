@@ -9,8 +9,39 @@ if not DISCORD_TOKEN:
     raise ValueError("DISCORD_TOKEN non défini dans le .env")
 
 # Database
-DATABASE_TYPE = os.getenv("DATABASE_TYPE", "json").lower()
-DATABASE_PATH = "data/database.json"
+DATABASE_TYPE = os.getenv("DATABASE_TYPE", "json").lower()  # "json", "journal" ou "sqlite"
+DATABASE_PATH = os.getenv("DATABASE_PATH", "data/database.json")
+DATABASE_FORMAT = os.getenv("DATABASE_FORMAT", "json").lower()  # "json", "json-compact" ou "msgpack"
+DATABASE_COMPRESSION = os.getenv("DATABASE_COMPRESSION", "none").lower()  # "none", "gzip" ou "zstd"
+SQLITE_PATH = "data/database.sqlite3"
+JOURNAL_PATH = "data/database.journal"
+JOURNAL_COMPACT_BYTES = int(os.getenv("JOURNAL_COMPACT_BYTES", 4 * 1024 * 1024))
+# Stockage réparti : les joueurs sont répartis par hachage de leur user_id entre
+# DATABASE_SHARDS bases du type DATABASE_TYPE sous SHARDS_DIR (0 : une seule base).
+# Changer leur nombre : python -m database.sharding --shards N (bot arrêté).
+DATABASE_SHARDS = int(os.getenv("DATABASE_SHARDS", 0))
+SHARDS_DIR = os.getenv("SHARDS_DIR", "data/shards")
+DATABASE_SHARD_PARALLEL = os.getenv("DATABASE_SHARD_PARALLEL", "False").lower() == "true"
+# Durabilité des écritures : "always" (fsync à chaque commit), "interval" (fsync groupé, au
+# plus tard DATABASE_FSYNC_INTERVAL_MS après un commit) ou "os" (le système décide).
+DATABASE_DURABILITY = os.getenv("DATABASE_DURABILITY", "os").lower()
+DATABASE_FSYNC_INTERVAL_MS = int(os.getenv("DATABASE_FSYNC_INTERVAL_MS", 100))
+# Écriture groupée (bot) : les modifications sont écrites au plus une fois par fenêtre, ou
+# dès que DATABASE_FLUSH_MAX_PENDING enregistrements attendent. 0 : écriture à chaque commit.
+DATABASE_FLUSH_WINDOW_MS = int(os.getenv("DATABASE_FLUSH_WINDOW_MS", 1000))
+DATABASE_FLUSH_MAX_PENDING = int(os.getenv("DATABASE_FLUSH_MAX_PENDING", 500))
+# Archéologues inactifs depuis ARCHIVE_AFTER_DAYS jours déplacés (avec leurs artefacts) dans
+# une archive compressée, vérifié toutes les ARCHIVE_INTERVAL_HOURS heures par le bot ; ils
+# en sortent à leur première commande. 0 : pas d'archivage. Bases JSON et journal seulement.
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", 30))
+ARCHIVE_INTERVAL_HOURS = float(os.getenv("ARCHIVE_INTERVAL_HOURS", 6))
+# Cache des archéologues (bot) : les joueurs actifs restent en mémoire, au plus
+# ARCHAEOLOGIST_CACHE_SIZE joueurs et ARCHAEOLOGIST_CACHE_MB Mo estimés. 0 : pas de cache.
+ARCHAEOLOGIST_CACHE_SIZE = int(os.getenv("ARCHAEOLOGIST_CACHE_SIZE", 10000))
+ARCHAEOLOGIST_CACHE_MB = float(os.getenv("ARCHAEOLOGIST_CACHE_MB", 64))
+# "items" : un enregistrement par artefact trouvé ; "stacks" : une pile (nombre, valeur
+# totale) par nom et rareté. Passer en "stacks" regroupe les artefacts existants au démarrage.
+INVENTORY_MODE = os.getenv("INVENTORY_MODE", "items").lower()
 
 # Modes
 DEBUG = os.getenv("DEBUG", "False").lower() == "true"
@@ -19,13 +50,33 @@ DEBUG = os.getenv("DEBUG", "False").lower() == "true"
 EXCAVATION_REWARD_MIN = 50
 EXCAVATION_REWARD_MAX = 500
 EXCAVATION_TIME_MINUTES = 5
+EXCAVATION_XP_MIN = 25  # XP gagné par fouille (bornes incluses)
+EXCAVATION_XP_MAX = 75
+EXPERIENCE_PER_LEVEL = 100
+EXCAVATION_BATCH_MAX = int(os.getenv("EXCAVATION_BATCH_MAX", 25))  # fouilles max par /excavate
+# Raretés et récompenses de chaque pioche ; LOOT_SEED rend les tirages reproductibles.
+LOOT_TABLES_PATH = os.getenv("LOOT_TABLES_PATH", "data/loot_tables.json")
+LOOT_SEED = int(os.environ["LOOT_SEED"]) if os.getenv("LOOT_SEED") else None
 RARITY_LEVELS = ["common", "uncommon", "rare", "epic", "legendary"]
 
-# Pickaxe system
+# Vocabulaire des artefacts. Les artefacts sont stockés sous forme de codes (indices
+# dans ces listes) : on peut ajouter des entrées à la fin, jamais en retirer ou en réordonner.
+ARTIFACT_PREFIXES = ["Ancient", "Mystical", "Golden", "Sacred", "Lost", "Hidden"]
+ARTIFACT_ITEMS = ["Amulet", "Scroll", "Sword", "Crown", "Chalice", "Tome", "Statue"]
+ARTIFACT_DESCRIPTIONS = [
+    "Un objet énigmatique aux origines perdues.",
+    "Gravé avec des symboles anciens indéchiffrés.",
+    "Dégageant une aura mystérieuse.",
+    "Rarissime et d'une grande valeur historique.",
+    "Porteur de secrets d'une civilisation oubliée.",
+    "D'une beauté et d'une finesse exceptionnelles.",
+]
+
+# Pickaxe system (les chances de chaque rareté sont dans LOOT_TABLES_PATH)
 PICKAXES = {
-    "basic": {"name": "Pioche de Base", "cost": 0, "legendary_chance": 0},
-    "bronze": {"name": "Pioche de Bronze", "cost": 500, "legendary_chance": 5},
-    "silver": {"name": "Pioche d'Argent", "cost": 1500, "legendary_chance": 15},
-    "gold": {"name": "Pioche d'Or", "cost": 3000, "legendary_chance": 30},
-    "diamond": {"name": "Pioche de Diamant", "cost": 6000, "legendary_chance": 50},
+    "basic": {"name": "Pioche de Base", "cost": 0},
+    "bronze": {"name": "Pioche de Bronze", "cost": 500},
+    "silver": {"name": "Pioche d'Argent", "cost": 1500},
+    "gold": {"name": "Pioche d'Or", "cost": 3000},
+    "diamond": {"name": "Pioche de Diamant", "cost": 6000},
 }
@@ -1,6 +1,25 @@
 #Package de base de données.
 
-from .db_manager import DatabaseManager
+from .db_manager import DatabaseManager, create_database, get_database
+from .sqlite_manager import SQLiteDatabaseManager
+from .cache import ArchaeologistCache
+from .async_manager import AsyncDatabaseManager, close_async_database, get_async_database
+from .flusher import WriteFlusher
+from .lanes import UserLanes, get_user_lanes
 from .models import Archaeologist, Artifact
 
-__all__ = ["DatabaseManager", "Archaeologist", "Artifact"]
+__all__ = [
+    "DatabaseManager",
+    "SQLiteDatabaseManager",
+    "AsyncDatabaseManager",
+    "ArchaeologistCache",
+    "UserLanes",
+    "WriteFlusher",
+    "create_database",
+    "get_database",
+    "get_async_database",
+    "close_async_database",
+    "get_user_lanes",
+    "Archaeologist",
+    "Artifact",
+]
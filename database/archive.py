@@ -0,0 +1,81 @@
+#Archive des archéologues inactifs (tier froid) : fichiers compressés hors du snapshot.
+#
+#Les joueurs sont rangés par hachage de leur user_id dans ARCHIVE_BUCKETS fichiers
+#<base>.archive/bucket-XX.json.gz : {user_id: {"archaeologist": enregistrement,
+#"artifacts": {artifact_id: enregistrement}}}. Seul un résumé de chaque joueur archivé reste
+#dans la base (table "archive", voir summarize_player) : il suffit au classement et aux
+#compteurs globaux. Un joueur n'est archivé que si la table "archive" le mentionne ; une
+#entrée de fichier sans résumé (copie d'un joueur revenu) est ignorée.
+
+import os
+import zlib
+from typing import Iterable, Iterator
+
+from .durability import replace_atomically
+from .serializers import get_serializer, load_any
+
+
+ARCHIVE_BUCKETS = 64
+
+
+def archive_directory(db_path: str) -> str:
+    #Répertoire de l'archive d'une base (data/database.json -> data/database.archive).
+    return f"{os.path.splitext(db_path)[0]}.archive"
+
+
+def bucket_of(user_id: str) -> int:
+    return zlib.crc32(str(user_id).encode("utf-8")) % ARCHIVE_BUCKETS
+
+
+def bucket_path(directory: str, bucket: int) -> str:
+    return os.path.join(directory, f"bucket-{bucket:02d}.json.gz")
+
+
+def read_bucket(directory: str, bucket: int) -> dict:
+    #Contenu d'un fichier de l'archive ({} s'il n'existe pas).
+    try:
+        with open(bucket_path(directory, bucket), "rb") as f:
+            return load_any(f.read())
+    except FileNotFoundError:
+        return {}
+
+
+def write_bucket(directory: str, bucket: int, entries: dict, sync: bool):
+    #Remplace atomiquement un fichier de l'archive (JSON compact, gzip, somme de contrôle).
+    os.makedirs(directory, exist_ok=True)
+    payload = get_serializer("json-compact", "gzip").dumps(entries)
+    replace_atomically(bucket_path(directory, bucket), payload, sync)
+
+
+def iter_archived(directory: str, user_ids: Iterable[str]) -> Iterator[tuple[str, dict]]:
+    #(user_id, entrée) des joueurs archivés demandés, fichier par fichier.
+    buckets = {}
+    for user_id in user_ids:
+        buckets.setdefault(bucket_of(user_id), []).append(str(user_id))
+    for bucket, wanted in sorted(buckets.items()):
+        entries = read_bucket(directory, bucket)
+        for user_id in wanted:
+            entry = entries.get(user_id)
+            if entry is not None:
+                yield user_id, entry
+
+
+def summarize_player(record: dict, artifacts: dict, last_active: float) -> dict:
+    #Résumé conservé dans la base pour un joueur archivé : champs du classement et des
+    #compteurs globaux, nombre d'artefacts par rareté (individuels et en piles).
+    rarities = {}
+    for artifact in artifacts.values():
+        rarities[artifact["rarity"]] = rarities.get(artifact["rarity"], 0) + 1
+    for key, (count, _) in record.get("stacks", {}).items():
+        rarity = key.split("|", 1)[0]
+        rarities[rarity] = rarities.get(rarity, 0) + count
+    return {
+        "username": record["username"],
+        "level": record.get("level", 1),
+        "experience": record.get("experience", 0),
+        "coins": record.get("coins", 0),
+        "total_excavations": record.get("total_excavations", 0),
+        "artifact_count": sum(rarities.values()),
+        "rarities": rarities,
+        "last_active": int(last_active),
+    }
@@ -0,0 +1,331 @@
+#Table d'artefacts en colonnes : des codes entiers au lieu de textes répétés.
+
+import base64
+import sys
+from array import array
+from datetime import datetime, timedelta
+from typing import Iterator, Optional
+
+import config
+
+try:
+    import numpy
+except ImportError:  # dépendance optionnelle
+    numpy = None
+
+
+# Code d'un texte hors vocabulaire : le texte est conservé dans extras.
+CUSTOM = -1
+
+# Colonnes et leur type array. discovered_at est en microsecondes depuis 1970, sans
+# fuseau horaire (comme les dates ISO enregistrées jusqu'ici).
+COLUMNS = {
+    "id": "q",
+    "prefix": "h",
+    "item": "h",
+    "description": "h",
+    "rarity": "h",
+    "value": "i",
+    "discovered_at": "q",
+    "owner": "i",
+}
+SNAPSHOT_FORMAT = "columns"
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def current_vocabulary() -> dict:
+    #Vocabulaire courant (config) auquel renvoient les codes.
+    return {
+        "prefixes": list(config.ARTIFACT_PREFIXES),
+        "items": list(config.ARTIFACT_ITEMS),
+        "descriptions": list(config.ARTIFACT_DESCRIPTIONS),
+        "rarities": list(config.RARITY_LEVELS),
+    }
+
+
+def _encode_time(text) -> Optional[int]:
+    #Date ISO → microsecondes, ou None si elle ne peut pas être restituée à l'identique.
+    try:
+        moment = datetime.fromisoformat(text)
+    except (TypeError, ValueError):
+        return None
+    if moment.tzinfo is not None:
+        return None
+    micros = (moment - _EPOCH) // _MICROSECOND
+    return micros if _decode_time(micros) == text else None
+
+
+def _decode_time(micros: int) -> str:
+    return (_EPOCH + timedelta(microseconds=micros)).isoformat()
+
+
+def _column_from_snapshot(typecode: str, payload) -> array:
+    #Colonne enregistrée en octets little-endian (base64 dans les formats JSON).
+    if isinstance(payload, str):
+        payload = base64.b64decode(payload)
+    column = array(typecode)
+    column.frombytes(payload)
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column
+
+
+def _column_to_snapshot(column: array) -> bytes:
+    if sys.byteorder == "big":
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+class ArtifactTable:
+    #Artefacts stockés colonne par colonne dans des array : pour chaque artefact, les codes
+    #de préfixe, d'objet, de description et de rareté (indices dans le vocabulaire de
+    #config), sa valeur, sa date de découverte et le code de son découvreur, soit 32 octets.
+    #Le texte n'est reconstitué qu'à la lecture d'un enregistrement.
+    #La table se manipule comme le dict {artifact_id: enregistrement} qu'elle remplace.
+    #Les colonnes exposent le protocole buffer : numpy.frombuffer les lit sans copie.
+
+    __slots__ = ("columns", "owners", "extras", "vocabulary", "_codes", "_owner_codes", "_rows")
+
+    def __init__(self, vocabulary: Optional[dict] = None):
+        self.vocabulary = vocabulary or current_vocabulary()
+        self._codes = {
+            "name": {
+                f"{prefix} {item}": (prefix_code, item_code)
+                for prefix_code, prefix in enumerate(self.vocabulary["prefixes"])
+                for item_code, item in enumerate(self.vocabulary["items"])
+            },
+            "description": {text: code for code, text in enumerate(self.vocabulary["descriptions"])},
+            "rarity": {text: code for code, text in enumerate(self.vocabulary["rarities"])},
+        }
+        self.columns = {name: array(typecode) for name, typecode in COLUMNS.items()}
+        self.owners: list[str] = []
+        self._owner_codes: dict[str, int] = {}
+        self.extras: dict[int, dict] = {}
+        self._rows: dict[int, int] = {}
+
+    # ===== Interface dict =====
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, artifact_id) -> bool:
+        return artifact_id in self._rows
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._rows)
+
+    def keys(self):
+        return self._rows.keys()
+
+    def values(self):
+        return (self[artifact_id] for artifact_id in self._rows)
+
+    def items(self):
+        return ((artifact_id, self[artifact_id]) for artifact_id in self._rows)
+
+    def __getitem__(self, artifact_id) -> dict:
+        return self._decode(artifact_id, self._rows[artifact_id])
+
+    def get(self, artifact_id, default=None):
+        row = self._rows.get(artifact_id)
+        if row is None:
+            return default
+        return self._decode(artifact_id, row)
+
+    def __setitem__(self, artifact_id: int, record: dict):
+        values, extras = self._encode(artifact_id, record)
+        row = self._rows.get(artifact_id)
+        if row is None:
+            self._rows[artifact_id] = len(self._rows)
+            for column, value in zip(self.columns.values(), values):
+                column.append(value)
+        else:
+            for column, value in zip(self.columns.values(), values):
+                column[row] = value
+
+        if extras:
+            self.extras[artifact_id] = extras
+        else:
+            self.extras.pop(artifact_id, None)
+
+    def pop(self, artifact_id, default=None):
+        #Retire un artefact : la dernière ligne prend sa place (O(1)).
+        row = self._rows.get(artifact_id)
+        if row is None:
+            return default
+        record = self._decode(artifact_id, row)
+
+        del self._rows[artifact_id]
+        self.extras.pop(artifact_id, None)
+        last = len(self._rows)
+        for column in self.columns.values():
+            moved = column.pop()
+            if row != last:
+                column[row] = moved
+        if row != last:
+            self._rows[self.columns["id"][row]] = row
+        return record
+
+    def copy(self) -> "ArtifactTable":
+        #Copie indépendante (copie des array, pas des enregistrements).
+        table = ArtifactTable.__new__(ArtifactTable)
+        table.vocabulary = self.vocabulary
+        table._codes = self._codes
+        table.columns = {name: array(column.typecode, column) for name, column in self.columns.items()}
+        table.owners = list(self.owners)
+        table._owner_codes = dict(self._owner_codes)
+        table.extras = dict(self.extras)
+        table._rows = dict(self._rows)
+        return table
+
+    # ===== Codage =====
+
+    def _owner_code(self, owner: str) -> int:
+        code = self._owner_codes.get(owner)
+        if code is None:
+            code = self._owner_codes[owner] = len(self.owners)
+            self.owners.append(owner)
+        return code
+
+    def _encode(self, artifact_id: int, record: dict) -> tuple[tuple, dict]:
+        extras = {}
+        codes = self._codes
+
+        prefix, item = codes["name"].get(record["name"], (CUSTOM, CUSTOM))
+        if prefix == CUSTOM:
+            extras["name"] = record["name"]
+        description = codes["description"].get(record["description"], CUSTOM)
+        if description == CUSTOM:
+            extras["description"] = record["description"]
+        rarity = codes["rarity"].get(record["rarity"], CUSTOM)
+        if rarity == CUSTOM:
+            extras["rarity"] = record["rarity"]
+        discovered_at = _encode_time(record.get("discovered_at"))
+        if discovered_at is None:
+            extras["discovered_at"] = record.get("discovered_at")
+            discovered_at = 0
+
+        values = (
+            artifact_id,
+            prefix,
+            item,
+            description,
+            rarity,
+            int(record["value"]),
+            discovered_at,
+            self._owner_code(str(record["discovered_by"])),
+        )
+        return values, extras
+
+    def _decode(self, artifact_id: int, row: int) -> dict:
+        columns = self.columns
+        vocabulary = self.vocabulary
+        extras = self.extras.get(artifact_id)
+
+        prefix = columns["prefix"][row]
+        description = columns["description"][row]
+        rarity = columns["rarity"][row]
+        record = {
+            "name": (
+                f"{vocabulary['prefixes'][prefix]} {vocabulary['items'][columns['item'][row]]}"
+                if prefix != CUSTOM else extras["name"]
+            ),
+            "rarity": vocabulary["rarities"][rarity] if rarity != CUSTOM else extras["rarity"],
+            "description": (
+                vocabulary["descriptions"][description] if description != CUSTOM else extras["description"]
+            ),
+            "value": columns["value"][row],
+            "discovered_by": self.owners[columns["owner"][row]],
+            "discovered_at": _decode_time(columns["discovered_at"][row]),
+            "artifact_id": artifact_id,
+        }
+        if extras and "discovered_at" in extras:
+            record["discovered_at"] = extras["discovered_at"]
+        return record
+
+    # ===== Parcours en colonnes =====
+
+    def select(self, rarities=None, owner: Optional[str] = None) -> list[int]:
+        #IDs des artefacts d'une des raretés données et/ou d'un découvreur, sans décoder de
+        #texte (comparaisons vectorisées avec numpy s'il est installé).
+        columns = self.columns
+        wanted = None
+        if rarities is not None:
+            wanted = [self._codes["rarity"][rarity] for rarity in rarities if rarity in self._codes["rarity"]]
+        owner_code = None
+        if owner is not None:
+            owner_code = self._owner_codes.get(str(owner), CUSTOM)
+
+        if numpy is not None:
+            keep = numpy.ones(len(self), dtype=bool)
+            if wanted is not None:
+                keep &= numpy.isin(numpy.frombuffer(columns["rarity"], dtype=numpy.int16), wanted)
+            if owner_code is not None:
+                keep &= numpy.frombuffer(columns["owner"], dtype=numpy.int32) == owner_code
+            return numpy.frombuffer(columns["id"], dtype=numpy.int64)[keep].tolist()
+
+        keep = [True] * len(self)
+        if wanted is not None:
+            wanted = set(wanted)
+            keep = [k and code in wanted for k, code in zip(keep, columns["rarity"])]
+        if owner_code is not None:
+            keep = [k and code == owner_code for k, code in zip(keep, columns["owner"])]
+        return [artifact_id for artifact_id, k in zip(columns["id"], keep) if k]
+
+    def rarity_counts(self) -> dict[str, int]:
+        #Nombre d'artefacts par rareté, compté sur la colonne des codes.
+        column = self.columns["rarity"]
+        counts = {
+            rarity: column.count(code)
+            for code, rarity in enumerate(self.vocabulary["rarities"])
+        }
+        for extras in self.extras.values():
+            if "rarity" in extras:
+                counts[extras["rarity"]] = counts.get(extras["rarity"], 0) + 1
+        return {rarity: count for rarity, count in counts.items() if count}
+
+    # ===== Snapshot =====
+
+    @staticmethod
+    def is_snapshot(payload) -> bool:
+        #Indique si une table chargée est au format colonnes (sinon : dict d'enregistrements).
+        return isinstance(payload, dict) and payload.get("format") == SNAPSHOT_FORMAT
+
+    def to_snapshot(self) -> dict:
+        #Représentation sérialisable : vocabulaire, colonnes en octets, textes hors vocabulaire.
+        return {
+            "format": SNAPSHOT_FORMAT,
+            "vocabulary": self.vocabulary,
+            "owners": self.owners,
+            "extras": {str(artifact_id): extras for artifact_id, extras in self.extras.items()},
+            "columns": {name: _column_to_snapshot(column) for name, column in self.columns.items()},
+        }
+
+    @classmethod
+    def from_snapshot(cls, payload: dict) -> "ArtifactTable":
+        #Recharge une table. Si le vocabulaire de config a changé depuis l'enregistrement,
+        #les artefacts sont recodés avec le vocabulaire actuel.
+        table = cls(payload["vocabulary"])
+        table.columns = {
+            name: _column_from_snapshot(typecode, payload["columns"][name])
+            for name, typecode in COLUMNS.items()
+        }
+        table.owners = list(payload["owners"])
+        table._owner_codes = {owner: code for code, owner in enumerate(table.owners)}
+        table.extras = {int(artifact_id): extras for artifact_id, extras in payload.get("extras", {}).items()}
+        table._rows = {artifact_id: row for row, artifact_id in enumerate(table.columns["id"])}
+
+        if table.vocabulary != current_vocabulary():
+            return cls.from_records(table.items())
+        return table
+
+    @classmethod
+    def from_records(cls, records) -> "ArtifactTable":
+        #Construit une table à partir de paires (artifact_id, enregistrement).
+        table = cls()
+        for artifact_id, record in records:
+            table[artifact_id] = record
+        return table
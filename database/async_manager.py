@@ -0,0 +1,258 @@
+#Interface asynchrone du stockage pour les cogs.
+
+import asyncio
+import contextlib
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List
+
+from .cache import ArchaeologistCache, CachedDatabase
+from .db_manager import get_database
+from .flusher import WriteFlusher
+from .models import Archaeologist, Artifact
+import config
+
+
+class AsyncDatabaseManager:
+    #Expose l'API du gestionnaire de base de données sous forme de coroutines.
+    #Le travail bloquant (disque, SQLite, sérialisation) s'exécute sur un thread dédié :
+    #la boucle asyncio continue de servir les interactions pendant les écritures, et les
+    #opérations restent exécutées une à une, dans l'ordre où elles ont été soumises.
+
+    def __init__(self, backend, cache: Optional[ArchaeologistCache] = None):
+        #Enveloppe un gestionnaire synchrone (DatabaseManager ou SQLiteDatabaseManager),
+        #précédé de la carte d'identité cache si elle est fournie (voir database.cache).
+        self.cache = cache
+        self.backend = CachedDatabase(backend, cache) if cache is not None else backend
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="database")
+        self._closed = False
+        self.flusher: Optional[WriteFlusher] = None
+        self._archiver: Optional[asyncio.Task] = None
+
+    async def _run(self, func, *args, **kwargs):
+        #Exécute un appel bloquant hors de la boucle asyncio.
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                self._executor, functools.partial(func, *args, **kwargs)
+            )
+        finally:
+            if self.flusher is not None and not self._closed:
+                self.flusher.notify(self.backend.pending_writes)
+
+    def start_flusher(self, window_ms: int = config.DATABASE_FLUSH_WINDOW_MS) -> Optional[WriteFlusher]:
+        #Passe le gestionnaire en écriture différée, écrite par un WriteFlusher sur la
+        #boucle en cours. Sans effet si window_ms vaut 0 (écriture à chaque commit).
+        if window_ms <= 0 or self.flusher is not None:
+            return self.flusher
+        self.backend.defer_writes(True)
+        self.flusher = WriteFlusher(self, window_ms)
+        self.flusher.start()
+        return self.flusher
+
+    def start_archiver(
+        self,
+        interval_hours: float = config.ARCHIVE_INTERVAL_HOURS,
+        max_idle_days: float = config.ARCHIVE_AFTER_DAYS,
+    ) -> Optional[asyncio.Task]:
+        #Lance sur la boucle en cours l'archivage périodique des archéologues inactifs.
+        #Sans effet si le stockage n'archive pas (SQLite) ou si l'un des délais vaut 0.
+        if (
+            self._archiver is not None
+            or interval_hours <= 0
+            or max_idle_days <= 0
+            or not hasattr(self.backend, "archive_inactive")
+        ):
+            return self._archiver
+        self._archiver = asyncio.get_running_loop().create_task(
+            self._archive_periodically(interval_hours * 3600, max_idle_days), name="database-archiver"
+        )
+        return self._archiver
+
+    async def _archive_periodically(self, interval: float, max_idle_days: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                archived = await self.archive_inactive(max_idle_days)
+            except Exception as e:
+                print(f"Erreur lors de l'archivage des inactifs: {e}")
+                continue
+            if archived:
+                print(f"{archived} archéologue(s) inactif(s) archivé(s)")
+
+    async def archive_inactive(self, max_idle_days: float = config.ARCHIVE_AFTER_DAYS) -> int:
+        #Les joueurs archivés quittent aussi le cache : il est vidé après un archivage.
+        def archive():
+            archived = self.backend.archive_inactive(max_idle_days)
+            if archived and self.cache is not None:
+                self.cache.clear()
+            return archived
+
+        return await self._run(archive)
+
+    async def flush(self) -> int:
+        #Écrit les commits différés. Retourne le nombre d'enregistrements écrits.
+        return await self._run(self.backend.flush)
+
+    async def run_transaction(self, func, operation: str = "transaction"):
+        #Exécute func(backend) dans une transaction sur le thread de stockage.
+        #Toutes les mutations de func sont validées ensemble, en une seule écriture.
+        def run():
+            with self.backend.transaction(operation):
+                return func(self.backend)
+
+        return await self._run(run)
+
+    async def close(self):
+        #Termine les opérations en cours puis ferme le gestionnaire sous-jacent, qui écrit
+        #les commits différés.
+        if self._closed:
+            return
+        self._closed = True
+        if self._archiver is not None:
+            self._archiver.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._archiver
+        if self.flusher is not None:
+            await self.flusher.stop()
+        await self._run(self.backend.close)
+        self._executor.shutdown(wait=True)
+
+    def close_now(self):
+        #Variante bloquante de close, hors de toute boucle asyncio (arrêt par Ctrl+C).
+        if self._closed:
+            return
+        self._closed = True
+        self._executor.submit(self.backend.close).result()
+        self._executor.shutdown(wait=True)
+
+    # ===== Archéologues =====
+
+    async def get_archaeologist(self, user_id: str) -> Optional[Archaeologist]:
+        return await self._run(self.backend.get_archaeologist, user_id)
+
+    async def create_archaeologist(self, user_id: str, username: str) -> Archaeologist:
+        return await self._run(self.backend.create_archaeologist, user_id, username)
+
+    async def get_or_create_archaeologist(self, user_id: str, username: str) -> Archaeologist:
+        #Récupère un archéologue, ou le crée s'il n'existe pas (en une opération).
+        def get_or_create():
+            return self.backend.get_archaeologist(user_id) or self.backend.create_archaeologist(user_id, username)
+
+        return await self._run(get_or_create)
+
+    async def save_archaeologist(self, archaeologist: Archaeologist):
+        return await self._run(self.backend.save_archaeologist, archaeologist)
+
+    async def get_all_archaeologists(self) -> List[Archaeologist]:
+        return await self._run(self.backend.get_all_archaeologists)
+
+    # ===== Artefacts =====
+
+    async def create_artifact(
+        self,
+        name: str,
+        rarity: str,
+        description: str,
+        value: int,
+        discovered_by: str
+    ) -> Artifact:
+        return await self._run(
+            self.backend.create_artifact, name, rarity, description, value, discovered_by
+        )
+
+    async def add_find(
+        self,
+        archaeologist: Archaeologist,
+        name: str,
+        rarity: str,
+        description: str,
+        value: int,
+    ) -> Artifact:
+        return await self._run(self.backend.add_find, archaeologist, name, rarity, description, value)
+
+    async def add_finds(self, archaeologist: Archaeologist, finds: List[tuple]) -> List[Artifact]:
+        return await self._run(self.backend.add_finds, archaeologist, finds)
+
+    async def create_artifacts(self, finds: List[tuple], discovered_by: str) -> List[Artifact]:
+        return await self._run(self.backend.create_artifacts, finds, discovered_by)
+
+    async def get_artifact(self, artifact_id: int) -> Optional[Artifact]:
+        return await self._run(self.backend.get_artifact, artifact_id)
+
+    async def get_artifacts(self, artifact_ids) -> List[Artifact]:
+        return await self._run(self.backend.get_artifacts, list(artifact_ids))
+
+    async def get_archaeologist_artifacts(self, user_id: str) -> List[Artifact]:
+        return await self._run(self.backend.get_archaeologist_artifacts, user_id)
+
+    async def get_archaeologist_artifacts_by_rarity(self, user_id: str) -> dict[str, List[Artifact]]:
+        return await self._run(self.backend.get_archaeologist_artifacts_by_rarity, user_id)
+
+    # ===== Ventes, classement et boutique =====
+
+    async def sell_single_artifact(self, user_id: str, artifact_name: str) -> tuple[int, Optional[int]]:
+        return await self._run(self.backend.sell_single_artifact, user_id, artifact_name)
+
+    async def sell_artifacts_by_rarity(self, user_id: str, max_rarity: str) -> tuple[int, int]:
+        return await self._run(self.backend.sell_artifacts_by_rarity, user_id, max_rarity)
+
+    async def get_leaderboard(self, limit: int = 10, offset: int = 0) -> List[tuple]:
+        return await self._run(self.backend.get_leaderboard, limit, offset)
+
+    async def get_rank(self, user_id: str) -> Optional[int]:
+        return await self._run(self.backend.get_rank, user_id)
+
+    async def count_ahead(self, level: int, experience: int, coins: int) -> int:
+        return await self._run(self.backend.count_ahead, level, experience, coins)
+
+    async def count_archaeologists(self) -> int:
+        return await self._run(self.backend.count_archaeologists)
+
+    async def get_pickaxe(self, user_id: str) -> str:
+        return await self._run(self.backend.get_pickaxe, user_id)
+
+    async def buy_pickaxe(self, user_id: str, pickaxe_type: str) -> tuple[bool, str]:
+        return await self._run(self.backend.buy_pickaxe, user_id, pickaxe_type)
+
+    # ===== Compteurs globaux =====
+
+    async def get_global_stats(self) -> dict:
+        return await self._run(self.backend.get_global_stats)
+
+    async def verify_counters(self) -> dict:
+        return await self._run(self.backend.verify_counters)
+
+    async def rebuild_counters(self) -> dict:
+        return await self._run(self.backend.rebuild_counters)
+
+    def get_cache_stats(self) -> Optional[dict]:
+        #Statistiques du cache des archéologues (None sans cache).
+        return self.cache.get_stats() if self.cache is not None else None
+
+
+_shared_async_manager: Optional[AsyncDatabaseManager] = None
+_shared_async_lock = threading.Lock()
+
+
+def get_async_database() -> AsyncDatabaseManager:
+    #Retourne l'interface asynchrone partagée, adossée au gestionnaire de get_database() et
+    #au cache des archéologues (config.ARCHAEOLOGIST_CACHE_SIZE).
+    global _shared_async_manager
+    with _shared_async_lock:
+        if _shared_async_manager is None:
+            cache = None
+            if config.ARCHAEOLOGIST_CACHE_SIZE > 0 and config.ARCHAEOLOGIST_CACHE_MB > 0:
+                cache = ArchaeologistCache()
+            _shared_async_manager = AsyncDatabaseManager(get_database(), cache)
+        return _shared_async_manager
+
+
+def close_async_database():
+    #Ferme l'interface partagée si elle a été créée, sans boucle asyncio : filet de
+    #sécurité de l'arrêt du bot, pour que les commits différés soient toujours écrits.
+    with _shared_async_lock:
+        manager = _shared_async_manager
+    if manager is not None:
+        manager.close_now()
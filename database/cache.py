@@ -0,0 +1,190 @@
+#Carte d'identité des archéologues : les objets des joueurs actifs restent en mémoire.
+
+import sys
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Optional
+
+from .models import Archaeologist
+import config
+
+
+def estimate_size(archaeologist: Archaeologist) -> int:
+    #Taille approximative d'un archéologue en mémoire (octets) : objet, chaînes, IDs
+    #d'artefacts et piles.
+    size = (
+        sys.getsizeof(archaeologist)
+        + sys.getsizeof(archaeologist.user_id)
+        + sys.getsizeof(archaeologist.username)
+        + sys.getsizeof(archaeologist.joined_at)
+        + 64 + 8 * len(archaeologist.artifacts)
+        + sys.getsizeof(archaeologist.stacks)
+    )
+    for key in archaeologist.stacks:
+        size += sys.getsizeof(key) + 120  # liste [nombre, valeur] et ses entiers
+    return size
+
+
+class ArchaeologistCache:
+    #Cache LRU d'objets Archaeologist par user_id, borné en nombre d'entrées et en
+    #mémoire estimée (estimate_size) : le moins récemment utilisé est évincé en premier.
+    #Carte d'identité : un même joueur est toujours le même objet tant qu'il est en cache.
+    #Pas de verrou : à n'utiliser que depuis un seul thread (celui du stockage).
+
+    def __init__(
+        self,
+        max_entries: int = config.ARCHAEOLOGIST_CACHE_SIZE,
+        max_bytes: int = int(config.ARCHAEOLOGIST_CACHE_MB * 1024 * 1024),
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[Archaeologist, int]] = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, user_id: str) -> bool:
+        return str(user_id) in self._entries
+
+    def get(self, user_id: str) -> Optional[Archaeologist]:
+        entry = self._entries.get(str(user_id))
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(str(user_id))
+        return entry[0]
+
+    def put(self, archaeologist: Archaeologist):
+        #Ajoute ou remplace un archéologue (sa taille est réestimée), puis évince au besoin.
+        user_id = str(archaeologist.user_id)
+        self.discard(user_id)
+        size = estimate_size(archaeologist)
+        self._entries[user_id] = (archaeologist, size)
+        self.bytes += size
+        while self._entries and (len(self._entries) > self.max_entries or self.bytes > self.max_bytes):
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.bytes -= evicted
+            self.evictions += 1
+
+    def discard(self, user_id: str):
+        #Retire un archéologue (sans compter d'éviction).
+        entry = self._entries.pop(str(user_id), None)
+        if entry is not None:
+            self.bytes -= entry[1]
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+
+    def get_stats(self) -> dict:
+        #Entrées, mémoire estimée, succès, échecs et évictions.
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class CachedDatabase:
+    #Gestionnaire de stockage (JSON, journal, SQLite ou réparti) précédé d'une carte
+    #d'identité : get_archaeologist sert les joueurs en cache sans relire la base, et
+    #chaque sauvegarde est écrite dans le gestionnaire (write-through) puis gardée en cache.
+    #Les objets étant partagés, toute modification doit être sauvegardée ; un joueur est
+    #retiré du cache si sa sauvegarde ou sa transaction échoue, et après toute opération
+    #qui modifie son enregistrement sans passer par l'objet (ventes, achats).
+    #Les autres méthodes sont celles du gestionnaire.
+
+    def __init__(self, backend, cache: ArchaeologistCache):
+        self.backend = backend
+        self.cache = cache
+        self._touched: Optional[set] = None
+        # Activité des joueurs servis par le cache (pour l'archivage des inactifs).
+        self._record_activity = getattr(backend, "touch", None)
+
+    def __getattr__(self, name):
+        return getattr(self.backend, name)
+
+    @contextmanager
+    def transaction(self, operation: str = "transaction"):
+        #Transaction du gestionnaire ; en cas d'exception, les joueurs lus ou modifiés dans
+        #le bloc sont retirés du cache (leurs objets ont pu être modifiés).
+        if self._touched is not None:
+            with self.backend.transaction(operation):
+                yield self
+            return
+
+        self._touched = set()
+        try:
+            with self.backend.transaction(operation):
+                yield self
+        except BaseException:
+            for user_id in self._touched:
+                self.cache.discard(user_id)
+            raise
+        finally:
+            self._touched = None
+
+    @contextmanager
+    def _writing(self, user_id: str, keep: bool = True):
+        #Entoure une écriture concernant un joueur : il est retiré du cache si elle échoue,
+        #ou dans tous les cas si keep est faux.
+        if self._touched is not None:
+            self._touched.add(user_id)
+        try:
+            yield
+        except BaseException:
+            self.cache.discard(user_id)
+            raise
+        if not keep:
+            self.cache.discard(user_id)
+
+    # ===== Archéologues =====
+
+    def get_archaeologist(self, user_id: str) -> Optional[Archaeologist]:
+        user_id = str(user_id)
+        if self._touched is not None:
+            self._touched.add(user_id)
+        archaeologist = self.cache.get(user_id)
+        if archaeologist is None:
+            archaeologist = self.backend.get_archaeologist(user_id)
+            if archaeologist is not None:
+                self.cache.put(archaeologist)
+        elif self._record_activity is not None:
+            self._record_activity(user_id)
+        return archaeologist
+
+    def create_archaeologist(self, user_id: str, username: str) -> Archaeologist:
+        with self._writing(str(user_id)):
+            archaeologist = self.backend.create_archaeologist(user_id, username)
+            self.cache.put(archaeologist)
+        return archaeologist
+
+    def save_archaeologist(self, archaeologist: Archaeologist):
+        with self._writing(str(archaeologist.user_id)):
+            self.backend.save_archaeologist(archaeologist)
+            self.cache.put(archaeologist)
+
+    def add_finds(self, archaeologist: Archaeologist, finds: list) -> list:
+        with self._writing(str(archaeologist.user_id)):
+            return self.backend.add_finds(archaeologist, finds)
+
+    def sell_single_artifact(self, user_id: str, artifact_name: str) -> tuple[int, Optional[int]]:
+        with self._writing(str(user_id), keep=False):
+            return self.backend.sell_single_artifact(user_id, artifact_name)
+
+    def sell_artifacts_by_rarity(self, user_id: str, max_rarity: str) -> tuple[int, int]:
+        with self._writing(str(user_id), keep=False):
+            return self.backend.sell_artifacts_by_rarity(user_id, max_rarity)
+
+    def buy_pickaxe(self, user_id: str, pickaxe_type: str) -> tuple[bool, str]:
+        with self._writing(str(user_id), keep=False):
+            return self.backend.buy_pickaxe(user_id, pickaxe_type)
@@ -0,0 +1,128 @@
+#Compteurs globaux matérialisés : statistiques du serveur tenues à jour à chaque écriture.
+
+from typing import Iterable, Optional
+
+
+TOTALS = ("archaeologists", "excavations", "coins")
+RARITY_PREFIX = "rarity:"
+LEVEL_PREFIX = "level:"
+
+
+class GlobalCounters:
+    #Compteurs nommés : "archaeologists", "excavations" (fouilles), "coins" (pièces en
+    #circulation), "rarity:<rareté>" (artefacts individuels et en piles) et
+    #"level:<niveau>" (archéologues par niveau). Les mêmes noms servent de lignes à la
+    #table counters de SQLite et de clés à la table "counters" du snapshot JSON.
+    #Mis à jour par différence à chaque remplacement d'enregistrement : retirer l'ancien
+    #enregistrement puis ajouter le nouveau garde les totaux exacts, y compris à
+    #l'annulation d'une transaction (qui réapplique les anciens enregistrements).
+    #Les compteurs modifiés depuis le dernier commit sont mémorisés (take_changes).
+
+    __slots__ = ("values", "_changed")
+
+    def __init__(self, values: Optional[dict] = None):
+        self.values: dict[str, int] = {name: value for name, value in (values or {}).items() if value}
+        self._changed: set[str] = set()
+
+    def _bump(self, name: str, delta: int):
+        if not delta:
+            return
+        value = self.values.get(name, 0) + delta
+        if value:
+            self.values[name] = value
+        else:
+            self.values.pop(name, None)
+        self._changed.add(name)
+
+    def add_archaeologist(self, record: dict, sign: int = 1):
+        #Ajoute (sign=1) ou retire (sign=-1) la contribution d'un enregistrement d'archéologue.
+        self._bump("archaeologists", sign)
+        self._bump("excavations", sign * record.get("total_excavations", 0))
+        self._bump("coins", sign * record.get("coins", 0))
+        self._bump(f"{LEVEL_PREFIX}{record.get('level', 1)}", sign)
+        for key, (count, _) in record.get("stacks", {}).items():
+            self._bump(RARITY_PREFIX + key.split("|", 1)[0], sign * count)
+
+    def add_artifact(self, record: dict, sign: int = 1):
+        #Ajoute ou retire un artefact individuel (tout artefact enregistré, possédé ou non).
+        self._bump(RARITY_PREFIX + record["rarity"], sign)
+
+    def add_archived(self, summary: dict, sign: int = 1):
+        #Ajoute ou retire un archéologue archivé et ses artefacts (résumé de database.archive) :
+        #archiver ou ramener un joueur ne change pas les totaux.
+        self._bump("archaeologists", sign)
+        self._bump("excavations", sign * summary.get("total_excavations", 0))
+        self._bump("coins", sign * summary.get("coins", 0))
+        self._bump(f"{LEVEL_PREFIX}{summary.get('level', 1)}", sign)
+        for rarity, count in summary.get("rarities", {}).items():
+            self._bump(RARITY_PREFIX + rarity, sign * count)
+
+    def touch(self, names: Iterable[str]):
+        #Marque des compteurs comme modifiés (enregistrés au prochain commit).
+        self._changed.update(names)
+
+    def take_changes(self) -> list[tuple[str, Optional[int]]]:
+        #Compteurs modifiés depuis le dernier appel : [(nom, valeur ou None si nulle)].
+        changes = [(name, self.values.get(name)) for name in sorted(self._changed)]
+        self._changed.clear()
+        return changes
+
+    def summary(self) -> dict:
+        #Statistiques du serveur : totaux, artefacts par rareté et archéologues par niveau.
+        return summarize(self.values)
+
+    @classmethod
+    def rebuild(cls, archaeologists: Iterable[dict], rarity_counts: dict, archived: Iterable[dict] = ()) -> "GlobalCounters":
+        #Recalcule les compteurs à partir des enregistrements (vérification, réparation),
+        #résumés des archéologues archivés compris.
+        counters = cls()
+        for record in archaeologists:
+            counters.add_archaeologist(record)
+        for summary in archived:
+            counters.add_archived(summary)
+        for rarity, count in rarity_counts.items():
+            counters._bump(RARITY_PREFIX + rarity, count)
+        counters._changed.clear()
+        return counters
+
+    def differences(self, actual: "GlobalCounters") -> dict:
+        #Écarts avec les valeurs réelles : {compteur: (enregistré, réel)}.
+        return {
+            name: (self.values.get(name, 0), actual.values.get(name, 0))
+            for name in sorted(self.values.keys() | actual.values.keys())
+            if self.values.get(name, 0) != actual.values.get(name, 0)
+        }
+
+
+def summarize(values: dict) -> dict:
+    #Met en forme des compteurs nommés (GlobalCounters, table SQLite, snapshot).
+    artifacts = {
+        name[len(RARITY_PREFIX):]: count
+        for name, count in values.items()
+        if name.startswith(RARITY_PREFIX) and count
+    }
+    levels = {
+        int(name[len(LEVEL_PREFIX):]): count
+        for name, count in values.items()
+        if name.startswith(LEVEL_PREFIX) and count
+    }
+    return {
+        **{name: values.get(name, 0) for name in TOTALS},
+        "artifacts": artifacts,
+        "total_artifacts": sum(artifacts.values()),
+        "levels": dict(sorted(levels.items())),
+    }
+
+
+def merge_summaries(summaries: Iterable[dict]) -> dict:
+    #Additionne des statistiques de summarize (shards d'une base répartie).
+    values = {}
+    for summary in summaries:
+        names = [
+            *((name, summary[name]) for name in TOTALS),
+            *((RARITY_PREFIX + rarity, count) for rarity, count in summary["artifacts"].items()),
+            *((f"{LEVEL_PREFIX}{level}", count) for level, count in summary["levels"].items()),
+        ]
+        for name, count in names:
+            values[name] = values.get(name, 0) + count
+    return summarize(values)
@@ -1,57 +1,580 @@
-import json
 import os
-import uuid
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Optional, List
 
-from .models import Archaeologist, Artifact
+from .archive import archive_directory, bucket_of, iter_archived, read_bucket, summarize_player, write_bucket
+from .artifact_table import ArtifactTable
+from .counters import GlobalCounters
+from .durability import (
+    IntervalSync,
+    backup_path,
+    check_durability,
+    fsync_directory,
+    fsync_file,
+    read_with_backup,
+    replace_atomically,
+)
+from .ids import SnowflakeGenerator, coerce_artifact_keys, normalize_artifact_ids
+from .indexes import ArtifactIndexes
+from .journal import Journal
+from .leaderboard import LeaderboardIndex
+from .serializers import get_serializer, load_any
+from .models import Archaeologist, Artifact, stack_key
 import config
 
 
+INVENTORY_MODES = ("items", "stacks")
+
+
+def _artifact_count(record: dict) -> int:
+    #Nombre d'artefacts d'un enregistrement d'archéologue (individuels et en piles).
+    return len(record.get("artifacts", ())) + sum(count for count, _ in record.get("stacks", {}).values())
+
+
 class DatabaseManager:
     #Gère la persistance des données en JSON.
+    #Le fichier est lu une seule fois : toutes les lectures sont servies depuis la mémoire
+    #et chaque mutation est persistée sur le disque.
+    #En mode journal, chaque mutation ajoute seulement ses changements à un journal,
+    #replié périodiquement dans le snapshot JSON par un thread de compaction.
+    #Les archéologues inactifs peuvent être déplacés dans une archive compressée
+    #(archive_inactive, voir database.archive) : seul leur résumé reste dans la table
+    #"archive", et ils sont ramenés à leur premier accès.
     
-    def __init__(self, db_path: str = config.DATABASE_PATH):
+    def __init__(
+        self,
+        db_path: str = config.DATABASE_PATH,
+        journal_path: Optional[str] = None,
+        compact_threshold: int = config.JOURNAL_COMPACT_BYTES,
+        serializer=None,
+        worker_id: int = 0,
+        inventory_mode: str = config.INVENTORY_MODE,
+        durability: str = config.DATABASE_DURABILITY,
+    ):
         #Initialise le gestionnaire de base de données.
+        #serializer choisit le format des snapshots (JSON indenté par défaut) ; à la lecture,
+        #le format est détecté automatiquement. worker_id distingue les générateurs d'IDs
+        #d'artefacts de plusieurs processus écrivant dans des bases séparées.
+        #inventory_mode ("items" ou "stacks") choisit comment add_find range les trouvailles.
+        #durability ("always", "interval" ou "os") choisit quand les écritures sont
+        #synchronisées sur le disque (voir database.durability).
+        if inventory_mode not in INVENTORY_MODES:
+            raise ValueError(f"INVENTORY_MODE inconnu: {inventory_mode}")
         self.db_path = db_path
+        self.inventory_mode = inventory_mode
+        self.durability = check_durability(durability)
+        self._syncer = IntervalSync() if durability == "interval" else None
+        self.serializer = serializer or get_serializer()
+        self.compact_threshold = compact_threshold
+        self.write_stats = defaultdict(lambda: {"writes": 0, "bytes": 0})
+        self._compaction_thread: Optional[threading.Thread] = None
+        self._transaction: Optional[dict] = None
+        self._archive_dir = archive_directory(db_path)
+        self._activity: dict[str, float] = {}
+        self._started_at = time.time()
+        self._deferred = False
+        self._pending: dict = {}
+        self._ids = SnowflakeGenerator(worker_id)
         self._ensure_database_exists()
+        self._data = self._read_data()
+        # Compteurs globaux en tête du snapshot : ils se lisent sans parcourir le reste.
+        self._data = {"counters": self._data.pop("counters", {}), **self._data}
+        self._data.setdefault("archive", {})
+        artifacts = self._data["artifacts"]
+        columnar = ArtifactTable.is_snapshot(artifacts)
+        if columnar:
+            self._data["artifacts"] = ArtifactTable.from_snapshot(artifacts)
+        else:
+            # Clés entières avant le rejeu, pour que les suppressions journalisées s'appliquent.
+            self._data["artifacts"] = coerce_artifact_keys(artifacts)
+        
+        self.journal = None
+        replayed = 0
+        if journal_path:
+            self.journal = Journal(journal_path, durability, self._syncer)
+            replayed = self.journal.replay(self._data)
+        
+        migrated = normalize_artifact_ids(self._data)
+        if not columnar:
+            self._data["artifacts"] = ArtifactTable.from_records(self._data["artifacts"].items())
+        if replayed:
+            # Replie immédiatement les commits rejoués pour repartir d'un journal vide.
+            self.compact(background=False)
+        elif migrated or not columnar:
+            # Ancien format (UUID, enregistrements complets) : le snapshot est réécrit une fois.
+            self._save_data(self._data)
+        
+        self._indexes = ArtifactIndexes()
+        self._indexes.rebuild(self._data)
+        self._leaderboard = LeaderboardIndex()
+        for user_id, record in self._data["archaeologists"].items():
+            self._rank(user_id, record)
+        for user_id, summary in self._data["archive"].items():
+            self._rank_archived(user_id, summary)
+        
+        if self._data["counters"]:
+            self._counters = GlobalCounters(self._data["counters"])
+        else:
+            # Base antérieure aux compteurs : ils sont calculés une fois puis enregistrés.
+            self._counters = self._count_records()
+            self._write_counters("rebuild_counters")
+        
+        if self.inventory_mode == "stacks":
+            self._fold_into_stacks()
     
     def _ensure_database_exists(self):
-        #Crée la structure de la base de données si elle n'existe pas.
+        #Crée la structure de la base de données si elle n'existe pas (ni sa sauvegarde :
+        #un arrêt entre les deux renommages d'une sauvegarde ne laisse que le .bak).
         Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
         
-        if not os.path.exists(self.db_path):
+        if not os.path.exists(self.db_path) and not os.path.exists(backup_path(self.db_path)):
             initial_data = {
+                "counters": {},
                 "archaeologists": {},
-                "artifacts": {}
+                "artifacts": ArtifactTable()
             }
             self._save_data(initial_data)
     
+    def _read_data(self) -> dict:
+        #Charge les données du snapshot (JSON, MessagePack, compressé ou non). Un snapshot
+        #illisible (écriture interrompue, somme de contrôle invalide) est mis de côté en
+        #.corrupt et la sauvegarde précédente (.bak) est chargée à sa place. Si aucun des
+        #deux n'est lisible, le démarrage échoue plutôt que de repartir d'une base vide.
+        def load(path: str) -> dict:
+            with open(path, "rb") as f:
+                return load_any(f.read())
+        
+        path, data, errors = read_with_backup(self.db_path, load)
+        if errors:
+            print(f"Snapshot illisible ({errors[0]}), chargement de la sauvegarde {path}")
+            os.replace(self.db_path, f"{self.db_path}.corrupt")
+        elif path != self.db_path:
+            print(f"Snapshot absent, chargement de la sauvegarde {path}")
+        return data
+    
     def _load_data(self) -> dict:
-        #Charge les données du fichier JSON.
+        #Retourne les données en mémoire (chargées au démarrage).
+        return self._data
+    
+    def _save_data(self, data: dict, sync: Optional[bool] = None) -> int:
+        #Sauvegarde les données dans le snapshot (remplacement atomique, somme de contrôle,
+        #ancien snapshot conservé en .bak). Retourne le nombre d'octets écrits.
+        #sync force (ou évite) le fsync ; par défaut, il suit la politique de durabilité.
+        #Une erreur est propagée : les données en mémoire restent à jour et seront
+        #réécrites au prochain commit.
+        payload = self.serializer.dumps(data)
+        if sync is None:
+            sync = self.durability == "always"
         try:
-            with open(self.db_path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception as e:
-            if config.DEBUG:
-                print(f"Erreur lors du chargement: {e}")
-            return {"archaeologists": {}, "artifacts": {}}
-    
-    def _save_data(self, data: dict):
-        #Sauvegarde les données dans le fichier JSON.
+            replace_atomically(self.db_path, payload, sync)
+        except OSError as e:
+            print(f"Erreur lors de la sauvegarde: {e}")
+            raise
+        if not sync and self._syncer is not None:
+            self._syncer.request(self.db_path, self._sync_snapshot)
+        return len(payload)
+    
+    def _sync_snapshot(self):
+        fsync_file(self.db_path)
+        fsync_directory(self.db_path)
+    
+    def _write(self, operation: str, changes: list):
+        #Applique en mémoire les changements (table, clé, enregistrement ou None) d'une
+        #opération, puis les persiste, ou les diffère jusqu'à la fin de la transaction.
+        data = self._load_data()
+        transaction = self._transaction
+        changes = [
+            (table, key, self._stamp(key, record) if table == "archaeologists" and record is not None else record)
+            for table, key, record in changes
+        ]
+        
+        for table, key, record in changes:
+            if transaction is not None and (table, key) not in transaction["undo"]:
+                transaction["undo"][(table, key)] = data[table].get(key)
+            self._set_record(table, key, record)
+        
+        if transaction is None:
+            self._commit(operation, changes)
+        else:
+            for table, key, record in changes:
+                transaction["changes"][(table, key)] = record
+    
+    @contextmanager
+    def transaction(self, operation: str = "transaction"):
+        #Regroupe les mutations du bloc en un seul commit atomique (une seule écriture).
+        #En cas d'exception, les changements en mémoire sont annulés et rien n'est écrit.
+        #Une transaction imbriquée rejoint la transaction englobante.
+        if self._transaction is not None:
+            yield self
+            return
+        
+        transaction = {"changes": {}, "undo": {}}
+        self._transaction = transaction
+        try:
+            yield self
+        except BaseException:
+            for (table, key), record in transaction["undo"].items():
+                self._set_record(table, key, record)
+            raise
+        finally:
+            self._transaction = None
+        
+        if transaction["changes"]:
+            self._commit(operation, [
+                (table, key, record)
+                for (table, key), record in transaction["changes"].items()
+            ])
+    
+    def _set_record(self, table: str, key: str, record: Optional[dict]):
+        #Remplace (ou supprime si None) un enregistrement en mémoire en tenant les index à jour.
+        #Les compteurs globaux suivent chaque remplacement (ancien retiré, nouveau ajouté).
+        records = self._load_data()[table]
+        if table == "artifacts":
+            previous = records.get(key)
+            if previous is not None:
+                self._indexes.remove(key, previous)
+                self._counters.add_artifact(previous, -1)
+            if record is not None:
+                # Seuls les artefacts de la liste de leur découvreur sont indexés (possédés).
+                if self._is_listed(record["discovered_by"], key):
+                    self._indexes.add(key, record)
+                self._counters.add_artifact(record)
+        elif table == "archaeologists":
+            previous = records.get(key)
+            self._index_listed(previous, record)
+            if previous is not None:
+                self._counters.add_archaeologist(previous, -1)
+            if record is not None:
+                self._rank(key, record)
+                self._counters.add_archaeologist(record)
+            elif key not in self._data["archive"]:
+                self._leaderboard.remove(key)
+        elif table == "archive":
+            # Un archéologue archivé reste classé et compté grâce à son résumé.
+            previous = records.get(key)
+            if previous is not None:
+                self._counters.add_archived(previous, -1)
+            if record is not None:
+                self._rank_archived(key, record)
+                self._counters.add_archived(record)
+            elif key not in self._data["archaeologists"]:
+                self._leaderboard.remove(key)
+        
+        if record is None:
+            records.pop(key, None)
+        else:
+            records[key] = record
+    
+    def _is_listed(self, user_id: str, artifact_id: int) -> bool:
+        #Indique si l'artefact figure dans la liste (triée) de l'archéologue.
+        archaeologist = self._data["archaeologists"].get(str(user_id))
+        if archaeologist is None:
+            return False
+        ids = archaeologist.get("artifacts", ())
+        index = bisect_left(ids, artifact_id)
+        return index < len(ids) and ids[index] == artifact_id
+    
+    def _index_listed(self, previous: Optional[dict], record: Optional[dict]):
+        #Indexe les artefacts entrés dans la liste d'un archéologue et désindexe ceux qui
+        #en sont sortis. Cas courant : de nouveaux IDs ajoutés en fin de liste.
+        before = previous.get("artifacts", ()) if previous is not None else ()
+        after = record.get("artifacts", ()) if record is not None else ()
+        if type(before) is type(after) and len(after) >= len(before) and after[:len(before)] == before:
+            added, removed = after[len(before):], ()
+        else:
+            before, after = set(before), set(after)
+            added, removed = after - before, before - after
+        artifacts = self._data["artifacts"]
+        for artifact_id in removed:
+            artifact = artifacts.get(artifact_id)
+            if artifact is not None:
+                self._indexes.remove(artifact_id, artifact)
+        for artifact_id in added:
+            artifact = artifacts.get(artifact_id)
+            if artifact is not None:
+                self._indexes.add(artifact_id, artifact)
+    
+    def _rank(self, user_id: str, record: dict):
+        #Met à jour la position d'un archéologue dans le classement.
+        self._leaderboard.update(
+            user_id,
+            record["username"],
+            record.get("level", 1),
+            record.get("experience", 0),
+            record.get("coins", 0),
+            _artifact_count(record),
+        )
+    
+    def _rank_archived(self, user_id: str, summary: dict):
+        self._leaderboard.update(
+            user_id,
+            summary["username"],
+            summary["level"],
+            summary["experience"],
+            summary["coins"],
+            summary["artifact_count"],
+        )
+    
+    def _commit(self, operation: str, changes: list):
+        #Persiste les changements (table, clé, enregistrement ou None) d'une opération,
+        #avec les compteurs globaux qu'elle a modifiés (dans le même commit).
+        counter_changes = [("counters", name, value) for name, value in self._counters.take_changes()]
+        for _, name, value in counter_changes:
+            if value is None:
+                self._data["counters"].pop(name, None)
+            else:
+                self._data["counters"][name] = value
+        changes = changes + counter_changes
+        
+        if self._deferred:
+            for table, key, record in changes:
+                self._pending[(table, key)] = record
+            return
+        self._persist(operation, changes)
+    
+    def _persist(self, operation: str, changes: list):
+        #Écrit les changements : snapshot complet, ou ajout au journal.
+        if self.journal is None:
+            written = self._save_data(self._data)
+        else:
+            written = self.journal.append(operation, changes)
+        
+        stats = self.write_stats[operation]
+        stats["writes"] += 1
+        stats["bytes"] += written
+        
+        if self.journal is not None and self.journal.size >= self.compact_threshold:
+            self.compact()
+    
+    # ===== Import / export =====
+    
+    def export_data(self) -> dict:
+        #Copie des enregistrements au format du snapshot : {"archaeologists": {user_id: ...},
+        #"artifacts": {artifact_id: ...}} (répartition des shards, voir database.sharding).
+        #Les archéologues archivés y figurent avec leurs artefacts.
+        data = self._load_data()
+        archaeologists = dict(data["archaeologists"])
+        artifacts = dict(data["artifacts"].items())
+        for user_id, entry in iter_archived(self._archive_dir, data["archive"]):
+            archaeologists[user_id] = entry["archaeologist"]
+            artifacts.update((int(artifact_id), record) for artifact_id, record in entry["artifacts"].items())
+        return {"archaeologists": archaeologists, "artifacts": artifacts}
+    
+    def import_data(self, data: dict) -> tuple[int, int]:
+        #Ajoute des enregistrements au format d'export_data en un seul commit.
+        #Retourne (nb_archéologues, nb_artefacts).
+        archaeologists = data.get("archaeologists", {})
+        artifacts = data.get("artifacts", {})
+        with self.transaction("import_data"):
+            self._write("import_data", [
+                *(("archaeologists", str(user_id), record) for user_id, record in archaeologists.items()),
+                *(("artifacts", int(artifact_id), record) for artifact_id, record in artifacts.items()),
+            ])
+        return len(archaeologists), len(artifacts)
+    
+    # ===== Écriture différée =====
+    
+    def defer_writes(self, enabled: bool = True):
+        #Active l'écriture différée : les commits ne sont appliqués qu'en mémoire et
+        #flush() les écrit tous ensemble (voir database.flusher). La désactiver écrit
+        #ceux en attente.
+        if not enabled:
+            self.flush()
+        self._deferred = enabled
+    
+    @property
+    def pending_writes(self) -> int:
+        #Enregistrements modifiés en attente d'écriture.
+        return len(self._pending)
+    
+    def flush(self) -> int:
+        #Écrit en une fois les commits différés (un snapshot, ou une entrée de journal avec
+        #le dernier état de chaque enregistrement). Retourne le nombre d'enregistrements.
+        #En cas d'erreur, ils restent en attente pour le prochain flush.
+        if not self._pending:
+            return 0
+        changes = [(table, key, record) for (table, key), record in self._pending.items()]
+        self._persist("flush", changes)
+        self._pending.clear()
+        return len(changes)
+    
+    def compact(self, background: bool = True):
+        #Replie le journal dans le snapshot JSON.
+        if self.journal is None:
+            return
+        if self._compaction_thread is not None and self._compaction_thread.is_alive():
+            return
+        if self.journal.rotate() is None and not os.path.exists(self.journal.compacting_path):
+            return
+        
+        # Copie superficielle : les enregistrements sont remplacés, jamais modifiés en place.
+        snapshot = {table: records.copy() for table, records in self._data.items()}
+        
+        if background:
+            self._compaction_thread = threading.Thread(
+                target=self._write_snapshot,
+                args=(snapshot,),
+                name="database-compaction",
+                daemon=True,
+            )
+            self._compaction_thread.start()
+        else:
+            self._write_snapshot(snapshot)
+    
+    def _write_snapshot(self, snapshot: dict):
+        # Le journal replié n'est supprimé qu'une fois le snapshot sur le disque (sauf
+        # durabilité "os") ; en cas d'échec, il sera rejoué au prochain démarrage.
         try:
-            with open(self.db_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            if config.DEBUG:
-                print(f"Erreur lors de la sauvegarde: {e}")
+            written = self._save_data(snapshot, sync=self.durability != "os")
+        except OSError:
+            written = 0
+        if written:
+            self.journal.discard_compacted()
+        stats = self.write_stats["compaction"]
+        stats["writes"] += 1
+        stats["bytes"] += written
+    
+    # ===== Archive des inactifs =====
+    
+    def _stamp(self, user_id: str, record: dict) -> dict:
+        #Enregistrement complété de la dernière activité connue de l'archéologue (secondes).
+        last_active = self._activity.get(user_id)
+        if last_active is None or record.get("last_active") == int(last_active):
+            return record
+        return {**record, "last_active": int(last_active)}
+    
+    def _activate(self, user_id: str) -> str:
+        #Note l'activité d'un archéologue et le ramène de l'archive s'il y est.
+        user_id = str(user_id)
+        self._activity[user_id] = time.time()
+        if user_id in self._load_data()["archive"]:
+            self._rehydrate(user_id)
+        return user_id
+    
+    def touch(self, user_id: str):
+        #Note l'activité d'un archéologue servi sans lire la base (cache des archéologues).
+        #Un joueur en cache n'est jamais archivé : le cache est vidé après un archivage.
+        self._activity[str(user_id)] = time.time()
+    
+    def _rehydrate(self, user_id: str):
+        #Ramène un archéologue archivé et ses artefacts dans la base active (un commit).
+        entry = next((entry for _, entry in iter_archived(self._archive_dir, [user_id])), None)
+        if entry is None:
+            raise ValueError(f"Archéologue {user_id} introuvable dans l'archive {self._archive_dir}")
+        self._write("rehydrate", [
+            ("archive", user_id, None),
+            ("archaeologists", user_id, entry["archaeologist"]),
+            *(("artifacts", int(artifact_id), record) for artifact_id, record in entry["artifacts"].items()),
+        ])
+    
+    def archive_inactive(self, max_idle_days: float = config.ARCHIVE_AFTER_DAYS) -> int:
+        #Déplace dans l'archive, avec leurs artefacts, les archéologues inactifs depuis
+        #max_idle_days jours (sans activité connue : depuis le démarrage). Les fichiers de
+        #l'archive sont écrits avant le commit : un arrêt entre les deux laisse les joueurs
+        #dans la base active. Retourne le nombre d'archéologues archivés.
+        if max_idle_days <= 0 or self._transaction is not None:
+            return 0
+        data = self._load_data()
+        cutoff = time.time() - max_idle_days * 86400
+        idle = {}
+        for user_id, record in data["archaeologists"].items():
+            last_active = self._activity.get(user_id) or record.get("last_active") or self._started_at
+            if last_active < cutoff:
+                idle.setdefault(bucket_of(user_id), []).append((user_id, record, last_active))
+        if not idle:
+            return 0
+        
+        # Les copies de joueurs revenus depuis (sans résumé) sont retirées des fichiers
+        # réécrits, sauf si des commits différés ne sont pas encore sur le disque.
+        prune = not self._pending
+        changes = []
+        for bucket, players in idle.items():
+            entries = read_bucket(self._archive_dir, bucket)
+            if prune:
+                entries = {user_id: entry for user_id, entry in entries.items() if user_id in data["archive"]}
+            for user_id, record, last_active in players:
+                artifacts = {
+                    artifact_id: data["artifacts"][artifact_id]
+                    for artifact_id in record.get("artifacts", ())
+                    if artifact_id in data["artifacts"]
+                }
+                entries[user_id] = {"archaeologist": record, "artifacts": artifacts}
+                changes.append(("archaeologists", user_id, None))
+                changes.extend(("artifacts", artifact_id, None) for artifact_id in artifacts)
+                changes.append(("archive", user_id, summarize_player(record, artifacts, last_active)))
+            write_bucket(self._archive_dir, bucket, entries, sync=self.durability != "os")
+        
+        self._write("archive_inactive", changes)
+        archived = [user_id for players in idle.values() for user_id, _, _ in players]
+        for user_id in archived:
+            self._activity.pop(user_id, None)
+        return len(archived)
+    
+    # ===== Compteurs globaux =====
+    
+    def _count_records(self) -> GlobalCounters:
+        #Recalcule les compteurs globaux en parcourant toute la base (résumés archivés compris).
+        data = self._load_data()
+        return GlobalCounters.rebuild(
+            data["archaeologists"].values(),
+            data["artifacts"].rarity_counts(),
+            data["archive"].values(),
+        )
+    
+    def _write_counters(self, operation: str):
+        #Enregistre tous les compteurs (après un recalcul complet).
+        self._counters.touch(self._data["counters"].keys() | self._counters.values.keys())
+        self._commit(operation, [])
+    
+    def get_global_stats(self) -> dict:
+        #Statistiques du serveur, lues dans les compteurs globaux (sans parcours).
+        return self._counters.summary()
+    
+    def verify_counters(self) -> dict:
+        #Compare les compteurs aux données. Retourne les écarts {compteur: (enregistré, réel)}.
+        return self._counters.differences(self._count_records())
+    
+    def rebuild_counters(self) -> dict:
+        #Recalcule et enregistre les compteurs. Retourne les écarts corrigés.
+        actual = self._count_records()
+        differences = self._counters.differences(actual)
+        self._counters = actual
+        self._write_counters("rebuild_counters")
+        return differences
+    
+    def get_write_stats(self) -> dict:
+        #Retourne, par opération, le nombre d'écritures et d'octets écrits (moyenne incluse).
+        return {
+            operation: {
+                **stats,
+                "bytes_per_write": stats["bytes"] // stats["writes"] if stats["writes"] else 0,
+            }
+            for operation, stats in self.write_stats.items()
+        }
+    
+    def close(self):
+        #Écrit les commits différés, attend la compaction en cours, ferme le journal et
+        #termine les synchronisations.
+        self.flush()
+        if self._compaction_thread is not None:
+            self._compaction_thread.join()
+        if self.journal is not None:
+            self.journal.close()
+        if self._syncer is not None:
+            self._syncer.close()
     
     # ===== Archéologues =====
     
     def get_archaeologist(self, user_id: str) -> Optional[Archaeologist]:
-        #Récupère un archéologue par son ID utilisateur.#
+        #Récupère un archéologue par son ID utilisateur (ramené de l'archive si besoin).#
         data = self._load_data()
-        archaeologist_data = data["archaeologists"].get(str(user_id))
+        archaeologist_data = data["archaeologists"].get(self._activate(user_id))
         
         if archaeologist_data:
             return Archaeologist.from_dict(archaeologist_data)
@@ -60,32 +583,96 @@ class DatabaseManager:
     def create_archaeologist(self, user_id: str, username: str) -> Archaeologist:
         #Crée un nouvel archéologue.
         archaeologist = Archaeologist(
-            user_id=str(user_id),
+            user_id=self._activate(user_id),
             username=username
         )
         
-        data = self._load_data()
-        data["archaeologists"][str(user_id)] = archaeologist.to_dict()
-        self._save_data(data)
+        self._write("create_archaeologist", [
+            ("archaeologists", str(user_id), archaeologist.to_dict()),
+        ])
         
         return archaeologist
     
     def save_archaeologist(self, archaeologist: Archaeologist):
         #Sauvegarde les données d'un archéologue.
-        data = self._load_data()
-        data["archaeologists"][archaeologist.user_id] = archaeologist.to_dict()
-        self._save_data(data)
+        self._write("save_archaeologist", [
+            ("archaeologists", self._activate(archaeologist.user_id), archaeologist.to_dict()),
+        ])
     
     def get_all_archaeologists(self) -> List[Archaeologist]:
-        #Récupère tous les archéologues.
+        #Récupère tous les archéologues (les archivés sont lus dans l'archive, sans les ramener).
         data = self._load_data()
-        return [
+        archaeologists = [
             Archaeologist.from_dict(a)
             for a in data["archaeologists"].values()
         ]
+        archaeologists.extend(
+            Archaeologist.from_dict(entry["archaeologist"])
+            for _, entry in iter_archived(self._archive_dir, data["archive"])
+        )
+        return archaeologists
     
     # ===== Artefacts =====
     
+    def create_artifacts(self, finds: List[tuple], discovered_by: str) -> List[Artifact]:
+        #Crée plusieurs artefacts (name, rarity, description, value) en une seule écriture.
+        #Ils n'appartiennent au découvreur qu'une fois ajoutés à sa liste et sauvegardés.
+        discovered_by = self._activate(discovered_by)
+        artifacts = [
+            Artifact(name, rarity, description, value, discovered_by, artifact_id=self._ids.next_id())
+            for name, rarity, description, value in finds
+        ]
+        self._write("create_artifacts", [
+            ("artifacts", artifact.artifact_id, artifact.to_dict())
+            for artifact in artifacts
+        ])
+        return artifacts
+    
+    def add_finds(self, archaeologist: Archaeologist, finds: List[tuple]) -> List[Artifact]:
+        #Range des trouvailles (name, rarity, description, value) dans l'inventaire de
+        #l'archéologue selon le mode d'inventaire : nouveaux artefacts enregistrés ("items")
+        #ou piles incrémentées ("stacks", les artefacts retournés ne sont pas enregistrés).
+        #L'archéologue doit ensuite être sauvegardé.
+        user_id = str(archaeologist.user_id)
+        if self.inventory_mode == "stacks":
+            for name, rarity, _, value in finds:
+                archaeologist.add_to_stack(name, rarity, value)
+            return [Artifact(name, rarity, description, value, user_id) for name, rarity, description, value in finds]
+        
+        artifacts = self.create_artifacts(finds, user_id)
+        for artifact in artifacts:
+            archaeologist.add_artifact(artifact.artifact_id)
+        return artifacts
+    
+    def add_find(
+        self,
+        archaeologist: Archaeologist,
+        name: str,
+        rarity: str,
+        description: str,
+        value: int,
+    ) -> Artifact:
+        #Range une seule trouvaille (voir add_finds).
+        return self.add_finds(archaeologist, [(name, rarity, description, value)])[0]
+    
+    def _fold_into_stacks(self):
+        #Regroupe en piles les artefacts individuels restants (passage au mode "stacks").
+        data = self._load_data()
+        with self.transaction("fold_into_stacks"):
+            for user_id, record in list(data["archaeologists"].items()):
+                owned = list(self._indexes.owned(user_id))
+                if not owned:
+                    continue
+                archaeologist = Archaeologist.from_dict(record)
+                changes = []
+                for artifact_id in owned:
+                    artifact = data["artifacts"][artifact_id]
+                    archaeologist.add_to_stack(artifact["name"], artifact["rarity"], int(artifact["value"]))
+                    archaeologist.artifacts.discard(artifact_id)
+                    changes.append(("artifacts", artifact_id, None))
+                changes.append(("archaeologists", user_id, archaeologist.to_dict()))
+                self._write("fold_into_stacks", changes)
+    
     def create_artifact(
         self, 
         name: str, 
@@ -94,24 +681,29 @@ class DatabaseManager:
         value: int, 
         discovered_by: str
     ) -> Artifact:
-        #Crée un nouvel artefact.
+        #Crée un nouvel artefact (sans propriétaire, voir create_artifacts).
+        discovered_by = self._activate(discovered_by)
         artifact = Artifact(
             name=name,
             rarity=rarity,
             description=description,
             value=value,
             discovered_by=discovered_by,
-            artifact_id=str(uuid.uuid4())
+            artifact_id=self._ids.next_id()
         )
         
-        data = self._load_data()
-        data["artifacts"][artifact.artifact_id] = artifact.to_dict()
-        self._save_data(data)
+        self._write("create_artifact", [
+            ("artifacts", artifact.artifact_id, artifact.to_dict()),
+        ])
         
         return artifact
     
-    def get_artifact(self, artifact_id: str) -> Optional[Artifact]:
+    def get_artifact(self, artifact_id: int) -> Optional[Artifact]:
         #Récupère un artefact par son ID.
+        try:
+            artifact_id = int(artifact_id)
+        except (TypeError, ValueError):
+            return None
         data = self._load_data()
         artifact_data = data["artifacts"].get(artifact_id)
         
@@ -119,58 +711,91 @@ class DatabaseManager:
             return Artifact.from_dict(artifact_data)
         return None
     
+    def get_artifacts(self, artifact_ids) -> List[Artifact]:
+        #Récupère plusieurs artefacts par leurs IDs (les IDs inconnus sont ignorés).
+        records = self._load_data()["artifacts"]
+        return [
+            Artifact.from_dict(records[artifact_id])
+            for artifact_id in artifact_ids
+            if artifact_id in records
+        ]
+    
     def get_archaeologist_artifacts(self, user_id: str) -> List[Artifact]:
-        #Récupère tous les artefacts d'un archéologue.
-        archaeologist = self.get_archaeologist(str(user_id))
-        if not archaeologist:
-            return []
-        
-        data = self._load_data()
-        artifacts = []
-        for artifact_id in archaeologist.artifacts:
-            artifact_data = data["artifacts"].get(artifact_id)
-            if artifact_data:
-                artifacts.append(Artifact.from_dict(artifact_data))
-        
-        return artifacts
+        #Récupère tous les artefacts d'un archéologue (index propriétaire).
+        return self.get_artifacts(self._indexes.owned(self._activate(user_id)))
+    
+    def get_archaeologist_artifacts_by_rarity(self, user_id: str) -> dict[str, List[Artifact]]:
+        #Récupère les artefacts d'un archéologue groupés par rareté (index propriétaire/rareté).
+        user_id = self._activate(user_id)
+        return {
+            rarity: self.get_artifacts(self._indexes.owned_with_rarity(user_id, rarity))
+            for rarity in config.RARITY_LEVELS
+        }
 
     # ===== Ventes d'artefacts =====
 
-    def sell_single_artifact(self, user_id: str, artifact_name: str) -> tuple[int, Optional[str]]:
+    def sell_single_artifact(self, user_id: str, artifact_name: str) -> tuple[int, Optional[int]]:
         #Vend un artefact par son nom (insensible à la casse). Retourne (coins_gagnés, artifact_id).
+        #Le plus ancien artefact portant ce nom est trouvé via l'index (propriétaire, nom) ;
+        #à défaut, un artefact est retiré de la pile de ce nom la moins rare (artifact_id None).
         data = self._load_data()
-        archaeologist = data["archaeologists"].get(str(user_id))
+        archaeologist = data["archaeologists"].get(self._activate(user_id))
         if not archaeologist:
             return 0, None
 
-        remaining_artifacts = []
-        coins_gained = 0
-        sold_id = None
-
-        for artifact_id in archaeologist.get("artifacts", []):
-            artifact_data = data["artifacts"].get(artifact_id)
-            if artifact_data and artifact_data["name"].lower() == artifact_name.lower() and not sold_id:
-                coins_gained += int(artifact_data.get("value", 0))
-                sold_id = artifact_id
-                # On retire l'artefact vendu de la base
-                data["artifacts"].pop(artifact_id, None)
-            else:
-                remaining_artifacts.append(artifact_id)
+        sold_id = next(iter(self._indexes.owned_with_name(user_id, artifact_name)), None)
+        if sold_id is None:
+            return self._sell_from_stack(user_id, archaeologist, artifact_name), None
 
+        coins_gained = int(data["artifacts"][sold_id].get("value", 0))
         if coins_gained == 0:
             return 0, None
 
-        archaeologist["artifacts"] = remaining_artifacts
-        archaeologist["coins"] = archaeologist.get("coins", 0) + coins_gained
-        data["archaeologists"][str(user_id)] = archaeologist
-        self._save_data(data)
+        remaining_artifacts = array("q", archaeologist.get("artifacts", ()))
+        if sold_id in remaining_artifacts:
+            remaining_artifacts.remove(sold_id)
+
+        # On retire l'artefact vendu de la base
+        archaeologist = {
+            **archaeologist,
+            "artifacts": remaining_artifacts,
+            "coins": archaeologist.get("coins", 0) + coins_gained,
+        }
+        self._write("sell_single_artifact", [
+            ("artifacts", sold_id, None),
+            ("archaeologists", str(user_id), archaeologist),
+        ])
 
         return coins_gained, sold_id
 
+    def _sell_from_stack(self, user_id: str, archaeologist: dict, artifact_name: str) -> int:
+        #Vend un artefact d'une pile au prix moyen de la pile. Retourne les coins gagnés.
+        stacks = Archaeologist.from_dict(archaeologist).get_stacks()
+        stack = next((s for s in stacks if s.name.lower() == artifact_name.lower()), None)
+        if stack is None or stack.unit_value == 0:
+            return 0
+
+        coins_gained = stack.total_value if stack.count == 1 else stack.unit_value
+        remaining_stacks = dict(archaeologist.get("stacks", {}))
+        key = stack_key(stack.rarity, stack.name)
+        if stack.count == 1:
+            del remaining_stacks[key]
+        else:
+            remaining_stacks[key] = [stack.count - 1, stack.total_value - coins_gained]
+
+        archaeologist = {
+            **archaeologist,
+            "stacks": remaining_stacks,
+            "coins": archaeologist.get("coins", 0) + coins_gained,
+        }
+        self._write("sell_single_artifact", [("archaeologists", str(user_id), archaeologist)])
+        return coins_gained
+
     def sell_artifacts_by_rarity(self, user_id: str, max_rarity: str) -> tuple[int, int]:
-        #Vend tous les artefacts d'une rareté <= max_rarity. Retourne (coins_gagnés, nb_vendus).
+        #Vend tous les artefacts (et piles) d'une rareté <= max_rarity.
+        #Retourne (coins_gagnés, nb_vendus).
         data = self._load_data()
-        archaeologist = data["archaeologists"].get(str(user_id))
+        archaeologist = data["archaeologists"].get(self._activate(user_id))
         if not archaeologist:
             return 0, 0
 
@@ -178,43 +803,64 @@ class DatabaseManager:
             return 0, 0
 
         max_index = config.RARITY_LEVELS.index(max_rarity)
-        allowed = set(config.RARITY_LEVELS[: max_index + 1])
-
-        remaining_artifacts = []
-        coins_gained = 0
-        sold_count = 0
-
-        for artifact_id in archaeologist.get("artifacts", []):
-            artifact_data = data["artifacts"].get(artifact_id)
-            if artifact_data and artifact_data.get("rarity") in allowed:
-                coins_gained += int(artifact_data.get("value", 0))
-                sold_count += 1
-                data["artifacts"].pop(artifact_id, None)
-            else:
-                remaining_artifacts.append(artifact_id)
+        allowed = config.RARITY_LEVELS[: max_index + 1]
 
-        if sold_count == 0:
+        # Seuls les artefacts vendus sont parcourus, via l'index (propriétaire, rareté)
+        sold_ids = [
+            artifact_id
+            for rarity in allowed
+            for artifact_id in self._indexes.owned_with_rarity(user_id, rarity)
+        ]
+        stacks = archaeologist.get("stacks", {})
+        sold_stacks = [key for key in stacks if key.split("|", 1)[0] in allowed]
+        if not sold_ids and not sold_stacks:
             return 0, 0
 
-        archaeologist["artifacts"] = remaining_artifacts
-        archaeologist["coins"] = archaeologist.get("coins", 0) + coins_gained
-        data["archaeologists"][str(user_id)] = archaeologist
-        self._save_data(data)
+        coins_gained = sum(int(data["artifacts"][artifact_id].get("value", 0)) for artifact_id in sold_ids)
+        coins_gained += sum(stacks[key][1] for key in sold_stacks)
+        sold_count = len(sold_ids) + sum(stacks[key][0] for key in sold_stacks)
+        sold = set(sold_ids)
+        remaining_artifacts = array("q", (
+            artifact_id
+            for artifact_id in archaeologist.get("artifacts", ())
+            if artifact_id not in sold
+        ))
+
+        archaeologist = {
+            **archaeologist,
+            "artifacts": remaining_artifacts,
+            "stacks": {key: stack for key, stack in stacks.items() if key not in sold_stacks},
+            "coins": archaeologist.get("coins", 0) + coins_gained,
+        }
+        self._write("sell_artifacts_by_rarity", [
+            *(("artifacts", artifact_id, None) for artifact_id in sold_ids),
+            ("archaeologists", str(user_id), archaeologist),
+        ])
 
         return coins_gained, sold_count
     
-    def get_leaderboard(self, limit: int = 10) -> List[tuple]:
-        #Récupère le classement par niveau, expérience et pièces.
-        archaeologists = self.get_all_archaeologists()
-        sorted_archaeologists = sorted(
-            archaeologists,
-            key=lambda a: (a.level, a.experience, a.coins),
-            reverse=True
-        )
-        return [
-            (a.username, a.level, a.experience, a.coins, len(a.artifacts))
-            for a in sorted_archaeologists[:limit]
-        ]
+    def get_leaderboard(self, limit: int = 10, offset: int = 0) -> List[tuple]:
+        #Récupère le classement par niveau, expérience et pièces (rangs offset+1 à offset+limit).
+        return self._leaderboard.top(limit, offset)
+    
+    def get_rank(self, user_id: str) -> Optional[int]:
+        #Récupère le rang (à partir de 1) d'un archéologue, ou None s'il n'existe pas.
+        #Les ex æquo partagent le rang. O(log n) (skiplist du classement).
+        return self._leaderboard.rank(user_id)
+    
+    def get_rank_key(self, user_id: str) -> Optional[tuple]:
+        #(niveau, expérience, pièces) d'un archéologue classé, archivé compris (sans le
+        #ramener de l'archive), ou None.
+        return self._leaderboard.score(user_id)
+    
+    def count_ahead(self, level: int, experience: int, coins: int) -> int:
+        #Nombre d'archéologues classés devant ces valeurs (rang dans une base répartie).
+        return self._leaderboard.count_ahead(level, experience, coins)
+    
+    def count_archaeologists(self) -> int:
+        #Nombre d'archéologues enregistrés (archivés compris).
+        data = self._load_data()
+        return len(data["archaeologists"]) + len(data["archive"])
     
     def get_pickaxe(self, user_id: str) -> str:
         """Récupère la pioche actuelle de l'archéologue."""
@@ -249,3 +895,36 @@ class DatabaseManager:
         
         self.save_archaeologist(archaeologist)
         return True, f"Vous avez acheté la pioche **{pickaxe_info['name']}** (Coût: {cost} 🪙)\nAncienne pioche: {config.PICKAXES[old_pickaxe]['name']}"
+
+
+_shared_manager = None
+_shared_lock = threading.Lock()
+
+
+def create_database():
+    #Crée le gestionnaire correspondant à config.DATABASE_TYPE (réparti si DATABASE_SHARDS).
+    if config.DATABASE_SHARDS:
+        from .sharding import open_sharded_database
+        return open_sharded_database()
+    if config.DATABASE_TYPE == "sqlite":
+        from .sqlite_manager import open_sqlite_database
+        return open_sqlite_database()
+    serializer = get_serializer(config.DATABASE_FORMAT, config.DATABASE_COMPRESSION)
+    if config.DATABASE_TYPE == "json":
+        return DatabaseManager(config.DATABASE_PATH, serializer=serializer)
+    if config.DATABASE_TYPE == "journal":
+        return DatabaseManager(
+            config.DATABASE_PATH,
+            journal_path=config.JOURNAL_PATH,
+            serializer=serializer,
+        )
+    raise ValueError(f"DATABASE_TYPE inconnu: {config.DATABASE_TYPE}")
+
+
+def get_database():
+    #Retourne le gestionnaire partagé par tout le processus (créé au premier appel).
+    global _shared_manager
+    with _shared_lock:
+        if _shared_manager is None:
+            _shared_manager = create_database()
+        return _shared_manager
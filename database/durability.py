@@ -0,0 +1,124 @@
+#Écritures sûres en cas d'arrêt brutal : remplacement atomique des snapshots, sauvegarde
+#de repli et synchronisation sur le disque (fsync) selon la politique de durabilité.
+
+import os
+import threading
+from typing import Callable, Optional
+
+import config
+
+
+# "always" : fsync à chaque commit ; "interval" : fsync groupé par IntervalSync ;
+# "os" : jamais de fsync, le système écrit les données quand il le décide.
+DURABILITY_MODES = ("always", "interval", "os")
+
+
+def check_durability(durability: str) -> str:
+    if durability not in DURABILITY_MODES:
+        raise ValueError(f"DATABASE_DURABILITY inconnu: {durability}")
+    return durability
+
+
+def backup_path(path: str) -> str:
+    #Snapshot précédent, conservé comme repli.
+    return f"{path}.bak"
+
+
+def read_with_backup(path: str, read: Callable):
+    #Lit path avec read(chemin), ou à défaut sa sauvegarde (.bak) si path est absent ou
+    #illisible. Retourne (chemin lu, résultat, erreurs rencontrées) ; ValueError si aucun
+    #des deux n'est lisible.
+    errors = []
+    for candidate in (path, backup_path(path)):
+        try:
+            result = read(candidate)
+        except FileNotFoundError:
+            continue
+        except Exception as e:
+            errors.append(f"{candidate}: {e}")
+            continue
+        return candidate, result, errors
+    raise ValueError(f"Base de données illisible: {'; '.join(errors) or path}")
+
+
+def fsync_file(path: str):
+    #Force l'écriture sur le disque du contenu d'un fichier.
+    with open(path, "rb+") as f:
+        os.fsync(f.fileno())
+
+
+def fsync_directory(path: str):
+    #Rend durable un renommage dans le répertoire d'un fichier (sans effet sous Windows).
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def replace_atomically(path: str, payload: bytes, sync: bool):
+    #Écrit payload dans un fichier temporaire puis le renomme en path : un arrêt brutal
+    #laisse l'ancien ou le nouveau snapshot, jamais un fichier tronqué. L'ancien snapshot
+    #devient la sauvegarde de repli (.bak). sync : fsync du fichier et du répertoire.
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+        if sync:
+            f.flush()
+            os.fsync(f.fileno())
+    if os.path.exists(path):
+        os.replace(path, backup_path(path))
+    os.replace(tmp_path, path)
+    if sync:
+        fsync_directory(path)
+
+
+class IntervalSync:
+    #Synchronisation groupée ("interval") : les fichiers modifiés sont signalés avec
+    #request() et un thread les synchronise au plus une fois par intervalle. Tous les
+    #commits d'un intervalle partagent ainsi le même fsync.
+
+    def __init__(self, interval_ms: int = config.DATABASE_FSYNC_INTERVAL_MS):
+        self.interval = max(interval_ms, 1) / 1000
+        self._pending: dict[str, Callable[[], None]] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+    def request(self, key: str, sync: Callable[[], None]):
+        #Demande la synchronisation d'un fichier (une seule par clé et par intervalle).
+        with self._lock:
+            self._pending[key] = sync
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(target=self._run, name="database-fsync", daemon=True)
+                self._thread.start()
+
+    def flush(self):
+        #Synchronise immédiatement les fichiers en attente.
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for sync in pending.values():
+            try:
+                sync()
+            except OSError as e:
+                print(f"Erreur lors de la synchronisation du disque: {e}")
+
+    def _run(self):
+        while not self._wake.wait(self.interval):
+            self.flush()
+
+    def close(self):
+        #Arrête le thread après une dernière synchronisation.
+        with self._lock:
+            self._closed = True
+            thread = self._thread
+        self._wake.set()
+        if thread is not None:
+            thread.join()
+        self.flush()
@@ -0,0 +1,83 @@
+#Écriture groupée : les commits du bot s'accumulent en mémoire et sont écrits ensemble.
+
+import asyncio
+import contextlib
+from typing import Optional
+
+import config
+
+
+class WriteFlusher:
+    #Tâche de la boucle asyncio du bot qui écrit les commits différés du stockage au plus
+    #une fois par fenêtre (window_ms après la première modification en attente), ou dès
+    #que max_pending enregistrements attendent. Une rafale de commandes coûte ainsi une
+    #seule écriture au lieu d'une par commande. Les commits de la fenêtre en cours sont
+    #perdus en cas d'arrêt brutal ; un arrêt normal les écrit (AsyncDatabaseManager.close).
+
+    def __init__(
+        self,
+        database,
+        window_ms: int = config.DATABASE_FLUSH_WINDOW_MS,
+        max_pending: int = config.DATABASE_FLUSH_MAX_PENDING,
+    ):
+        #database : AsyncDatabaseManager dont le gestionnaire diffère ses écritures.
+        self.database = database
+        self.window = window_ms / 1000
+        self.max_pending = max(max_pending, 1)
+        self._dirty = asyncio.Event()
+        self._full = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.flushes = 0
+        self.records = 0
+        self.max_batch = 0
+
+    def start(self):
+        #Démarre la tâche sur la boucle en cours.
+        self._task = asyncio.get_running_loop().create_task(self._run(), name="database-flusher")
+
+    def notify(self, pending: int):
+        #Signale le nombre d'enregistrements en attente après une opération.
+        if pending:
+            self._dirty.set()
+        if pending >= self.max_pending:
+            self._full.set()
+
+    async def _run(self):
+        while True:
+            await self._dirty.wait()
+            try:
+                await asyncio.wait_for(self._full.wait(), self.window)
+            except asyncio.TimeoutError:
+                pass
+            self._dirty.clear()
+            self._full.clear()
+            try:
+                written = await self.database.flush()
+            except Exception as e:
+                # Les commits restent en attente : nouvel essai à la fenêtre suivante.
+                print(f"Erreur lors de l'écriture groupée: {e}")
+                self._dirty.set()
+                continue
+            if written:
+                self.flushes += 1
+                self.records += written
+                self.max_batch = max(self.max_batch, written)
+
+    async def stop(self):
+        #Arrête la tâche. Les commits encore en attente sont écrits par la fermeture du
+        #gestionnaire.
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    def get_stats(self) -> dict:
+        #Écritures groupées effectuées et enregistrements écrits.
+        return {
+            "flushes": self.flushes,
+            "records": self.records,
+            "max_batch": self.max_batch,
+            "records_per_flush": self.records / self.flushes if self.flushes else 0.0,
+        }
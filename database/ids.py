@@ -0,0 +1,138 @@
+#Identifiants compacts d'artefacts (style snowflake) et migration des anciens UUID.
+
+import threading
+import time
+from array import array
+from datetime import datetime
+
+
+# 41 bits de millisecondes depuis EPOCH_MS, 10 bits de worker, 12 bits de séquence.
+EPOCH_MS = 1735689600000  # 2025-01-01T00:00:00Z
+WORKER_BITS = 10
+SEQUENCE_BITS = 12
+MAX_WORKER = (1 << WORKER_BITS) - 1
+SEQUENCE_MASK = (1 << SEQUENCE_BITS) - 1
+TIMESTAMP_SHIFT = WORKER_BITS + SEQUENCE_BITS
+
+# Worker réservé aux identifiants attribués aux anciens artefacts (UUID).
+LEGACY_WORKER = MAX_WORKER
+
+
+def compose_id(timestamp_ms: int, worker_id: int, sequence: int) -> int:
+    #Assemble un identifiant à partir de ses trois composantes.
+    return (max(0, timestamp_ms - EPOCH_MS) << TIMESTAMP_SHIFT) | (worker_id << SEQUENCE_BITS) | sequence
+
+
+def id_worker(artifact_id: int) -> int:
+    #Worker (shard, processus) qui a attribué un identifiant.
+    return (artifact_id >> SEQUENCE_BITS) & MAX_WORKER
+
+
+def id_timestamp(artifact_id: int) -> float:
+    #Instant de création (secondes epoch Unix) encodé dans un identifiant.
+    return ((artifact_id >> TIMESTAMP_SHIFT) + EPOCH_MS) / 1000
+
+
+class SnowflakeGenerator:
+    #Génère des identifiants entiers 63 bits, uniques par worker et croissants dans le temps.
+
+    def __init__(self, worker_id: int = 0):
+        if not 0 <= worker_id < LEGACY_WORKER:
+            raise ValueError(f"worker_id doit être compris entre 0 et {LEGACY_WORKER - 1}")
+        self.worker_id = worker_id
+        self._lock = threading.Lock()
+        self._last_ms = 0
+        self._sequence = 0
+
+    def next_id(self) -> int:
+        #Retourne un nouvel identifiant, strictement supérieur au précédent.
+        with self._lock:
+            now = int(time.time() * 1000)
+            if now <= self._last_ms:
+                # Même milliseconde (ou horloge reculée) : on avance la séquence.
+                now = self._last_ms
+                self._sequence = (self._sequence + 1) & SEQUENCE_MASK
+                if self._sequence == 0:
+                    now += 1
+            else:
+                self._sequence = 0
+            self._last_ms = now
+            return compose_id(now, self.worker_id, self._sequence)
+
+
+def _legacy_timestamp_ms(record: dict) -> int:
+    try:
+        return int(datetime.fromisoformat(record["discovered_at"]).timestamp() * 1000)
+    except (KeyError, TypeError, ValueError):
+        return int(time.time() * 1000)
+
+
+def remap_legacy_ids(legacy: list) -> dict:
+    #Attribue un identifiant à chaque ancien artefact (clé, enregistrement), daté de sa
+    #découverte pour conserver l'ordre chronologique. Retourne {ancienne clé: nouvel ID}.
+    remapped = {}
+    sequences = {}
+    for key, record in sorted(legacy, key=lambda item: item[1].get("discovered_at") or ""):
+        timestamp = _legacy_timestamp_ms(record)
+        sequence = sequences.get(timestamp, 0)
+        while sequence > SEQUENCE_MASK:
+            timestamp += 1
+            sequence = sequences.get(timestamp, 0)
+        sequences[timestamp] = sequence + 1
+        remapped[key] = compose_id(timestamp, LEGACY_WORKER, sequence)
+    return remapped
+
+
+def coerce_artifact_keys(artifacts: dict) -> dict:
+    #Convertit en entiers les clés numériques (les clés JSON sont toujours du texte).
+    return {
+        int(key) if isinstance(key, str) and key.isdigit() else key: record
+        for key, record in artifacts.items()
+    }
+
+
+def _normalize_artifact_keys(data: dict) -> dict:
+    #Clés entières et anciens UUID remplacés. Retourne {ancienne clé: nouvel ID}.
+    artifacts = {}
+    legacy = []
+    for key, record in coerce_artifact_keys(data["artifacts"]).items():
+        if not isinstance(key, int):
+            legacy.append((key, record))
+            continue
+        record["artifact_id"] = key
+        artifacts[key] = record
+
+    remapped = remap_legacy_ids(legacy)
+    for key, record in legacy:
+        artifact_id = remapped[key]
+        record["artifact_id"] = artifact_id
+        artifacts[artifact_id] = record
+
+    data["artifacts"] = artifacts
+    return remapped
+
+
+def normalize_artifact_ids(data: dict) -> int:
+    #Prépare des données chargées pour le stockage en mémoire :
+    #- clés d'artefacts converties en entiers (JSON ne connaît que des clés texte) ;
+    #- anciens UUID remplacés par des identifiants datés de leur découverte ;
+    #- collections des archéologues stockées en array('q') triés.
+    #Une table d'artefacts en colonnes n'a jamais d'anciens UUID : seules les collections
+    #sont alors converties.
+    #Retourne le nombre d'artefacts dont l'identifiant a été remplacé.
+    remapped = {}
+    if isinstance(data["artifacts"], dict):
+        remapped = _normalize_artifact_keys(data)
+
+    for record in data["archaeologists"].values():
+        owned = []
+        for artifact_id in record.get("artifacts", ()):
+            if artifact_id in remapped:
+                owned.append(remapped[artifact_id])
+            elif isinstance(artifact_id, int) or artifact_id.isdigit():
+                owned.append(int(artifact_id))
+            # Sinon : UUID sans artefact correspondant, la référence était déjà morte.
+        owned.sort()
+        record["artifacts"] = array("q", owned)
+
+    return len(remapped)
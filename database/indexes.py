@@ -0,0 +1,68 @@
+#Index secondaires en mémoire sur les artefacts.
+
+from typing import Iterable
+
+
+class ArtifactIndexes:
+    #Index propriétaire → artefacts, (propriétaire, rareté) → artefacts et
+    #(propriétaire, nom en minuscules) → artefacts.
+    #Chaque entrée est un dict utilisé comme ensemble ordonné : les artefacts y restent
+    #dans l'ordre de découverte, et ajout/suppression se font en O(1).
+    #Le propriétaire d'un artefact est son découvreur (champ discovered_by) ; seuls les
+    #artefacts de la liste `artifacts` de leur découvreur sont indexés.
+
+    def __init__(self):
+        self.by_owner: dict[str, dict[str, None]] = {}
+        self.by_rarity: dict[tuple[str, str], dict[str, None]] = {}
+        self.by_name: dict[tuple[str, str], dict[str, None]] = {}
+
+    @staticmethod
+    def _keys(record: dict) -> tuple:
+        owner = str(record["discovered_by"])
+        return owner, (owner, record["rarity"]), (owner, record["name"].lower())
+
+    def add(self, artifact_id: int, record: dict):
+        #Indexe un artefact.
+        owner, rarity_key, name_key = self._keys(record)
+        self.by_owner.setdefault(owner, {})[artifact_id] = None
+        self.by_rarity.setdefault(rarity_key, {})[artifact_id] = None
+        self.by_name.setdefault(name_key, {})[artifact_id] = None
+
+    def remove(self, artifact_id: int, record: dict):
+        #Retire un artefact des index (les entrées vides sont supprimées).
+        owner, rarity_key, name_key = self._keys(record)
+        for index, key in (
+            (self.by_owner, owner),
+            (self.by_rarity, rarity_key),
+            (self.by_name, name_key),
+        ):
+            bucket = index.get(key)
+            if bucket is not None:
+                bucket.pop(artifact_id, None)
+                if not bucket:
+                    del index[key]
+
+    def rebuild(self, data: dict):
+        #Reconstruit les index à partir des collections des archéologues.
+        self.by_owner.clear()
+        self.by_rarity.clear()
+        self.by_name.clear()
+
+        artifacts = data["artifacts"]
+        for archaeologist in data["archaeologists"].values():
+            for artifact_id in archaeologist.get("artifacts", []):
+                record = artifacts.get(artifact_id)
+                if record is not None:
+                    self.add(artifact_id, record)
+
+    def owned(self, owner: str) -> Iterable[str]:
+        #Artefacts d'un propriétaire, dans l'ordre de découverte.
+        return self.by_owner.get(str(owner), {}).keys()
+
+    def owned_with_rarity(self, owner: str, rarity: str) -> Iterable[str]:
+        #Artefacts d'un propriétaire pour une rareté donnée.
+        return self.by_rarity.get((str(owner), rarity), {}).keys()
+
+    def owned_with_name(self, owner: str, name: str) -> Iterable[str]:
+        #Artefacts d'un propriétaire portant ce nom (insensible à la casse).
+        return self.by_name.get((str(owner), name.lower()), {}).keys()
@@ -0,0 +1,117 @@
+#Journal append-only des mutations de la base JSON.
+
+import json
+import os
+import threading
+from typing import Optional
+
+
+class Journal:
+    #Fichier où chaque commit ajoute une ligne JSON décrivant ses changements.
+    #Un changement est un triplet (table, clé, enregistrement) ; un enregistrement None
+    #signifie une suppression. Rejouer un journal est idempotent.
+    #durability : "always" synchronise chaque commit sur le disque (fsync), "interval"
+    #confie la synchronisation à syncer (IntervalSync, un fsync pour tous les commits d'un
+    #intervalle) et "os" laisse le système écrire quand il le décide.
+
+    def __init__(self, path: str, durability: str = "os", syncer=None):
+        #Ouvre (ou crée) le journal en mode ajout.
+        self.path = path
+        self.compacting_path = f"{path}.compacting"
+        self.durability = durability
+        self._syncer = syncer
+        # Le thread de synchronisation ne doit pas utiliser un fichier en cours de fermeture.
+        self._lock = threading.Lock()
+        self._unsynced = False
+        self._file = open(self.path, "ab")
+
+    @property
+    def size(self) -> int:
+        #Taille actuelle du journal en octets.
+        return self._file.tell()
+
+    def append(self, operation: str, changes: list) -> int:
+        #Ajoute un commit au journal. Retourne le nombre d'octets écrits.
+        line = json.dumps(
+            {"op": operation, "changes": changes},
+            ensure_ascii=False,
+            separators=(",", ":"),
+            default=list,
+        ).encode("utf-8") + b"\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            if self.durability == "always":
+                os.fsync(self._file.fileno())
+            else:
+                self._unsynced = True
+        if self.durability == "interval" and self._syncer is not None:
+            self._syncer.request(self.path, self.sync)
+        return len(line)
+
+    def sync(self):
+        #Synchronise sur le disque les commits ajoutés depuis la dernière synchronisation.
+        with self._lock:
+            if self._unsynced and not self._file.closed:
+                os.fsync(self._file.fileno())
+                self._unsynced = False
+
+    def rotate(self) -> Optional[str]:
+        #Met le journal courant de côté pour la compaction et en ouvre un nouveau.
+        #Retourne le chemin du journal mis de côté, ou None s'il était vide.
+        if self.size == 0:
+            return None
+
+        self.close()
+        if os.path.exists(self.compacting_path):
+            # Une compaction précédente a échoué : on conserve ses commits à la suite.
+            with open(self.path, "rb") as src, open(self.compacting_path, "ab") as dst:
+                dst.write(src.read())
+            os.remove(self.path)
+        else:
+            os.replace(self.path, self.compacting_path)
+        with self._lock:
+            self._file = open(self.path, "ab")
+        return self.compacting_path
+
+    def replay(self, data: dict) -> int:
+        #Applique au snapshot les journaux présents sur le disque. Retourne le nombre de commits.
+        replayed = 0
+        for path in (self.compacting_path, self.path):
+            if os.path.exists(path):
+                replayed += self._replay_file(path, data)
+        return replayed
+
+    @staticmethod
+    def _replay_file(path: str, data: dict) -> int:
+        replayed = 0
+        with open(path, "rb") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Dernière ligne tronquée par un arrêt brutal : le commit n'a pas eu lieu.
+                    break
+
+                for table, key, record in entry["changes"]:
+                    if record is None:
+                        data[table].pop(key, None)
+                    else:
+                        data[table][key] = record
+                replayed += 1
+        return replayed
+
+    def discard_compacted(self):
+        #Supprime le journal mis de côté une fois le snapshot écrit.
+        try:
+            os.remove(self.compacting_path)
+        except FileNotFoundError:
+            pass
+
+    def close(self):
+        #Ferme le fichier du journal, synchronisé au préalable (sauf durabilité "os").
+        with self._lock:
+            if self._unsynced and self.durability != "os":
+                os.fsync(self._file.fileno())
+            self._unsynced = False
+            self._file.close()
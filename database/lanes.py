@@ -0,0 +1,87 @@
+#Files d'exécution par joueur pour sérialiser les commandes d'un même utilisateur.
+
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+
+
+class _Lane:
+    #File d'un utilisateur : un verrou FIFO et le nombre de commandes en cours ou en attente.
+
+    __slots__ = ("lock", "depth")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.depth = 0
+
+
+class UserLanes:
+    #Garantit que les commandes d'un même joueur s'exécutent une à une, dans l'ordre
+    #d'arrivée, tandis que celles de joueurs différents avancent en parallèle.
+    #Les files inactives sont supprimées : la mémoire reste proportionnelle aux joueurs actifs.
+
+    def __init__(self):
+        self._lanes: dict[str, _Lane] = {}
+        self.acquisitions = 0
+        self.contended = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.max_depth = 0
+
+    @asynccontextmanager
+    async def lane(self, user_id: str):
+        #Exécute le bloc dans la file du joueur.
+        key = str(user_id)
+        lane = self._lanes.get(key)
+        if lane is None:
+            lane = self._lanes[key] = _Lane()
+
+        lane.depth += 1
+        self.max_depth = max(self.max_depth, lane.depth)
+        if lane.depth > 1:
+            self.contended += 1
+
+        started = time.perf_counter()
+        try:
+            async with lane.lock:
+                waited = time.perf_counter() - started
+                self.acquisitions += 1
+                self.total_wait += waited
+                self.max_wait = max(self.max_wait, waited)
+                yield
+        finally:
+            lane.depth -= 1
+            if lane.depth == 0:
+                del self._lanes[key]
+
+    def queue_depth(self, user_id: str) -> int:
+        #Nombre de commandes du joueur en cours ou en attente.
+        lane = self._lanes.get(str(user_id))
+        return lane.depth if lane else 0
+
+    def get_stats(self) -> dict:
+        #Indicateurs de contention : files actives, commandes en attente et temps d'attente.
+        return {
+            "active_lanes": len(self._lanes),
+            "queued": sum(lane.depth - 1 for lane in self._lanes.values()),
+            "max_depth": self.max_depth,
+            "acquisitions": self.acquisitions,
+            "contended": self.contended,
+            "avg_wait_ms": 1000 * self.total_wait / self.acquisitions if self.acquisitions else 0.0,
+            "max_wait_ms": 1000 * self.max_wait,
+        }
+
+
+_shared_lanes: Optional[UserLanes] = None
+_shared_lanes_lock = threading.Lock()
+
+
+def get_user_lanes() -> UserLanes:
+    #Retourne les files partagées par tous les cogs.
+    global _shared_lanes
+    with _shared_lanes_lock:
+        if _shared_lanes is None:
+            _shared_lanes = UserLanes()
+        return _shared_lanes
@@ -0,0 +1,153 @@
+#Classement maintenu incrémentalement (skiplist indexable).
+
+import random
+from typing import Optional, List
+
+
+class _Node:
+    __slots__ = ("key", "user_id", "next", "width")
+
+    def __init__(self, key: tuple, user_id: Optional[str], height: int):
+        self.key = key
+        self.user_id = user_id
+        self.next: list = [None] * height
+        self.width: list = [1] * height
+
+
+class LeaderboardIndex:
+    #Classement des archéologues par (niveau, expérience, pièces) décroissants.
+    #Skiplist indexable : mise à jour, rang d'un joueur et accès au k-ième en O(log n),
+    #top-K et pages en O(log n + K). À égalité, les pages listent les joueurs dans leur
+    #ordre d'arrivée dans le classement, mais ils partagent le même rang.
+
+    MAX_HEIGHT = 32
+
+    def __init__(self, seed: Optional[int] = None):
+        self._random = random.Random(seed)
+        self._head = _Node((), None, self.MAX_HEIGHT)
+        self._entries: dict[str, tuple] = {}
+        self._sequence = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, user_id: str) -> bool:
+        return str(user_id) in self._entries
+
+    @staticmethod
+    def _sort_key(level: int, experience: int, coins: int, sequence: int) -> tuple:
+        return (-level, -experience, -coins, sequence)
+
+    def _random_height(self) -> int:
+        height = 1
+        while height < self.MAX_HEIGHT and self._random.random() < 0.5:
+            height += 1
+        return height
+
+    def _search(self, key: tuple) -> tuple[list, list]:
+        #Retourne, pour chaque niveau, le dernier nœud précédant key et sa position.
+        update = [None] * self.MAX_HEIGHT
+        positions = [0] * self.MAX_HEIGHT
+        node, position = self._head, 0
+        for level in reversed(range(self.MAX_HEIGHT)):
+            while node.next[level] is not None and node.next[level].key < key:
+                position += node.width[level]
+                node = node.next[level]
+            update[level] = node
+            positions[level] = position
+        return update, positions
+
+    def update(self, user_id: str, username: str, level: int, experience: int, coins: int, artifacts: int):
+        #Ajoute ou met à jour un joueur dans le classement.
+        user_id = str(user_id)
+        previous = self._entries.get(user_id)
+        if previous is not None:
+            key, row = previous
+            if row[1:4] == (level, experience, coins):
+                # Position inchangée : seules les données affichées sont rafraîchies.
+                self._entries[user_id] = (key, (username, level, experience, coins, artifacts))
+                return
+            self._unlink(key)
+            sequence = key[3]
+        else:
+            sequence = self._sequence
+            self._sequence += 1
+
+        key = self._sort_key(level, experience, coins, sequence)
+        self._entries[user_id] = (key, (username, level, experience, coins, artifacts))
+        self._link(key, user_id)
+
+    def remove(self, user_id: str):
+        #Retire un joueur du classement.
+        previous = self._entries.pop(str(user_id), None)
+        if previous is not None:
+            self._unlink(previous[0])
+
+    def _link(self, key: tuple, user_id: str):
+        update, positions = self._search(key)
+        height = self._random_height()
+        node = _Node(key, user_id, height)
+        position = positions[0] + 1
+
+        for level in range(self.MAX_HEIGHT):
+            previous = update[level]
+            if level < height:
+                node.next[level] = previous.next[level]
+                previous.next[level] = node
+                # Largeur = nombre de nœuds sautés au niveau 0
+                node.width[level] = previous.width[level] - (position - positions[level]) + 1
+                previous.width[level] = position - positions[level]
+            else:
+                previous.width[level] += 1
+
+    def _unlink(self, key: tuple):
+        update, _ = self._search(key)
+        node = update[0].next[0]
+        for level in range(self.MAX_HEIGHT):
+            previous = update[level]
+            if previous.next[level] is node:
+                previous.width[level] += node.width[level] - 1
+                previous.next[level] = node.next[level]
+            else:
+                previous.width[level] -= 1
+
+    def rank(self, user_id: str) -> Optional[int]:
+        #Rang (à partir de 1) d'un joueur, ou None s'il n'est pas classé : 1 + nombre de
+        #joueurs strictement devant lui (les ex æquo partagent le rang).
+        entry = self._entries.get(str(user_id))
+        if entry is None:
+            return None
+        _, positions = self._search(entry[0][:3] + (-1,))
+        return positions[0] + 1
+
+    def score(self, user_id: str) -> Optional[tuple]:
+        #(niveau, expérience, pièces) d'un joueur classé, ou None.
+        entry = self._entries.get(str(user_id))
+        if entry is None:
+            return None
+        return tuple(-value for value in entry[0][:3])
+
+    def count_ahead(self, level: int, experience: int, coins: int) -> int:
+        #Nombre de joueurs classés strictement devant ces valeurs (ex æquo non comptés).
+        _, positions = self._search(self._sort_key(level, experience, coins, -1))
+        return positions[0]
+
+    def _node_at(self, index: int) -> Optional[_Node]:
+        #Nœud à la position index (à partir de 0).
+        if index < 0 or index >= len(self._entries):
+            return None
+        node, remaining = self._head, index + 1
+        for level in reversed(range(self.MAX_HEIGHT)):
+            while node.next[level] is not None and node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]
+        return node
+
+    def top(self, limit: int = 10, offset: int = 0) -> List[tuple]:
+        #Lignes (username, level, experience, coins, nb_artefacts) des rangs offset+1 à offset+limit.
+        node = self._node_at(offset)
+        rows = []
+        while node is not None and len(rows) < limit:
+            rows.append(self._entries[node.user_id][1])
+            node = node.next[0]
+        return rows
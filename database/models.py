@@ -1,70 +1,223 @@
 #Modèles de données pour les archéologues et les artefacts.
+#Les modèles utilisent __slots__ et des conversions écrites à la main : pas de copie
+#récursive comme avec dataclasses.asdict, et les champs inconnus ou manquants des
+#anciens enregistrements sont tolérés.
 
-from dataclasses import dataclass, asdict, field
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional
+from typing import Iterable, Optional
 
+import config
 
-@dataclass
+
+def _now() -> str:
+    return datetime.now().isoformat()
+
+
+def _rarity_order(rarity: str) -> int:
+    if rarity in config.RARITY_LEVELS:
+        return config.RARITY_LEVELS.index(rarity)
+    return len(config.RARITY_LEVELS)
+
+
+class OwnedArtifacts:
+    #Collection d'IDs d'artefacts d'un archéologue, stockée dans un array('q') trié
+    #(8 octets par artefact). Les IDs étant croissants dans le temps, ajouter un nouvel
+    #artefact et tester s'il est déjà présent se fait en O(1) ; les autres tests
+    #d'appartenance sont une recherche dichotomique.
+
+    __slots__ = ("_ids",)
+
+    def __init__(self, ids: Iterable[int] = ()):
+        #ids doit être trié par ordre croissant (c'est le cas des enregistrements stockés).
+        self._ids = array("q", ids)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def __contains__(self, artifact_id: int) -> bool:
+        ids = self._ids
+        if not ids or artifact_id > ids[-1]:
+            return False
+        index = bisect_left(ids, artifact_id)
+        return index < len(ids) and ids[index] == artifact_id
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, OwnedArtifacts):
+            return self._ids == other._ids
+        return list(self._ids) == list(other)
+
+    def __repr__(self) -> str:
+        return f"OwnedArtifacts({list(self._ids)!r})"
+
+    def add(self, artifact_id: int) -> bool:
+        #Ajoute un ID s'il est absent. Retourne True si la collection a changé.
+        ids = self._ids
+        if not ids or artifact_id > ids[-1]:
+            ids.append(artifact_id)
+            return True
+        index = bisect_left(ids, artifact_id)
+        if index < len(ids) and ids[index] == artifact_id:
+            return False
+        ids.insert(index, artifact_id)
+        return True
+
+    def discard(self, artifact_id: int) -> bool:
+        #Retire un ID s'il est présent. Retourne True si la collection a changé.
+        ids = self._ids
+        index = bisect_left(ids, artifact_id)
+        if index < len(ids) and ids[index] == artifact_id:
+            del ids[index]
+            return True
+        return False
+
+    def to_array(self) -> array:
+        #Copie des IDs, prête à être stockée.
+        return array("q", self._ids)
+
+
+@dataclass(slots=True)
 class Artifact:
     #Représente un artefact archéologique découvert.
-    
+
     name: str
     rarity: str
     description: str
     value: int
     discovered_by: str
-    discovered_at: str = field(default_factory=lambda: datetime.now().isoformat())
-    artifact_id: str = ""
-    
+    discovered_at: str = field(default_factory=_now)
+    artifact_id: int = 0
+
     def to_dict(self) -> dict:
         #Convertit l'artefact en dictionnaire.
-        return asdict(self)
-    
+        return {
+            "name": self.name,
+            "rarity": self.rarity,
+            "description": self.description,
+            "value": self.value,
+            "discovered_by": self.discovered_by,
+            "discovered_at": self.discovered_at,
+            "artifact_id": self.artifact_id,
+        }
+
     @classmethod
     def from_dict(cls, data: dict) -> "Artifact":
         #Crée un artefact à partir d'un dictionnaire.
-        return cls(**data)
+        return cls(
+            data["name"],
+            data["rarity"],
+            data["description"],
+            data["value"],
+            data["discovered_by"],
+            data.get("discovered_at") or _now(),
+            data.get("artifact_id", 0),
+        )
+
+
+def stack_key(rarity: str, name: str) -> str:
+    #Clé d'une pile dans Archaeologist.stacks.
+    return f"{rarity}|{name}"
+
+
+@dataclass(slots=True)
+class ArtifactStack:
+    #Pile d'artefacts identiques (même nom, même rareté) du mode d'inventaire "stacks".
+
+    name: str
+    rarity: str
+    count: int = 0
+    total_value: int = 0
+
+    @property
+    def unit_value(self) -> int:
+        #Valeur moyenne d'un artefact de la pile (arrondie à l'inférieur).
+        return self.total_value // self.count if self.count else 0
 
 
-@dataclass
+@dataclass(slots=True)
 class Archaeologist:
     #Représente un archéologue (joueur).
-    
+
     user_id: str
     username: str
     level: int = 1
     experience: int = 0
     coins: int = 0
-    artifacts: list[str] = field(default_factory=list)
+    artifacts: OwnedArtifacts = field(default_factory=OwnedArtifacts)
     total_excavations: int = 0
     pickaxe: str = "basic"
-    joined_at: str = field(default_factory=lambda: datetime.now().isoformat())
-    
+    joined_at: str = field(default_factory=_now)
+    stacks: dict = field(default_factory=dict)
+
     def to_dict(self) -> dict:
-        #Convertit l'archéologue en dictionnaire.
-        return asdict(self)
-    
+        #Convertit l'archéologue en dictionnaire (les IDs d'artefacts sont copiés une fois).
+        return {
+            "user_id": self.user_id,
+            "username": self.username,
+            "level": self.level,
+            "experience": self.experience,
+            "coins": self.coins,
+            "artifacts": self.artifacts.to_array(),
+            "total_excavations": self.total_excavations,
+            "pickaxe": self.pickaxe,
+            "joined_at": self.joined_at,
+            "stacks": {key: list(stack) for key, stack in self.stacks.items()},
+        }
+
     @classmethod
     def from_dict(cls, data: dict) -> "Archaeologist":
-        #Crée un archéologue à partir d'un dictionnaire.
-        return cls(**data)
-    
+        #Crée un archéologue à partir d'un dictionnaire (sans partager ses IDs d'artefacts).
+        get = data.get
+        return cls(
+            data["user_id"],
+            data["username"],
+            get("level", 1),
+            get("experience", 0),
+            get("coins", 0),
+            OwnedArtifacts(get("artifacts", ())),
+            get("total_excavations", 0),
+            get("pickaxe", "basic"),
+            get("joined_at") or _now(),
+            {key: list(stack) for key, stack in get("stacks", {}).items()},
+        )
+
     def add_experience(self, amount: int) -> bool:
         #Ajoute de l'expérience et vérifie la montée de niveau.
         self.experience += amount
-        experience_per_level = 100
-        
-        if self.experience >= self.level * experience_per_level:
+
+        if self.experience >= self.level * config.EXPERIENCE_PER_LEVEL:
             self.level += 1
             return True
         return False
-    
+
     def add_coins(self, amount: int):
         #Ajoute des pièces.#
         self.coins += amount
-    
-    def add_artifact(self, artifact_id: str):
+
+    def add_artifact(self, artifact_id: int):
         #Ajoute un artefact à la collection.
-        if artifact_id not in self.artifacts:
-            self.artifacts.append(artifact_id)
+        self.artifacts.add(artifact_id)
+
+    def add_to_stack(self, name: str, rarity: str, value: int):
+        #Ajoute un artefact à la pile (nom, rareté) correspondante.
+        stack = self.stacks.setdefault(stack_key(rarity, name), [0, 0])
+        stack[0] += 1
+        stack[1] += value
+
+    def get_stacks(self) -> list[ArtifactStack]:
+        #Piles de l'archéologue, triées par rareté puis par nom.
+        stacks = []
+        for key, (count, total_value) in self.stacks.items():
+            rarity, name = key.split("|", 1)
+            stacks.append(ArtifactStack(name, rarity, count, total_value))
+        return sorted(stacks, key=lambda s: (_rarity_order(s.rarity), s.name))
+
+    @property
+    def artifact_count(self) -> int:
+        #Nombre total d'artefacts possédés (individuels et en piles).
+        return len(self.artifacts) + sum(count for count, _ in self.stacks.values())
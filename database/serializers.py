@@ -0,0 +1,203 @@
+#Formats de sérialisation des snapshots de la base.
+
+import base64
+import gzip
+import json
+import re
+import zlib
+from typing import Optional
+
+try:
+    import orjson
+except ImportError:  # dépendance optionnelle
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # dépendance optionnelle
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # dépendance optionnelle
+    zstandard = None
+
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# Somme de contrôle ajoutée après les données (avant compression) : une ligne à part,
+# ignorée par les lectures en flux qui s'arrêtent à la fin de l'objet racine.
+CHECKSUM_TRAILER = re.compile(rb"\n#crc32:([0-9a-f]{8})\n")
+CHECKSUM_SIZE = len(b"\n#crc32:00000000\n")
+
+
+def seal(payload: bytes) -> bytes:
+    #Ajoute la somme de contrôle CRC32 d'un snapshot.
+    return payload + b"\n#crc32:%08x\n" % zlib.crc32(payload)
+
+
+def unseal(payload: bytes) -> bytes:
+    #Vérifie et retire la somme de contrôle d'un snapshot (les anciens snapshots n'en ont
+    #pas). Lève ValueError si les données ne correspondent pas.
+    match = CHECKSUM_TRAILER.fullmatch(payload, len(payload) - CHECKSUM_SIZE)
+    if match is None:
+        return payload
+    body = payload[:-CHECKSUM_SIZE]
+    if zlib.crc32(body) != int(match.group(1), 16):
+        raise ValueError("Snapshot corrompu : somme de contrôle invalide")
+    return body
+
+
+def verify_sealed(stream, chunk_size: int = 1 << 16) -> bool:
+    #Vérifie par blocs, en mémoire bornée, la somme de contrôle d'un snapshot décompressé
+    #lu depuis stream (même contrôle que unseal). False si le snapshot n'en a pas (ancien
+    #snapshot) ; ValueError si les données ne correspondent pas.
+    crc = 0
+    tail = b""
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        data = tail + chunk
+        cut = max(len(data) - CHECKSUM_SIZE, 0)
+        crc = zlib.crc32(data[:cut], crc)
+        tail = data[cut:]
+    match = CHECKSUM_TRAILER.fullmatch(tail)
+    if match is None:
+        return False
+    if crc != int(match.group(1), 16):
+        raise ValueError("Snapshot corrompu : somme de contrôle invalide")
+    return True
+
+
+def _encode_default(value):
+    #Types non natifs des données en mémoire : table d'artefacts en colonnes, octets
+    #(base64 en JSON ; MessagePack les encode nativement) et collections array('q').
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode("ascii")
+    to_snapshot = getattr(value, "to_snapshot", None)
+    if to_snapshot is not None:
+        return to_snapshot()
+    return list(value)
+
+
+class JsonSerializer:
+    #JSON indenté, lisible à la main (format historique de database.json).
+
+    name = "json"
+
+    def dumps(self, data: dict) -> bytes:
+        return json.dumps(data, indent=2, ensure_ascii=False, default=_encode_default).encode("utf-8")
+
+    def loads(self, payload: bytes) -> dict:
+        return json.loads(payload)
+
+
+class CompactJsonSerializer:
+    #JSON sans espaces ; utilise orjson s'il est installé.
+
+    name = "json-compact"
+
+    def dumps(self, data: dict) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(data, default=_encode_default, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(
+            data, ensure_ascii=False, separators=(",", ":"), default=_encode_default
+        ).encode("utf-8")
+
+    def loads(self, payload: bytes) -> dict:
+        if orjson is not None:
+            return orjson.loads(payload)
+        return json.loads(payload)
+
+
+class MsgpackSerializer:
+    #Encodage binaire MessagePack (nécessite le paquet msgpack).
+
+    name = "msgpack"
+
+    def __init__(self):
+        if msgpack is None:
+            raise ValueError("DATABASE_FORMAT=msgpack nécessite le paquet 'msgpack'")
+
+    def dumps(self, data: dict) -> bytes:
+        return msgpack.packb(data, use_bin_type=True, default=_encode_default)
+
+    def loads(self, payload: bytes) -> dict:
+        # Les clés entières (columnar, codes...) doivent rester acceptées comme clés de map.
+        return msgpack.unpackb(payload, raw=False, strict_map_key=False)
+
+
+class ChecksumSerializer:
+    #Scelle la sortie d'un autre sérialiseur avec sa somme de contrôle (voir seal).
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.name = inner.name
+
+    def dumps(self, data: dict) -> bytes:
+        return seal(self.inner.dumps(data))
+
+    def loads(self, payload: bytes) -> dict:
+        return load_any(payload)
+
+
+class CompressedSerializer:
+    #Compresse la sortie d'un autre sérialiseur (gzip ou zstd).
+
+    def __init__(self, inner, compression: str, level: Optional[int] = None):
+        if compression == "zstd" and zstandard is None:
+            raise ValueError("DATABASE_COMPRESSION=zstd nécessite le paquet 'zstandard'")
+        if compression not in ("gzip", "zstd"):
+            raise ValueError(f"Compression inconnue: {compression}")
+
+        self.inner = inner
+        self.compression = compression
+        self.level = level
+        self.name = f"{inner.name}+{compression}"
+
+    def dumps(self, data: dict) -> bytes:
+        payload = self.inner.dumps(data)
+        if self.compression == "gzip":
+            return gzip.compress(payload, compresslevel=self.level or 6)
+        return zstandard.ZstdCompressor(level=self.level or 3).compress(payload)
+
+    def loads(self, payload: bytes) -> dict:
+        return load_any(payload)
+
+
+SERIALIZERS = {
+    "json": JsonSerializer,
+    "json-compact": CompactJsonSerializer,
+    "msgpack": MsgpackSerializer,
+}
+
+
+def get_serializer(name: str = "json", compression: str = "none"):
+    #Construit le sérialiseur correspondant au format et à la compression demandés.
+    if name not in SERIALIZERS:
+        raise ValueError(f"DATABASE_FORMAT inconnu: {name}")
+
+    serializer = ChecksumSerializer(SERIALIZERS[name]())
+    if compression and compression != "none":
+        serializer = CompressedSerializer(serializer, compression)
+    return serializer
+
+
+def load_any(payload: bytes) -> dict:
+    #Décode un snapshot quel que soit son format : la compression et l'encodage sont
+    #détectés d'après les premiers octets. Permet de changer de format sans migration.
+    #La somme de contrôle éventuelle est vérifiée (ValueError si le snapshot est corrompu).
+    if payload.startswith(GZIP_MAGIC):
+        return load_any(gzip.decompress(payload))
+    if payload.startswith(ZSTD_MAGIC):
+        if zstandard is None:
+            raise ValueError("Snapshot compressé en zstd : le paquet 'zstandard' est requis")
+        return load_any(zstandard.ZstdDecompressor().decompressobj().decompress(payload))
+
+    payload = unseal(payload)
+    stripped = payload.lstrip()
+    if stripped[:1] in (b"{", b"["):
+        return CompactJsonSerializer().loads(payload)
+    return MsgpackSerializer().loads(payload)
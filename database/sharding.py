@@ -0,0 +1,468 @@
+#Stockage réparti : les archéologues sont répartis par hachage de leur user_id entre
+#plusieurs bases (shards) du même type, chacune avec les artefacts de ses joueurs.
+#
+#Usage (bot arrêté) : python -m database.sharding --shards N [--type json|journal|sqlite]
+#répartit la base actuelle (shards existants ou base d'un seul fichier) sur N shards.
+
+import argparse
+import json
+import os
+import shutil
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from heapq import merge
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Optional, List
+
+from .counters import merge_summaries
+from .db_manager import DatabaseManager
+from .ids import LEGACY_WORKER, id_worker
+from .models import Archaeologist, Artifact
+from .serializers import get_serializer
+from .sqlite_manager import SQLiteDatabaseManager
+import config
+
+
+SHARD_TYPES = ("json", "journal", "sqlite")
+MANIFEST = "shards.json"
+
+
+def shard_index(user_id: str, shards: int) -> int:
+    #Shard d'un joueur : crc32 de son user_id (stable d'un processus à l'autre, contrairement
+    #à hash()) modulo le nombre de shards.
+    return zlib.crc32(str(user_id).encode("utf-8")) % shards
+
+
+def shard_paths(directory: str, kind: str, index: int) -> tuple[str, Optional[str]]:
+    #Chemins (base, journal ou None) d'un shard.
+    base = os.path.join(directory, f"shard-{index:03d}")
+    if kind == "sqlite":
+        return f"{base}.sqlite3", None
+    return f"{base}.json", f"{base}.journal" if kind == "journal" else None
+
+
+def read_manifest(directory: str) -> Optional[dict]:
+    #Description {"shards": N, "type": ...} des shards d'un répertoire, None s'il n'y en a pas.
+    try:
+        with open(os.path.join(directory, MANIFEST), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def write_manifest(directory: str, shards: int, kind: str):
+    Path(directory).mkdir(parents=True, exist_ok=True)
+    with open(os.path.join(directory, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump({"shards": shards, "type": kind}, f)
+
+
+def open_shard(
+    directory: str,
+    kind: str,
+    index: int,
+    inventory_mode: str = config.INVENTORY_MODE,
+    durability: str = config.DATABASE_DURABILITY,
+):
+    #Ouvre le gestionnaire d'un shard. Son worker_id est son index : les IDs d'artefacts
+    #restent uniques entre shards et désignent celui qui les a créés.
+    db_path, journal_path = shard_paths(directory, kind, index)
+    if kind == "sqlite":
+        return SQLiteDatabaseManager(db_path, worker_id=index, inventory_mode=inventory_mode, durability=durability)
+    return DatabaseManager(
+        db_path,
+        journal_path=journal_path,
+        serializer=get_serializer(config.DATABASE_FORMAT, config.DATABASE_COMPRESSION),
+        worker_id=index,
+        inventory_mode=inventory_mode,
+        durability=durability,
+    )
+
+
+class ShardedDatabaseManager:
+    #Même interface que DatabaseManager, répartie sur plusieurs shards.
+    #Une commande ne charge et n'écrit que le shard de son joueur, ouvert au premier accès.
+    #Les requêtes globales (classement, liste, compteurs) interrogent tous les shards, en
+    #parallèle (un thread par shard) si parallel est vrai.
+    #Une transaction réunit les transactions des shards touchés : chacune est atomique,
+    #mais elles sont validées l'une après l'autre (une commande ne touche qu'un joueur).
+
+    def __init__(
+        self,
+        directory: str = config.SHARDS_DIR,
+        shards: int = config.DATABASE_SHARDS,
+        kind: str = config.DATABASE_TYPE,
+        parallel: bool = config.DATABASE_SHARD_PARALLEL,
+        inventory_mode: str = config.INVENTORY_MODE,
+        durability: str = config.DATABASE_DURABILITY,
+    ):
+        if kind not in SHARD_TYPES:
+            raise ValueError(f"DATABASE_TYPE inconnu: {kind}")
+        if not 1 <= shards < LEGACY_WORKER:
+            raise ValueError(f"DATABASE_SHARDS doit être compris entre 1 et {LEGACY_WORKER - 1}")
+        manifest = read_manifest(directory)
+        if manifest is None:
+            write_manifest(directory, shards, kind)
+        elif manifest != {"shards": shards, "type": kind}:
+            raise ValueError(
+                f"{directory} contient {manifest['shards']} shard(s) {manifest['type']} : "
+                f"répartissez la base avec python -m database.sharding --shards {shards} --type {kind}"
+            )
+        self.directory = directory
+        self.kind = kind
+        self.inventory_mode = inventory_mode
+        self.durability = durability
+        self._backends: list = [None] * shards
+        self._locks = [threading.Lock() for _ in range(shards)]
+        self._executor = ThreadPoolExecutor(max_workers=shards, thread_name_prefix="shard") if parallel else None
+        self._transaction: Optional[tuple[str, ExitStack, set]] = None
+        self._deferred = False
+
+    @property
+    def shards(self) -> int:
+        return len(self._backends)
+
+    def _shard(self, index: int, join: bool = True):
+        #Gestionnaire d'un shard (ouvert au premier accès). join : le fait participer à la
+        #transaction en cours.
+        backend = self._backends[index]
+        if backend is None:
+            with self._locks[index]:
+                backend = self._backends[index]
+                if backend is None:
+                    backend = open_shard(self.directory, self.kind, index, self.inventory_mode, self.durability)
+                    if self._deferred:
+                        backend.defer_writes(True)
+                    self._backends[index] = backend
+        transaction = self._transaction
+        if join and transaction is not None and index not in transaction[2]:
+            transaction[2].add(index)
+            transaction[1].enter_context(backend.transaction(transaction[0]))
+        return backend
+
+    def _for_user(self, user_id: str):
+        return self._shard(shard_index(user_id, self.shards))
+
+    def _loaded(self) -> list:
+        return [backend for backend in self._backends if backend is not None]
+
+    def _fan_out(self, func: Callable, indexes=None) -> list:
+        #Appelle func(gestionnaire) sur chaque shard (ou ceux d'indexes), dans l'ordre des shards.
+        indexes = range(self.shards) if indexes is None else list(indexes)
+        call = lambda index: func(self._shard(index, join=False))
+        if self._executor is None or len(indexes) < 2:
+            return [call(index) for index in indexes]
+        return list(self._executor.map(call, indexes))
+
+    @contextmanager
+    def transaction(self, operation: str = "transaction"):
+        #Regroupe les mutations du bloc : une transaction par shard touché, annulées
+        #ensemble en cas d'exception. Une transaction imbriquée rejoint l'englobante.
+        if self._transaction is not None:
+            yield self
+            return
+
+        with ExitStack() as stack:
+            self._transaction = (operation, stack, set())
+            try:
+                yield self
+            finally:
+                self._transaction = None
+
+    # ===== Écriture différée et fermeture =====
+
+    def defer_writes(self, enabled: bool = True):
+        #Écriture différée sur tous les shards (voir database.flusher).
+        self._deferred = enabled
+        for backend in self._loaded():
+            backend.defer_writes(enabled)
+
+    @property
+    def pending_writes(self) -> int:
+        return sum(backend.pending_writes for backend in self._loaded())
+
+    def flush(self) -> int:
+        return sum(backend.flush() for backend in self._loaded())
+
+    def close(self):
+        #Ferme les shards ouverts.
+        for backend in self._loaded():
+            backend.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+    # ===== Compteurs globaux =====
+
+    def get_global_stats(self) -> dict:
+        return merge_summaries(self._fan_out(lambda backend: backend.get_global_stats()))
+
+    def _by_shard(self, results: list) -> dict:
+        #Écarts de compteurs de chaque shard, préfixés par son nom.
+        return {
+            f"shard-{index:03d}/{name}": difference
+            for index, differences in enumerate(results)
+            for name, difference in differences.items()
+        }
+
+    def verify_counters(self) -> dict:
+        return self._by_shard(self._fan_out(lambda backend: backend.verify_counters()))
+
+    def rebuild_counters(self) -> dict:
+        return self._by_shard(self._fan_out(lambda backend: backend.rebuild_counters()))
+
+    # ===== Archive des inactifs =====
+
+    def archive_inactive(self, max_idle_days: float = config.ARCHIVE_AFTER_DAYS) -> int:
+        #Archive les inactifs des shards ouverts (un shard jamais ouvert ne coûte rien).
+        if self.kind == "sqlite":
+            return 0
+        loaded = [index for index, backend in enumerate(self._backends) if backend is not None]
+        return sum(self._fan_out(lambda backend: backend.archive_inactive(max_idle_days), loaded))
+
+    def touch(self, user_id: str):
+        #Note l'activité d'un archéologue dans son shard (SQLite n'archive pas).
+        if self.kind != "sqlite":
+            self._for_user(user_id).touch(user_id)
+
+    # ===== Archéologues =====
+
+    def get_archaeologist(self, user_id: str) -> Optional[Archaeologist]:
+        return self._for_user(user_id).get_archaeologist(user_id)
+
+    def create_archaeologist(self, user_id: str, username: str) -> Archaeologist:
+        return self._for_user(user_id).create_archaeologist(user_id, username)
+
+    def save_archaeologist(self, archaeologist: Archaeologist):
+        return self._for_user(archaeologist.user_id).save_archaeologist(archaeologist)
+
+    def get_all_archaeologists(self) -> List[Archaeologist]:
+        return [
+            archaeologist
+            for archaeologists in self._fan_out(lambda backend: backend.get_all_archaeologists())
+            for archaeologist in archaeologists
+        ]
+
+    # ===== Artefacts =====
+
+    def create_artifacts(self, finds: List[tuple], discovered_by: str) -> List[Artifact]:
+        return self._for_user(discovered_by).create_artifacts(finds, discovered_by)
+
+    def add_finds(self, archaeologist: Archaeologist, finds: List[tuple]) -> List[Artifact]:
+        return self._for_user(archaeologist.user_id).add_finds(archaeologist, finds)
+
+    def add_find(
+        self,
+        archaeologist: Archaeologist,
+        name: str,
+        rarity: str,
+        description: str,
+        value: int,
+    ) -> Artifact:
+        return self._for_user(archaeologist.user_id).add_find(archaeologist, name, rarity, description, value)
+
+    def create_artifact(
+        self,
+        name: str,
+        rarity: str,
+        description: str,
+        value: int,
+        discovered_by: str
+    ) -> Artifact:
+        return self._for_user(discovered_by).create_artifact(name, rarity, description, value, discovered_by)
+
+    def _hinted_shard(self, artifact_id: int) -> Optional[int]:
+        #Shard qui a créé un artefact (d'après son ID) ; il y est encore sauf répartition.
+        worker = id_worker(artifact_id)
+        return worker if worker < self.shards else None
+
+    def get_artifact(self, artifact_id: int) -> Optional[Artifact]:
+        #Cherche d'abord dans le shard créateur, puis dans tous les autres.
+        try:
+            artifact_id = int(artifact_id)
+        except (TypeError, ValueError):
+            return None
+        hinted = self._hinted_shard(artifact_id)
+        if hinted is not None:
+            artifact = self._shard(hinted, join=False).get_artifact(artifact_id)
+            if artifact is not None:
+                return artifact
+        others = [index for index in range(self.shards) if index != hinted]
+        for artifact in self._fan_out(lambda backend: backend.get_artifact(artifact_id), others):
+            if artifact is not None:
+                return artifact
+        return None
+
+    def get_artifacts(self, artifact_ids) -> List[Artifact]:
+        artifact_ids = [int(artifact_id) for artifact_id in artifact_ids]
+        by_shard = {}
+        for artifact_id in artifact_ids:
+            by_shard.setdefault(self._hinted_shard(artifact_id), []).append(artifact_id)
+
+        found = {}
+        for index, ids in by_shard.items():
+            if index is not None:
+                for artifact in self._shard(index, join=False).get_artifacts(ids):
+                    found[artifact.artifact_id] = artifact
+        missing = [artifact_id for artifact_id in artifact_ids if artifact_id not in found]
+        if missing:
+            for artifacts in self._fan_out(lambda backend: backend.get_artifacts(missing)):
+                for artifact in artifacts:
+                    found[artifact.artifact_id] = artifact
+        return [found[artifact_id] for artifact_id in artifact_ids if artifact_id in found]
+
+    def get_archaeologist_artifacts(self, user_id: str) -> List[Artifact]:
+        return self._for_user(user_id).get_archaeologist_artifacts(user_id)
+
+    def get_archaeologist_artifacts_by_rarity(self, user_id: str) -> dict[str, List[Artifact]]:
+        return self._for_user(user_id).get_archaeologist_artifacts_by_rarity(user_id)
+
+    # ===== Ventes, classement et boutique =====
+
+    def sell_single_artifact(self, user_id: str, artifact_name: str) -> tuple[int, Optional[int]]:
+        return self._for_user(user_id).sell_single_artifact(user_id, artifact_name)
+
+    def sell_artifacts_by_rarity(self, user_id: str, max_rarity: str) -> tuple[int, int]:
+        return self._for_user(user_id).sell_artifacts_by_rarity(user_id, max_rarity)
+
+    def get_leaderboard(self, limit: int = 10, offset: int = 0) -> List[tuple]:
+        #Fusion des classements des shards (chacun fournit ses offset+limit premiers).
+        pages = self._fan_out(lambda backend: backend.get_leaderboard(offset + limit, 0))
+        rows = merge(*pages, key=lambda row: (-row[1], -row[2], -row[3]))
+        return list(islice(rows, offset, offset + limit))
+
+    def get_rank(self, user_id: str) -> Optional[int]:
+        #1 + joueurs strictement devant lui dans tous les shards (les ex æquo partagent le
+        #rang, comme avec un seul gestionnaire).
+        #Un joueur archivé est classé d'après son résumé, sans être ramené de l'archive.
+        key = self._for_user(user_id).get_rank_key(user_id)
+        if key is None:
+            return None
+        return 1 + sum(self._fan_out(lambda shard: shard.count_ahead(*key)))
+
+    def count_archaeologists(self) -> int:
+        return sum(self._fan_out(lambda backend: backend.count_archaeologists()))
+
+    def get_pickaxe(self, user_id: str) -> str:
+        return self._for_user(user_id).get_pickaxe(user_id)
+
+    def buy_pickaxe(self, user_id: str, pickaxe_type: str) -> tuple[bool, str]:
+        return self._for_user(user_id).buy_pickaxe(user_id, pickaxe_type)
+
+
+# ===== Répartition hors ligne =====
+
+def _single_source() -> Optional[Callable]:
+    #Base d'un seul fichier existante, choisie d'après DATABASE_TYPE : SQLite pour "sqlite",
+    #sinon le snapshot JSON et son journal. Si les deux existent, la répartition est refusée
+    #plutôt que de deviner laquelle est à jour.
+    if os.path.exists(config.SQLITE_PATH) and os.path.exists(config.DATABASE_PATH):
+        raise ValueError(
+            f"Deux bases d'un seul fichier existent ({config.SQLITE_PATH} et {config.DATABASE_PATH}) : "
+            "déplacez celle qui n'est plus utilisée avant la répartition"
+        )
+    if config.DATABASE_TYPE == "sqlite":
+        if os.path.exists(config.SQLITE_PATH):
+            return lambda: SQLiteDatabaseManager(config.SQLITE_PATH)
+        return None
+    if os.path.exists(config.DATABASE_PATH):
+        journal_path = config.JOURNAL_PATH if os.path.exists(config.JOURNAL_PATH) else None
+        return lambda: DatabaseManager(config.DATABASE_PATH, journal_path=journal_path)
+    return None
+
+
+def rebalance(
+    shards: int,
+    kind: str = config.DATABASE_TYPE,
+    directory: str = config.SHARDS_DIR,
+) -> tuple[int, int]:
+    #Répartit hors ligne (bot arrêté) la base sur shards shards de type kind. La source est
+    #le contenu actuel de directory, ou à défaut la base d'un seul fichier. Les nouveaux
+    #shards sont écrits à côté puis remplacent les anciens, conservés en <directory>.old.
+    #Retourne (nb_archéologues, nb_artefacts).
+    if kind not in SHARD_TYPES:
+        raise ValueError(f"DATABASE_TYPE inconnu: {kind}")
+    if not 1 <= shards < LEGACY_WORKER:
+        raise ValueError(f"Le nombre de shards doit être compris entre 1 et {LEGACY_WORKER - 1}")
+
+    manifest = read_manifest(directory)
+    if manifest is not None:
+        sources = [
+            lambda index=index: open_shard(directory, manifest["type"], index)
+            for index in range(manifest["shards"])
+        ]
+    else:
+        single = _single_source()
+        sources = [single] if single is not None else []
+
+    # Les artefacts suivent leur propriétaire ; sans propriétaire, leur découvreur.
+    targets = [{"archaeologists": {}, "artifacts": {}} for _ in range(shards)]
+    for open_source in sources:
+        source = open_source()
+        data = source.export_data()
+        source.close()
+        owners = {}
+        for user_id, record in data["archaeologists"].items():
+            index = shard_index(user_id, shards)
+            targets[index]["archaeologists"][user_id] = record
+            for artifact_id in record.get("artifacts", ()):
+                owners[artifact_id] = index
+        for artifact_id, record in data["artifacts"].items():
+            index = owners.get(artifact_id)
+            if index is None:
+                index = shard_index(record["discovered_by"], shards)
+            targets[index]["artifacts"][artifact_id] = record
+
+    staging = f"{directory}.rebalance"
+    shutil.rmtree(staging, ignore_errors=True)
+    Path(staging).mkdir(parents=True)
+    for index, data in enumerate(targets):
+        target = open_shard(staging, kind, index)
+        target.import_data(data)
+        target.close()
+    write_manifest(staging, shards, kind)
+
+    if os.path.exists(directory):
+        previous = f"{directory}.old"
+        shutil.rmtree(previous, ignore_errors=True)
+        os.replace(directory, previous)
+    os.replace(staging, directory)
+    return (
+        sum(len(data["archaeologists"]) for data in targets),
+        sum(len(data["artifacts"]) for data in targets),
+    )
+
+
+def open_sharded_database() -> ShardedDatabaseManager:
+    #Ouvre la base répartie configurée. Au premier démarrage, la base d'un seul fichier
+    #existante y est répartie (elle est conservée telle quelle).
+    if read_manifest(config.SHARDS_DIR) is None and _single_source() is not None:
+        archaeologists, artifacts = rebalance(config.DATABASE_SHARDS, config.DATABASE_TYPE, config.SHARDS_DIR)
+        print(
+            f"Répartition en {config.DATABASE_SHARDS} shard(s): "
+            f"{archaeologists} archéologue(s), {artifacts} artefact(s)"
+        )
+    return ShardedDatabaseManager(
+        config.SHARDS_DIR,
+        config.DATABASE_SHARDS,
+        config.DATABASE_TYPE,
+        config.DATABASE_SHARD_PARALLEL,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Répartition hors ligne de la base en shards")
+    parser.add_argument("--shards", type=int, default=config.DATABASE_SHARDS, help="Nombre de shards")
+    parser.add_argument("--type", choices=SHARD_TYPES, default=config.DATABASE_TYPE, help="Type des shards")
+    parser.add_argument("--directory", default=config.SHARDS_DIR, help="Répertoire des shards")
+    args = parser.parse_args()
+
+    archaeologists, artifacts = rebalance(args.shards, args.type, args.directory)
+    print(f"{args.directory}: {args.shards} shard(s) {args.type}, {archaeologists} archéologue(s), {artifacts} artefact(s)")
+    if os.path.exists(f"{args.directory}.old"):
+        print(f"Anciens shards conservés dans {args.directory}.old")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,855 @@
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional, List
+
+from .artifact_table import ArtifactTable
+from .counters import GlobalCounters
+from .durability import IntervalSync, check_durability, fsync_file
+from .ids import SnowflakeGenerator, normalize_artifact_ids, remap_legacy_ids
+from .models import Archaeologist, Artifact, OwnedArtifacts, stack_key
+from .serializers import load_any
+import config
+
+
+# Politique de durabilité → PRAGMA synchronous (en mode WAL). NORMAL ne synchronise le WAL
+# qu'aux points de contrôle ; en "interval", IntervalSync le synchronise en plus
+# régulièrement après les commits.
+SYNCHRONOUS_LEVELS = {"always": "FULL", "interval": "NORMAL", "os": "NORMAL"}
+
+ARTIFACTS_TABLE = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    artifact_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    rarity TEXT NOT NULL,
+    description TEXT NOT NULL,
+    value INTEGER NOT NULL,
+    discovered_by TEXT NOT NULL,
+    discovered_at TEXT NOT NULL,
+    owner_id TEXT
+);
+"""
+
+ARTIFACT_INDEXES = (
+    "idx_artifacts_owner",
+    "idx_artifacts_owner_rarity",
+    "idx_artifacts_owner_name",
+)
+
+SCHEMA = ARTIFACTS_TABLE + """
+CREATE TABLE IF NOT EXISTS archaeologists (
+    user_id TEXT PRIMARY KEY,
+    username TEXT NOT NULL,
+    level INTEGER NOT NULL DEFAULT 1,
+    experience INTEGER NOT NULL DEFAULT 0,
+    coins INTEGER NOT NULL DEFAULT 0,
+    total_excavations INTEGER NOT NULL DEFAULT 0,
+    pickaxe TEXT NOT NULL DEFAULT 'basic',
+    joined_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS stacks (
+    owner_id TEXT NOT NULL,
+    rarity TEXT NOT NULL,
+    name TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    total_value INTEGER NOT NULL,
+    PRIMARY KEY (owner_id, rarity, name)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_artifacts_owner ON artifacts (owner_id);
+CREATE INDEX IF NOT EXISTS idx_artifacts_owner_rarity ON artifacts (owner_id, rarity);
+CREATE INDEX IF NOT EXISTS idx_artifacts_owner_name ON artifacts (owner_id, lower(name));
+CREATE INDEX IF NOT EXISTS idx_archaeologists_rank
+    ON archaeologists (level DESC, experience DESC, coins DESC);
+""" + """
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS counters_archaeologist_insert AFTER INSERT ON archaeologists BEGIN
+    INSERT INTO counters (name, value) VALUES
+        ('archaeologists', 1),
+        ('excavations', NEW.total_excavations),
+        ('coins', NEW.coins),
+        ('level:' || NEW.level, 1)
+    ON CONFLICT (name) DO UPDATE SET value = value + excluded.value;
+END;
+
+CREATE TRIGGER IF NOT EXISTS counters_archaeologist_delete AFTER DELETE ON archaeologists BEGIN
+    INSERT INTO counters (name, value) VALUES
+        ('archaeologists', -1),
+        ('excavations', -OLD.total_excavations),
+        ('coins', -OLD.coins),
+        ('level:' || OLD.level, -1)
+    ON CONFLICT (name) DO UPDATE SET value = value + excluded.value;
+END;
+
+CREATE TRIGGER IF NOT EXISTS counters_archaeologist_update
+AFTER UPDATE OF total_excavations, coins, level ON archaeologists BEGIN
+    INSERT INTO counters (name, value) VALUES
+        ('excavations', NEW.total_excavations - OLD.total_excavations),
+        ('coins', NEW.coins - OLD.coins),
+        ('level:' || OLD.level, -1),
+        ('level:' || NEW.level, 1)
+    ON CONFLICT (name) DO UPDATE SET value = value + excluded.value;
+END;
+
+CREATE TRIGGER IF NOT EXISTS counters_artifact_insert AFTER INSERT ON artifacts BEGIN
+    INSERT INTO counters (name, value) VALUES ('rarity:' || NEW.rarity, 1)
+    ON CONFLICT (name) DO UPDATE SET value = value + excluded.value;
+END;
+
+CREATE TRIGGER IF NOT EXISTS counters_artifact_delete AFTER DELETE ON artifacts BEGIN
+    INSERT INTO counters (name, value) VALUES ('rarity:' || OLD.rarity, -1)
+    ON CONFLICT (name) DO UPDATE SET value = value + excluded.value;
+END;
+
+CREATE TRIGGER IF NOT EXISTS counters_stack_insert AFTER INSERT ON stacks BEGIN
+    INSERT INTO counters (name, value) VALUES ('rarity:' || NEW.rarity, NEW.count)
+    ON CONFLICT (name) DO UPDATE SET value = value + excluded.value;
+END;
+
+CREATE TRIGGER IF NOT EXISTS counters_stack_delete AFTER DELETE ON stacks BEGIN
+    INSERT INTO counters (name, value) VALUES ('rarity:' || OLD.rarity, -OLD.count)
+    ON CONFLICT (name) DO UPDATE SET value = value + excluded.value;
+END;
+
+CREATE TRIGGER IF NOT EXISTS counters_stack_update AFTER UPDATE OF count ON stacks BEGIN
+    INSERT INTO counters (name, value) VALUES ('rarity:' || NEW.rarity, NEW.count - OLD.count)
+    ON CONFLICT (name) DO UPDATE SET value = value + excluded.value;
+END;
+"""
+
+# Valeurs réelles des compteurs, calculées sur toute la base (vérification, réparation).
+# Comme avec DatabaseManager, tout artefact enregistré est compté, possédé ou non.
+COUNTERS_QUERY = """
+SELECT name, SUM(value) FROM (
+    SELECT 'archaeologists' AS name, COUNT(*) AS value FROM archaeologists
+    UNION ALL SELECT 'excavations', COALESCE(SUM(total_excavations), 0) FROM archaeologists
+    UNION ALL SELECT 'coins', COALESCE(SUM(coins), 0) FROM archaeologists
+    UNION ALL SELECT 'level:' || level, COUNT(*) FROM archaeologists GROUP BY level
+    UNION ALL SELECT 'rarity:' || rarity, COUNT(*) FROM artifacts GROUP BY rarity
+    UNION ALL SELECT 'rarity:' || rarity, SUM(count) FROM stacks GROUP BY rarity
+) GROUP BY name
+"""
+
+ARCHAEOLOGIST_COLUMNS = (
+    "user_id, username, level, experience, coins, total_excavations, pickaxe, joined_at"
+)
+ARTIFACT_COLUMNS = (
+    "name, rarity, description, value, discovered_by, discovered_at, artifact_id"
+)
+
+
+# Sauvegarde d'un archéologue : une mise à jour de la ligne existante (trigger UPDATE des
+# compteurs) plutôt qu'un REPLACE, qui la supprimerait puis la réinsérerait.
+ARCHAEOLOGIST_UPSERT = (
+    f"INSERT INTO archaeologists ({ARCHAEOLOGIST_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (user_id) DO UPDATE SET "
+    "username = excluded.username, level = excluded.level, experience = excluded.experience, "
+    "coins = excluded.coins, total_excavations = excluded.total_excavations, "
+    "pickaxe = excluded.pickaxe, joined_at = excluded.joined_at"
+)
+STACK_UPSERT = (
+    "INSERT INTO stacks (owner_id, rarity, name, count, total_value) VALUES (?, ?, ?, ?, ?) "
+    "ON CONFLICT (owner_id, rarity, name) DO UPDATE SET "
+    "count = count + excluded.count, total_value = total_value + excluded.total_value"
+)
+
+
+class SQLiteDatabaseManager:
+    #Gère la persistance des données dans une base SQLite indexée.
+    #Expose la même API que DatabaseManager. Un artefact rangé par add_finds appartient à
+    #son découvreur dès sa création (colonne owner_id) : la liste `artifacts` d'un
+    #archéologue est reconstruite depuis l'index propriétaire. Comme avec DatabaseManager,
+    #un artefact créé seul (create_artifact) n'appartient à personne tant que l'archéologue
+    #ne l'a pas ajouté à sa liste puis sauvegardé. Les IDs d'artefacts sont des entiers
+    #snowflake, qui servent directement de rowid. De même, les piles du mode d'inventaire
+    #"stacks" sont des lignes de la table stacks, écrites par add_find et les ventes.
+
+    def __init__(
+        self,
+        db_path: str = config.SQLITE_PATH,
+        worker_id: int = 0,
+        inventory_mode: str = config.INVENTORY_MODE,
+        durability: str = config.DATABASE_DURABILITY,
+    ):
+        #Initialise la connexion et le schéma.
+        #durability choisit le niveau de synchronisation de SQLite (SYNCHRONOUS_LEVELS).
+        if inventory_mode not in ("items", "stacks"):
+            raise ValueError(f"INVENTORY_MODE inconnu: {inventory_mode}")
+        self.db_path = db_path
+        self.inventory_mode = inventory_mode
+        self._ids = SnowflakeGenerator(worker_id)
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"PRAGMA synchronous={SYNCHRONOUS_LEVELS[check_durability(durability)]}")
+        self._syncer = IntervalSync() if durability == "interval" else None
+        # INSERT OR REPLACE déclenche alors aussi les triggers DELETE (compteurs exacts).
+        self._conn.execute("PRAGMA recursive_triggers=ON")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+        self._upgrade_artifact_ids()
+        self._in_transaction = False
+        self._deferred = False
+        self._pending = 0
+        if self._upgrade_counter_triggers() or self._conn.execute("SELECT COUNT(*) FROM counters").fetchone()[0] == 0:
+            # Base antérieure aux compteurs (ou vide) : ils sont calculés une fois.
+            self.rebuild_counters()
+        if inventory_mode == "stacks":
+            self._fold_into_stacks()
+
+    def _upgrade_counter_triggers(self) -> bool:
+        #Remplace les triggers d'artefacts des bases qui ne comptaient que les artefacts
+        #possédés. Retourne True s'ils ont été remplacés (compteurs à recalculer).
+        outdated = [
+            name
+            for name, sql in self._conn.execute(
+                "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'counters_artifact_%'"
+            )
+            if "owner_id IS NOT NULL" in sql
+        ]
+        if not outdated:
+            return False
+        for name in outdated:
+            self._conn.execute(f"DROP TRIGGER {name}")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+        return True
+
+    def _upgrade_artifact_ids(self):
+        #Convertit une ancienne table d'artefacts à clés UUID (TEXT) en clés entières.
+        columns = {row[1]: row[2] for row in self._conn.execute("PRAGMA table_info(artifacts)")}
+        if columns.get("artifact_id", "").upper() != "TEXT":
+            return
+
+        rows = self._conn.execute(
+            f"SELECT {ARTIFACT_COLUMNS}, owner_id FROM artifacts"
+        ).fetchall()
+        remapped = remap_legacy_ids([(row[6], {"discovered_at": row[5]}) for row in rows])
+
+        # DDL et copie dans une seule transaction : un arrêt brutal laisse l'ancienne table intacte.
+        self._conn.execute("BEGIN")
+        with self._conn:
+            for index in ARTIFACT_INDEXES:
+                self._conn.execute(f"DROP INDEX IF EXISTS {index}")
+            self._conn.execute("ALTER TABLE artifacts RENAME TO artifacts_legacy")
+            self._conn.execute(ARTIFACTS_TABLE)
+            self._conn.executemany(
+                f"INSERT INTO artifacts ({ARTIFACT_COLUMNS}, owner_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (row[:6] + (remapped[row[6]], row[7]) for row in rows),
+            )
+            self._conn.execute("DROP TABLE artifacts_legacy")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        #Ferme la connexion SQLite (après l'écriture des commits différés et une dernière
+        #synchronisation du WAL).
+        self.flush()
+        if self._syncer is not None:
+            self._syncer.close()
+        self._conn.close()
+
+    @contextmanager
+    def transaction(self, operation: str = "transaction"):
+        #Regroupe les mutations du bloc dans une seule transaction SQLite (un seul COMMIT).
+        #En cas d'exception, tout est annulé. Une transaction imbriquée rejoint l'englobante.
+        if self._in_transaction:
+            yield self
+            return
+
+        self._in_transaction = True
+        try:
+            with self._atomic():
+                yield self
+        finally:
+            self._in_transaction = False
+
+    @contextmanager
+    def _write_block(self):
+        #Bloc d'écriture : validé immédiatement, ou à la fin de la transaction en cours.
+        if self._in_transaction:
+            yield
+        else:
+            with self._atomic():
+                yield
+
+    @contextmanager
+    def _atomic(self):
+        #Bloc validé d'un seul tenant. En écriture différée, c'est un point de sauvegarde
+        #(annulé seul en cas d'exception) dans une transaction validée par flush().
+        if not self._deferred:
+            with self._conn:
+                yield
+            self._committed()
+            return
+
+        if not self._conn.in_transaction:
+            self._conn.execute("BEGIN")
+        self._conn.execute("SAVEPOINT command")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK TO command")
+            self._conn.execute("RELEASE command")
+            raise
+        self._conn.execute("RELEASE command")
+        self._pending += 1
+
+    # ===== Écriture différée =====
+
+    def defer_writes(self, enabled: bool = True):
+        #Active l'écriture différée : les commits restent dans une transaction ouverte
+        #jusqu'à flush() (voir database.flusher). La désactiver valide ceux en attente.
+        if not enabled:
+            self.flush()
+        self._deferred = enabled
+
+    @property
+    def pending_writes(self) -> int:
+        #Commits en attente d'écriture (chacun peut modifier plusieurs lignes).
+        return self._pending
+
+    def flush(self) -> int:
+        #Valide les commits différés en un seul COMMIT. Retourne le nombre de commits écrits.
+        pending, self._pending = self._pending, 0
+        if not self._conn.in_transaction:
+            return 0
+        self._conn.commit()
+        self._committed()
+        return pending
+
+    def _committed(self):
+        #Après un commit : synchronisation groupée du WAL en durabilité "interval".
+        if self._syncer is not None:
+            self._syncer.request(self.db_path, self._sync_wal)
+
+    def _sync_wal(self):
+        try:
+            fsync_file(f"{self.db_path}-wal")
+        except FileNotFoundError:
+            pass
+
+    def _fold_into_stacks(self):
+        #Regroupe en piles les artefacts individuels restants (passage au mode "stacks").
+        with self._write_block():
+            self._conn.execute(
+                "INSERT INTO stacks (owner_id, rarity, name, count, total_value) "
+                "SELECT owner_id, rarity, name, COUNT(*), SUM(value) FROM artifacts "
+                "WHERE owner_id IS NOT NULL GROUP BY owner_id, rarity, name "
+                "ON CONFLICT (owner_id, rarity, name) DO UPDATE SET "
+                "count = count + excluded.count, total_value = total_value + excluded.total_value"
+            )
+            self._conn.execute("DELETE FROM artifacts WHERE owner_id IS NOT NULL")
+
+    # ===== Compteurs globaux =====
+
+    def _counters(self) -> GlobalCounters:
+        return GlobalCounters(dict(self._conn.execute("SELECT name, value FROM counters")))
+
+    def _count_records(self) -> GlobalCounters:
+        return GlobalCounters(dict(self._conn.execute(COUNTERS_QUERY)))
+
+    def get_global_stats(self) -> dict:
+        #Statistiques du serveur, lues dans la table counters (tenue à jour par des triggers).
+        return self._counters().summary()
+
+    def verify_counters(self) -> dict:
+        #Compare les compteurs aux données. Retourne les écarts {compteur: (enregistré, réel)}.
+        return self._counters().differences(self._count_records())
+
+    def rebuild_counters(self) -> dict:
+        #Recalcule et enregistre les compteurs. Retourne les écarts corrigés.
+        with self._write_block():
+            differences = self._counters().differences(self._count_records())
+            self._conn.execute("DELETE FROM counters")
+            self._conn.execute(f"INSERT INTO counters (name, value) {COUNTERS_QUERY}")
+        return differences
+
+    # ===== Migration =====
+
+    def is_empty(self) -> bool:
+        #Indique si la base ne contient encore aucun archéologue ni artefact.
+        row = self._conn.execute(
+            "SELECT (SELECT COUNT(*) FROM archaeologists) + (SELECT COUNT(*) FROM artifacts)"
+        ).fetchone()
+        return row[0] == 0
+
+    def migrate_from_json(self, json_path: str = config.DATABASE_PATH) -> tuple[int, int]:
+        #Importe un fichier database.json existant. Retourne (nb_archéologues, nb_artefacts).
+        with open(json_path, "rb") as f:
+            return self.import_data(load_any(f.read()))
+
+    def import_data(self, data: dict) -> tuple[int, int]:
+        #Importe des enregistrements au format du snapshot JSON (database.json, export_data).
+        #Retourne (nb_archéologues, nb_artefacts).
+        data.setdefault("archaeologists", {})
+        data.setdefault("artifacts", {})
+        if ArtifactTable.is_snapshot(data["artifacts"]):
+            data["artifacts"] = dict(ArtifactTable.from_snapshot(data["artifacts"]).items())
+        normalize_artifact_ids(data)
+        archaeologists = data["archaeologists"]
+        artifacts = data["artifacts"]
+
+        owners = {}
+        stacks = []
+        for user_id, archaeologist in archaeologists.items():
+            for artifact_id in archaeologist.get("artifacts", []):
+                owners[artifact_id] = str(user_id)
+            for stack in Archaeologist.from_dict(archaeologist).get_stacks():
+                stacks.append((str(user_id), stack.rarity, stack.name, stack.count, stack.total_value))
+
+        with self._write_block():
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO archaeologists ({ARCHAEOLOGIST_COLUMNS}) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self._archaeologist_row(Archaeologist.from_dict(a))
+                    for a in archaeologists.values()
+                ),
+            )
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO artifacts ({ARTIFACT_COLUMNS}, owner_id) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self._artifact_row(Artifact.from_dict(a)) + (owners.get(artifact_id),)
+                    for artifact_id, a in artifacts.items()
+                ),
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO stacks (owner_id, rarity, name, count, total_value) "
+                "VALUES (?, ?, ?, ?, ?)",
+                stacks,
+            )
+
+        return len(archaeologists), len(artifacts)
+
+    def export_data(self) -> dict:
+        #Copie des enregistrements au format du snapshot JSON (voir DatabaseManager.export_data).
+        return {
+            "archaeologists": {
+                archaeologist.user_id: archaeologist.to_dict()
+                for archaeologist in self.get_all_archaeologists()
+            },
+            "artifacts": {
+                row[6]: Artifact(*row).to_dict()
+                for row in self._conn.execute(f"SELECT {ARTIFACT_COLUMNS} FROM artifacts")
+            },
+        }
+
+    # ===== Conversions =====
+
+    @staticmethod
+    def _archaeologist_row(archaeologist: Archaeologist) -> tuple:
+        return (
+            archaeologist.user_id,
+            archaeologist.username,
+            archaeologist.level,
+            archaeologist.experience,
+            archaeologist.coins,
+            archaeologist.total_excavations,
+            archaeologist.pickaxe,
+            archaeologist.joined_at,
+        )
+
+    @staticmethod
+    def _artifact_row(artifact: Artifact) -> tuple:
+        return (
+            artifact.name,
+            artifact.rarity,
+            artifact.description,
+            artifact.value,
+            artifact.discovered_by,
+            artifact.discovered_at,
+            artifact.artifact_id,
+        )
+
+    def _owned_artifact_ids(self, user_id: str) -> OwnedArtifacts:
+        return OwnedArtifacts(
+            row[0]
+            for row in self._conn.execute(
+                "SELECT artifact_id FROM artifacts WHERE owner_id = ? ORDER BY artifact_id",
+                (user_id,),
+            )
+        )
+
+    def _stacks(self, user_id: str) -> dict:
+        return {
+            stack_key(rarity, name): [count, total_value]
+            for rarity, name, count, total_value in self._conn.execute(
+                "SELECT rarity, name, count, total_value FROM stacks WHERE owner_id = ?",
+                (user_id,),
+            )
+        }
+
+    def _to_archaeologist(self, row: tuple) -> Archaeologist:
+        user_id, username, level, experience, coins, total_excavations, pickaxe, joined_at = row
+        return Archaeologist(
+            user_id=user_id,
+            username=username,
+            level=level,
+            experience=experience,
+            coins=coins,
+            artifacts=self._owned_artifact_ids(user_id),
+            total_excavations=total_excavations,
+            pickaxe=pickaxe,
+            joined_at=joined_at,
+            stacks=self._stacks(user_id),
+        )
+
+    # ===== Archéologues =====
+
+    def get_archaeologist(self, user_id: str) -> Optional[Archaeologist]:
+        #Récupère un archéologue par son ID utilisateur.
+        row = self._conn.execute(
+            f"SELECT {ARCHAEOLOGIST_COLUMNS} FROM archaeologists WHERE user_id = ?",
+            (str(user_id),),
+        ).fetchone()
+
+        if row:
+            return self._to_archaeologist(row)
+        return None
+
+    def create_archaeologist(self, user_id: str, username: str) -> Archaeologist:
+        #Crée un nouvel archéologue.
+        archaeologist = Archaeologist(
+            user_id=str(user_id),
+            username=username
+        )
+        self.save_archaeologist(archaeologist)
+        return archaeologist
+
+    def save_archaeologist(self, archaeologist: Archaeologist):
+        #Sauvegarde les données d'un archéologue (hors piles, écrites à part). Comme avec le
+        #stockage JSON, la propriété suit sa liste d'artefacts : ceux qui en sont sortis sont
+        #libérés, ceux sans propriétaire qui y sont entrés lui sont attribués. Un comptage sur
+        #l'index propriétaire évite les deux UPDATE quand la liste n'a pas changé.
+        user_id = str(archaeologist.user_id)
+        listed = json.dumps(list(archaeologist.artifacts))
+        with self._write_block():
+            self._conn.execute(ARCHAEOLOGIST_UPSERT, self._archaeologist_row(archaeologist))
+            owned, kept = self._conn.execute(
+                "SELECT COUNT(*), COUNT(*) FILTER (WHERE artifact_id IN (SELECT value FROM json_each(?))) "
+                "FROM artifacts WHERE owner_id = ?",
+                (listed, user_id),
+            ).fetchone()
+            if kept < owned:
+                self._conn.execute(
+                    "UPDATE artifacts SET owner_id = NULL WHERE owner_id = ? "
+                    "AND artifact_id NOT IN (SELECT value FROM json_each(?))",
+                    (user_id, listed),
+                )
+            if kept < len(archaeologist.artifacts):
+                self._conn.execute(
+                    "UPDATE artifacts SET owner_id = ? WHERE artifact_id IN (SELECT value FROM json_each(?)) "
+                    "AND owner_id IS NULL",
+                    (user_id, listed),
+                )
+
+    def get_all_archaeologists(self) -> List[Archaeologist]:
+        #Récupère tous les archéologues.
+        rows = self._conn.execute(
+            f"SELECT {ARCHAEOLOGIST_COLUMNS} FROM archaeologists"
+        ).fetchall()
+        return [self._to_archaeologist(row) for row in rows]
+
+    # ===== Artefacts =====
+
+    def add_finds(self, archaeologist: Archaeologist, finds: List[tuple]) -> List[Artifact]:
+        #Range des trouvailles (name, rarity, description, value) selon le mode d'inventaire :
+        #nouveaux artefacts ("items") ou piles incrémentées ("stacks", les artefacts
+        #retournés ne sont pas enregistrés).
+        user_id = str(archaeologist.user_id)
+        if self.inventory_mode == "stacks":
+            with self._write_block():
+                self._conn.executemany(
+                    STACK_UPSERT,
+                    ((user_id, rarity, name, 1, value) for name, rarity, _, value in finds),
+                )
+            for name, rarity, _, value in finds:
+                archaeologist.add_to_stack(name, rarity, value)
+            return [Artifact(name, rarity, description, value, user_id) for name, rarity, description, value in finds]
+
+        artifacts = self._insert_artifacts(finds, user_id, user_id)
+        for artifact in artifacts:
+            archaeologist.add_artifact(artifact.artifact_id)
+        return artifacts
+
+    def add_find(
+        self,
+        archaeologist: Archaeologist,
+        name: str,
+        rarity: str,
+        description: str,
+        value: int,
+    ) -> Artifact:
+        #Range une seule trouvaille (voir add_finds).
+        return self.add_finds(archaeologist, [(name, rarity, description, value)])[0]
+
+    def _insert_artifacts(self, finds: List[tuple], discovered_by: str, owner_id: Optional[str]) -> List[Artifact]:
+        #Enregistre des artefacts (name, rarity, description, value) en un seul INSERT groupé.
+        artifacts = [
+            Artifact(name, rarity, description, value, discovered_by, artifact_id=self._ids.next_id())
+            for name, rarity, description, value in finds
+        ]
+        with self._write_block():
+            self._conn.executemany(
+                f"INSERT INTO artifacts ({ARTIFACT_COLUMNS}, owner_id) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (self._artifact_row(artifact) + (owner_id,) for artifact in artifacts),
+            )
+        return artifacts
+
+    def create_artifacts(self, finds: List[tuple], discovered_by: str) -> List[Artifact]:
+        #Crée plusieurs artefacts (name, rarity, description, value), sans propriétaire.
+        return self._insert_artifacts(finds, str(discovered_by), None)
+
+    def create_artifact(
+        self,
+        name: str,
+        rarity: str,
+        description: str,
+        value: int,
+        discovered_by: str
+    ) -> Artifact:
+        #Crée un nouvel artefact, sans propriétaire (voir create_artifacts).
+        return self._insert_artifacts([(name, rarity, description, value)], str(discovered_by), None)[0]
+
+    def get_artifact(self, artifact_id: int) -> Optional[Artifact]:
+        #Récupère un artefact par son ID.
+        try:
+            artifact_id = int(artifact_id)
+        except (TypeError, ValueError):
+            return None
+        row = self._conn.execute(
+            f"SELECT {ARTIFACT_COLUMNS} FROM artifacts WHERE artifact_id = ?",
+            (artifact_id,),
+        ).fetchone()
+
+        if row:
+            return Artifact(*row)
+        return None
+
+    def get_artifacts(self, artifact_ids) -> List[Artifact]:
+        #Récupère plusieurs artefacts par leurs IDs (les IDs inconnus sont ignorés).
+        artifact_ids = list(artifact_ids)
+        found = {}
+        # Par lots pour rester sous la limite de paramètres de SQLite
+        for start in range(0, len(artifact_ids), 500):
+            chunk = artifact_ids[start:start + 500]
+            placeholders = ", ".join("?" for _ in chunk)
+            for row in self._conn.execute(
+                f"SELECT {ARTIFACT_COLUMNS} FROM artifacts WHERE artifact_id IN ({placeholders})",
+                chunk,
+            ):
+                artifact = Artifact(*row)
+                found[artifact.artifact_id] = artifact
+        return [found[artifact_id] for artifact_id in artifact_ids if artifact_id in found]
+
+    def get_archaeologist_artifacts_by_rarity(self, user_id: str) -> dict[str, List[Artifact]]:
+        #Récupère les artefacts d'un archéologue groupés par rareté.
+        grouped = {rarity: [] for rarity in config.RARITY_LEVELS}
+        for artifact in self.get_archaeologist_artifacts(user_id):
+            grouped.setdefault(artifact.rarity, []).append(artifact)
+        return grouped
+
+    def get_archaeologist_artifacts(self, user_id: str) -> List[Artifact]:
+        #Récupère tous les artefacts d'un archéologue (via l'index propriétaire).
+        rows = self._conn.execute(
+            f"SELECT {ARTIFACT_COLUMNS} FROM artifacts WHERE owner_id = ? ORDER BY rowid",
+            (str(user_id),),
+        )
+        return [Artifact(*row) for row in rows]
+
+    # ===== Ventes d'artefacts =====
+
+    def sell_single_artifact(self, user_id: str, artifact_name: str) -> tuple[int, Optional[int]]:
+        #Vend un artefact par son nom (insensible à la casse). Retourne (coins_gagnés, artifact_id).
+        user_id = str(user_id)
+        with self._write_block():
+            row = self._conn.execute(
+                "SELECT artifact_id, value FROM artifacts "
+                "WHERE owner_id = ? AND lower(name) = ? ORDER BY rowid LIMIT 1",
+                (user_id, artifact_name.lower()),
+            ).fetchone()
+            if not row:
+                return self._sell_from_stack(user_id, artifact_name), None
+            if int(row[1]) == 0:
+                return 0, None
+
+            sold_id, coins_gained = row[0], int(row[1])
+            updated = self._conn.execute(
+                "UPDATE archaeologists SET coins = coins + ? WHERE user_id = ?",
+                (coins_gained, user_id),
+            ).rowcount
+            if not updated:
+                return 0, None
+            self._conn.execute("DELETE FROM artifacts WHERE artifact_id = ?", (sold_id,))
+
+        return coins_gained, sold_id
+
+    def _sell_from_stack(self, user_id: str, artifact_name: str) -> int:
+        #Vend un artefact de la pile de ce nom la moins rare, au prix moyen de la pile.
+        rows = self._conn.execute(
+            "SELECT rarity, name, count, total_value FROM stacks WHERE owner_id = ? AND lower(name) = ?",
+            (user_id, artifact_name.lower()),
+        ).fetchall()
+        if not rows:
+            return 0
+        ranks = {rarity: index for index, rarity in enumerate(config.RARITY_LEVELS)}
+        rarity, name, count, total_value = min(rows, key=lambda row: ranks.get(row[0], len(ranks)))
+        coins_gained = total_value if count == 1 else total_value // count
+        if coins_gained == 0:
+            return 0
+
+        updated = self._conn.execute(
+            "UPDATE archaeologists SET coins = coins + ? WHERE user_id = ?",
+            (coins_gained, user_id),
+        ).rowcount
+        if not updated:
+            return 0
+        if count == 1:
+            self._conn.execute(
+                "DELETE FROM stacks WHERE owner_id = ? AND rarity = ? AND name = ?",
+                (user_id, rarity, name),
+            )
+        else:
+            self._conn.execute(
+                "UPDATE stacks SET count = count - 1, total_value = total_value - ? "
+                "WHERE owner_id = ? AND rarity = ? AND name = ?",
+                (coins_gained, user_id, rarity, name),
+            )
+        return coins_gained
+
+    def sell_artifacts_by_rarity(self, user_id: str, max_rarity: str) -> tuple[int, int]:
+        #Vend tous les artefacts (et piles) d'une rareté <= max_rarity.
+        #Retourne (coins_gagnés, nb_vendus).
+        if max_rarity not in config.RARITY_LEVELS:
+            return 0, 0
+
+        user_id = str(user_id)
+        max_index = config.RARITY_LEVELS.index(max_rarity)
+        allowed = config.RARITY_LEVELS[: max_index + 1]
+        placeholders = ", ".join("?" for _ in allowed)
+        condition = f"owner_id = ? AND rarity IN ({placeholders})"
+
+        with self._write_block():
+            coins_gained, sold_count = self._conn.execute(
+                f"SELECT COALESCE(SUM(value), 0), COUNT(*) FROM artifacts WHERE {condition}",
+                (user_id, *allowed),
+            ).fetchone()
+            stack_coins, stack_count = self._conn.execute(
+                f"SELECT COALESCE(SUM(total_value), 0), COALESCE(SUM(count), 0) FROM stacks WHERE {condition}",
+                (user_id, *allowed),
+            ).fetchone()
+            coins_gained += stack_coins
+            sold_count += stack_count
+            if sold_count == 0:
+                return 0, 0
+
+            updated = self._conn.execute(
+                "UPDATE archaeologists SET coins = coins + ? WHERE user_id = ?",
+                (coins_gained, user_id),
+            ).rowcount
+            if not updated:
+                return 0, 0
+            self._conn.execute(f"DELETE FROM artifacts WHERE {condition}", (user_id, *allowed))
+            self._conn.execute(f"DELETE FROM stacks WHERE {condition}", (user_id, *allowed))
+
+        return int(coins_gained), sold_count
+
+    def get_leaderboard(self, limit: int = 10, offset: int = 0) -> List[tuple]:
+        #Récupère le classement par niveau, expérience et pièces (index idx_archaeologists_rank).
+        return [
+            tuple(row)
+            for row in self._conn.execute(
+                "SELECT username, level, experience, coins, "
+                "(SELECT COUNT(*) FROM artifacts WHERE owner_id = a.user_id) "
+                "+ (SELECT COALESCE(SUM(count), 0) FROM stacks WHERE owner_id = a.user_id) "
+                "FROM archaeologists AS a "
+                "ORDER BY level DESC, experience DESC, coins DESC LIMIT ? OFFSET ?",
+                (limit, offset),
+            )
+        ]
+
+    def get_rank(self, user_id: str) -> Optional[int]:
+        #Récupère le rang (à partir de 1) d'un archéologue, ou None s'il n'existe pas.
+        #Les ex æquo partagent le rang (1 + joueurs strictement devant). Le décompte parcourt
+        #l'index de classement jusqu'au joueur : O(rang), et non O(log n).
+        key = self.get_rank_key(user_id)
+        if key is None:
+            return None
+        return self.count_ahead(*key) + 1
+
+    def get_rank_key(self, user_id: str) -> Optional[tuple]:
+        #(niveau, expérience, pièces) d'un archéologue, ou None.
+        row = self._conn.execute(
+            "SELECT level, experience, coins FROM archaeologists WHERE user_id = ?",
+            (str(user_id),),
+        ).fetchone()
+        return tuple(row) if row else None
+
+    def count_ahead(self, level: int, experience: int, coins: int) -> int:
+        #Nombre d'archéologues classés strictement devant ces valeurs (parcours O(rang)).
+        return self._conn.execute(
+            "SELECT COUNT(*) FROM archaeologists WHERE (level, experience, coins) > (?, ?, ?)",
+            (level, experience, coins),
+        ).fetchone()[0]
+
+    def count_archaeologists(self) -> int:
+        #Nombre d'archéologues enregistrés.
+        return self._conn.execute("SELECT COUNT(*) FROM archaeologists").fetchone()[0]
+
+    def get_pickaxe(self, user_id: str) -> str:
+        """Récupère la pioche actuelle de l'archéologue."""
+        row = self._conn.execute(
+            "SELECT pickaxe FROM archaeologists WHERE user_id = ?", (str(user_id),)
+        ).fetchone()
+        return row[0] if row else "basic"
+
+    def buy_pickaxe(self, user_id: str, pickaxe_type: str) -> tuple[bool, str]:
+        """Achète une pioche pour l'archéologue. Retourne (succès, message)."""
+        if pickaxe_type not in config.PICKAXES:
+            return False, f"⛏️ Pioche inconnue: {pickaxe_type}"
+
+        pickaxe_info = config.PICKAXES[pickaxe_type]
+        cost = pickaxe_info["cost"]
+
+        with self._write_block():
+            row = self._conn.execute(
+                "SELECT coins, pickaxe FROM archaeologists WHERE user_id = ?", (str(user_id),)
+            ).fetchone()
+            if not row:
+                return False, "👤 Archéologue introuvable"
+
+            coins, old_pickaxe = row
+            if old_pickaxe == pickaxe_type:
+                return False, f"⛏️ Vous possédez déjà la pioche {pickaxe_info['name']}!"
+            if coins < cost:
+                return False, f"🪙 Pièces insuffisantes. Vous en avez {coins}, il en faut {cost}."
+
+            self._conn.execute(
+                "UPDATE archaeologists SET coins = coins - ?, pickaxe = ? WHERE user_id = ?",
+                (cost, pickaxe_type, str(user_id)),
+            )
+
+        return True, f"Vous avez acheté la pioche **{pickaxe_info['name']}** (Coût: {cost} 🪙)\nAncienne pioche: {config.PICKAXES[old_pickaxe]['name']}"
+
+
+def open_sqlite_database(
+    db_path: str = config.SQLITE_PATH,
+    json_path: str = config.DATABASE_PATH,
+) -> SQLiteDatabaseManager:
+    #Ouvre la base SQLite et y migre database.json lors du premier démarrage.
+    manager = SQLiteDatabaseManager(db_path)
+    if manager.is_empty() and os.path.exists(json_path):
+        archaeologists, artifacts = manager.migrate_from_json(json_path)
+        print(f"Migration JSON -> SQLite: {archaeologists} archéologue(s), {artifacts} artefact(s)")
+    return manager
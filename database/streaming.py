@@ -0,0 +1,659 @@
+#Lecture en flux d'une base, sans la charger en mémoire (statistiques, exports).
+
+import base64
+import gzip
+import io
+import json
+import os
+import re
+import sqlite3
+import sys
+from array import array
+from typing import Iterator, Optional
+
+import config
+from .archive import archive_directory, iter_archived
+from .artifact_table import COLUMNS, CUSTOM, SNAPSHOT_FORMAT
+from .durability import read_with_backup
+from .serializers import GZIP_MAGIC, ZSTD_MAGIC, msgpack, verify_sealed, zstandard
+
+
+CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_STRING_BODY = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*')
+_SKIPPABLE = re.compile(r'(?:[^\[\]{}"]+|"[^"\\]*(?:\\.[^"\\]*)*")*')
+
+
+class JsonStream:
+    #Analyseur JSON incrémental : le texte est lu par blocs et seules les valeurs demandées
+    #sont décodées (json.JSONDecoder.raw_decode), les autres sont sautées sans être
+    #construites. Les objets se parcourent clé par clé avec items() : l'appelant consomme
+    #la valeur de chaque clé (value, skip, items ou bytes_chunks) avant de passer à la suivante.
+
+    def __init__(self, text: io.TextIOBase, chunk_size: int = CHUNK_SIZE):
+        self._text = text
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self, size: Optional[int] = None) -> bool:
+        #Ajoute un bloc au tampon (en abandonnant la partie déjà lue). False en fin de fichier.
+        if self._eof:
+            return False
+        chunk = self._text.read(size or self._chunk_size)
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        if not chunk:
+            self._eof = True
+        return bool(chunk)
+
+    def _peek(self) -> str:
+        #Premier caractère significatif (les blancs sont consommés), "" en fin de fichier.
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, char: str):
+        if self._peek() != char:
+            raise ValueError(f"JSON invalide: '{char}' attendu à la position {self._pos}")
+        self._pos += 1
+
+    def value(self):
+        #Décode entièrement la valeur suivante.
+        self._peek()
+        size = self._chunk_size
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                end = None
+            # Une valeur qui touche la fin du tampon (nombre, littéral) peut être tronquée.
+            if end is not None and (end < len(self._buffer) or self._eof):
+                self._pos = end
+                return value
+            if not self._fill(size):
+                if end is None:
+                    raise ValueError(f"JSON invalide à la position {self._pos}")
+                self._pos = end
+                return value
+            size *= 2
+
+    def items(self) -> Iterator:
+        #Parcourt les clés d'un objet ; la valeur de chaque clé doit être consommée.
+        self._expect("{")
+        if self._peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.value()
+            self._expect(":")
+            yield key
+            if self._peek() == ",":
+                self._pos += 1
+                continue
+            self._expect("}")
+            return
+
+    def _string_pieces(self) -> Iterator[str]:
+        #Contenu brut (échappements non décodés) d'une chaîne, morceau par morceau.
+        self._expect('"')
+        while True:
+            end = _STRING_BODY.match(self._buffer, self._pos).end()
+            if end < len(self._buffer) and self._buffer[end] == '"':
+                yield self._buffer[self._pos:end]
+                self._pos = end + 1
+                return
+            # Un échappement coupé en fin de tampon n'est pas retenu par _STRING_BODY :
+            # il est relu avec le bloc suivant.
+            if end > self._pos:
+                yield self._buffer[self._pos:end]
+            self._pos = end
+            if not self._fill():
+                raise ValueError("JSON invalide: chaîne non terminée")
+
+    def skip(self):
+        #Saute la valeur suivante sans la construire.
+        first = self._peek()
+        if first == '"':
+            for _ in self._string_pieces():
+                pass
+            return
+        if first not in "[{":
+            self.value()
+            return
+
+        depth = 0
+        while True:
+            # Saute d'un coup le texte et les chaînes complètes jusqu'au prochain délimiteur
+            self._pos = _SKIPPABLE.match(self._buffer, self._pos).end()
+            if self._pos == len(self._buffer):
+                if not self._fill():
+                    raise ValueError("JSON invalide: valeur non terminée")
+                continue
+            char = self._buffer[self._pos]
+            if char == '"':
+                # Chaîne coupée par la fin du tampon : lue par morceaux
+                for _ in self._string_pieces():
+                    pass
+                continue
+            self._pos += 1
+            depth += 1 if char in "[{" else -1
+            if depth == 0:
+                return
+
+    def bytes_chunks(self) -> Iterator[bytes]:
+        #Décode par morceaux une chaîne base64 (colonne d'une table d'artefacts).
+        pending = ""
+        for piece in self._string_pieces():
+            pending += piece
+            usable = len(pending) - len(pending) % 4
+            if usable:
+                yield base64.b64decode(pending[:usable])
+                pending = pending[usable:]
+        if pending:
+            yield base64.b64decode(pending)
+
+
+class MsgpackStream:
+    #Même interface que JsonStream pour un snapshot MessagePack (msgpack.Unpacker).
+    #Une colonne d'artefacts y est un seul objet bytes, lu d'un bloc.
+
+    def __init__(self, stream):
+        self._unpacker = msgpack.Unpacker(stream, raw=False, strict_map_key=False, max_buffer_size=0)
+
+    def value(self):
+        return self._unpacker.unpack()
+
+    def items(self) -> Iterator:
+        for _ in range(self._unpacker.read_map_header()):
+            yield self._unpacker.unpack()
+
+    def skip(self):
+        self._unpacker.skip()
+
+    def bytes_chunks(self) -> Iterator[bytes]:
+        yield self._unpacker.unpack()
+
+
+def _decompressed(raw: io.BufferedReader):
+    #Contenu décompressé d'un snapshot ouvert en binaire (compression détectée comme load_any).
+    magic = raw.peek(4)[:4]
+    if magic.startswith(GZIP_MAGIC):
+        return gzip.GzipFile(fileobj=raw)
+    if magic.startswith(ZSTD_MAGIC):
+        if zstandard is None:
+            raise ValueError("Snapshot compressé en zstd : le paquet 'zstandard' est requis")
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(raw))
+    return raw
+
+
+def snapshot_reader(raw: io.BufferedReader):
+    #Lecteur en flux d'un snapshot ouvert en binaire, quel que soit son format (détecté
+    #comme load_any). La somme de contrôle n'est pas vérifiée : voir readable_snapshot.
+    stream = _decompressed(raw)
+    first = stream.peek(64).lstrip()[:1]
+    if first in (b"{", b"["):
+        return JsonStream(io.TextIOWrapper(stream, encoding="utf-8"))
+    if msgpack is None:
+        raise ValueError("Snapshot MessagePack : le paquet 'msgpack' est requis")
+    return MsgpackStream(stream)
+
+
+def _check_snapshot(path: str):
+    #Vérifie un snapshot en une lecture par blocs : sa somme de contrôle, ou pour un ancien
+    #snapshot qui n'en a pas, que sa valeur racine est complète. Lève une exception sinon.
+    with open(path, "rb") as raw:
+        if verify_sealed(_decompressed(raw), CHUNK_SIZE):
+            return
+    with open(path, "rb") as raw:
+        snapshot_reader(raw).skip()
+
+
+def readable_snapshot(path: str) -> str:
+    #Snapshot à lire en flux : path s'il est intact, sinon sa sauvegarde (.bak), comme au
+    #chargement par DatabaseManager (mais rien n'est renommé : lecture seule). Vérifié avant
+    #le parcours, pour ne jamais produire de résultats tirés d'un snapshot endommagé.
+    snapshot, _, errors = read_with_backup(path, _check_snapshot)
+    if errors:
+        print(f"Snapshot illisible ({errors[0]}), lecture de la sauvegarde {snapshot}")
+    return snapshot
+
+
+def _artifact_key(key):
+    return int(key) if isinstance(key, str) and key.isdigit() else key
+
+
+def load_journal_changes(journal_path: Optional[str]) -> dict:
+    #Dernier état journalisé de chaque enregistrement : {(table, clé): enregistrement ou None}.
+    #Taille bornée par le seuil de compaction du journal.
+    changes = {}
+    if not journal_path:
+        return changes
+    for path in (f"{journal_path}.compacting", journal_path):
+        if not os.path.exists(path):
+            continue
+        with open(path, "rb") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                for table, key, record in entry["changes"]:
+                    if table == "artifacts":
+                        key = _artifact_key(key)
+                    changes[(table, key)] = record
+    return changes
+
+
+def _read_keys(stream) -> set:
+    #Clés d'un objet du snapshot, valeurs sautées.
+    keys = set()
+    for key in stream.items():
+        keys.add(key)
+        stream.skip()
+    return keys
+
+
+def _archived_entries(path: str, archived: set, changes: dict) -> Iterator[dict]:
+    #Entrées de l'archive (database.archive) des joueurs archivés d'un snapshot, la table
+    #"archive" étant corrigée par le journal.
+    for (table, user_id), summary in changes.items():
+        if table == "archive":
+            if summary is None:
+                archived.discard(user_id)
+            else:
+                archived.add(user_id)
+    return (entry for _, entry in iter_archived(archive_directory(path), archived))
+
+
+def _column_arrays(stream, typecode: str) -> Iterator[array]:
+    #Colonne d'une table d'artefacts, par morceaux d'array (octets little-endian).
+    itemsize = array(typecode).itemsize
+    pending = b""
+    for chunk in stream.bytes_chunks():
+        pending += chunk
+        usable = len(pending) - len(pending) % itemsize
+        column = array(typecode)
+        column.frombytes(pending[:usable])
+        pending = pending[usable:]
+        if sys.byteorder == "big":
+            column.byteswap()
+        yield column
+
+
+class _ColumnarRarities:
+    #Compte les raretés d'une table en colonnes, clé par clé de son snapshot. Les artefacts
+    #modifiés par le journal sont repérés dans la colonne id puis retirés du décompte de la
+    #colonne rareté (to_snapshot écrit le vocabulaire, puis les colonnes id avant rarity).
+
+    def __init__(self, changed: set, counts: dict):
+        self.changed = changed
+        self.counts = counts
+        self.vocabulary = None
+        self.changed_rows = set()
+
+    def consume(self, stream, key: str):
+        counts = self.counts
+        if key == "vocabulary":
+            self.vocabulary = stream.value()
+        elif key == "extras":
+            for artifact_id, extras in stream.value().items():
+                if "rarity" in extras and _artifact_key(artifact_id) not in self.changed:
+                    counts[extras["rarity"]] = counts.get(extras["rarity"], 0) + 1
+        elif key == "columns":
+            for name in stream.items():
+                if name == "id" and self.changed:
+                    self._find_changed_rows(stream)
+                elif name == "rarity":
+                    self._count(stream)
+                else:
+                    stream.skip()
+        else:
+            stream.skip()
+
+    def _find_changed_rows(self, stream):
+        row = 0
+        for column in _column_arrays(stream, COLUMNS["id"]):
+            for artifact_id in self.changed.intersection(column):
+                self.changed_rows.add(row + column.index(artifact_id))
+            row += len(column)
+
+    def _count(self, stream):
+        rarities = self.vocabulary["rarities"]
+        row = 0
+        for column in _column_arrays(stream, COLUMNS["rarity"]):
+            for code, rarity in enumerate(rarities):
+                self.counts[rarity] = self.counts.get(rarity, 0) + column.count(code)
+            for changed_row in self.changed_rows:
+                if row <= changed_row < row + len(column) and column[changed_row - row] != CUSTOM:
+                    self.counts[rarities[column[changed_row - row]]] -= 1
+            row += len(column)
+
+
+def stream_snapshot(path: str, journal_path: Optional[str] = None) -> Iterator[tuple]:
+    #Parcourt un snapshot (et son journal) en une passe, en mémoire bornée. Produit :
+    #- ("archaeologist", enregistrement, nombre d'artefacts) pour chaque archéologue ;
+    #- ("rarity", rareté, nombre d'artefacts) à la fin, piles comprises.
+    #Les changements du journal remplacent les enregistrements du snapshot. Les joueurs
+    #archivés sont lus dans l'archive, après le snapshot.
+    changes = load_journal_changes(journal_path)
+    changed_artifacts = {key for table, key in changes if table == "artifacts"}
+    rarity_counts = {}
+    archived = set()
+
+    def archaeologist_event(record: dict) -> tuple:
+        stacked = 0
+        for key, (count, _) in record.get("stacks", {}).items():
+            rarity = key.split("|", 1)[0]
+            rarity_counts[rarity] = rarity_counts.get(rarity, 0) + count
+            stacked += count
+        return "archaeologist", record, len(record.get("artifacts", ())) + stacked
+
+    with open(readable_snapshot(path), "rb") as raw:
+        stream = snapshot_reader(raw)
+        for table in stream.items():
+            if table == "archaeologists":
+                for user_id in stream.items():
+                    record = stream.value()
+                    if ("archaeologists", user_id) not in changes:
+                        yield archaeologist_event(record)
+            elif table == "artifacts":
+                columnar = None
+                for key in stream.items():
+                    if key == "format":
+                        if stream.value() != SNAPSHOT_FORMAT:
+                            raise ValueError("Format de table d'artefacts inconnu")
+                        columnar = _ColumnarRarities(changed_artifacts, rarity_counts)
+                    elif columnar is not None:
+                        columnar.consume(stream, key)
+                    else:
+                        # Ancien format : {artifact_id: enregistrement}
+                        record = stream.value()
+                        if _artifact_key(key) not in changed_artifacts:
+                            rarity_counts[record["rarity"]] = rarity_counts.get(record["rarity"], 0) + 1
+            elif table == "archive":
+                archived = _read_keys(stream)
+            else:
+                stream.skip()
+
+    for (table, key), record in changes.items():
+        if record is None:
+            continue
+        if table == "archaeologists":
+            yield archaeologist_event(record)
+        elif table == "artifacts":
+            rarity_counts[record["rarity"]] = rarity_counts.get(record["rarity"], 0) + 1
+
+    for entry in _archived_entries(path, archived, changes):
+        yield archaeologist_event(entry["archaeologist"])
+        for record in entry["artifacts"].values():
+            rarity_counts[record["rarity"]] = rarity_counts.get(record["rarity"], 0) + 1
+
+    for rarity, count in rarity_counts.items():
+        yield "rarity", rarity, count
+
+
+def _append_artifact(columns: dict, codes: dict, record: dict):
+    #Ajoute un enregistrement d'artefact aux colonnes de read_artifact_columns.
+    for name, key in (("rarities", "rarity"), ("owners", "discovered_by")):
+        text = str(record[key])
+        code = codes[name].get(text)
+        if code is None:
+            code = codes[name][text] = len(columns[name])
+            columns[name].append(text)
+        columns["rarity" if name == "rarities" else "owner"].append(code)
+    columns["value"].append(int(record["value"]))
+
+
+def read_artifact_columns(path: str, journal_path: Optional[str] = None) -> dict:
+    #Colonnes rareté, valeur et propriétaire des artefacts d'un snapshot (et de son journal),
+    #sans décoder d'enregistrement : {"rarity", "value", "owner": array, "rarities",
+    #"owners": textes auxquels renvoient les codes}. Les archéologues sont sautés ; les
+    #artefacts des joueurs archivés sont lus dans l'archive. Les artefacts modifiés par le
+    #journal sont retirés des colonnes puis réajoutés (l'ordre des lignes n'est pas conservé).
+    changes = load_journal_changes(journal_path)
+    changed = {key for table, key in changes if table == "artifacts"}
+    columns = {
+        "rarities": list(config.RARITY_LEVELS),
+        "owners": [],
+        "rarity": array(COLUMNS["rarity"]),
+        "value": array(COLUMNS["value"]),
+        "owner": array(COLUMNS["owner"]),
+    }
+    codes = {"rarities": None, "owners": {}}
+    custom = {}  # artifact_id -> rareté hors vocabulaire
+    rows = {}    # ligne -> artifact_id, pour les artefacts modifiés ou de rareté hors vocabulaire
+    archived = set()
+
+    with open(readable_snapshot(path), "rb") as raw:
+        stream = snapshot_reader(raw)
+        for table in stream.items():
+            if table == "archive":
+                archived = _read_keys(stream)
+                continue
+            if table != "artifacts":
+                stream.skip()
+                continue
+            columnar = False
+            for key in stream.items():
+                if key == "format":
+                    if stream.value() != SNAPSHOT_FORMAT:
+                        raise ValueError("Format de table d'artefacts inconnu")
+                    columnar = True
+                elif not columnar:
+                    # Ancien format : {artifact_id: enregistrement}
+                    record = stream.value()
+                    if codes["rarities"] is None:
+                        codes["rarities"] = {text: code for code, text in enumerate(columns["rarities"])}
+                    if _artifact_key(key) not in changed:
+                        _append_artifact(columns, codes, record)
+                elif key == "vocabulary":
+                    columns["rarities"] = list(stream.value()["rarities"])
+                elif key == "owners":
+                    columns["owners"] = stream.value()
+                elif key == "extras":
+                    custom = {
+                        _artifact_key(artifact_id): extras["rarity"]
+                        for artifact_id, extras in stream.value().items()
+                        if "rarity" in extras
+                    }
+                elif key == "columns":
+                    wanted = changed | custom.keys()
+                    for name in stream.items():
+                        if name == "id" and wanted:
+                            row = 0
+                            for column in _column_arrays(stream, COLUMNS["id"]):
+                                for artifact_id in wanted.intersection(column):
+                                    rows[row + column.index(artifact_id)] = artifact_id
+                                row += len(column)
+                        elif name in ("rarity", "value", "owner"):
+                            for column in _column_arrays(stream, COLUMNS[name]):
+                                columns[name].extend(column)
+                        else:
+                            stream.skip()
+                else:
+                    stream.skip()
+
+    if codes["rarities"] is None:
+        codes["rarities"] = {text: code for code, text in enumerate(columns["rarities"])}
+    archived_entries = _archived_entries(path, archived, changes)
+    if (changed or archived) and not codes["owners"]:
+        codes["owners"] = {owner: code for code, owner in enumerate(columns["owners"])}
+
+    for row, artifact_id in rows.items():
+        if artifact_id in custom:
+            rarity = custom[artifact_id]
+            if rarity not in codes["rarities"]:
+                codes["rarities"][rarity] = len(columns["rarities"])
+                columns["rarities"].append(rarity)
+            columns["rarity"][row] = codes["rarities"][rarity]
+
+    # Retrait par échange avec la dernière ligne, des lignes les plus hautes aux plus basses
+    for row in sorted((row for row, artifact_id in rows.items() if artifact_id in changed), reverse=True):
+        for name in ("rarity", "value", "owner"):
+            column = columns[name]
+            column[row] = column[-1]
+            column.pop()
+
+    for (table, _), record in changes.items():
+        if table == "artifacts" and record is not None:
+            _append_artifact(columns, codes, record)
+    for entry in archived_entries:
+        for record in entry["artifacts"].values():
+            _append_artifact(columns, codes, record)
+    return columns
+
+
+def stream_sqlite(path: str) -> Iterator[tuple]:
+    #Même parcours que stream_snapshot sur une base SQLite (curseurs, sans tout charger).
+    #Les piles de chaque archéologue sont rassemblées au format du snapshot.
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        columns = ("user_id", "username", "level", "experience", "coins", "total_excavations", "pickaxe", "joined_at")
+        cursor = conn.execute(
+            f"SELECT {', '.join(columns)}, "
+            "(SELECT json_group_object(rarity || '|' || name, json_array(count, total_value)) "
+            "FROM stacks WHERE owner_id = a.user_id), "
+            "(SELECT COUNT(*) FROM artifacts WHERE owner_id = a.user_id) "
+            "+ (SELECT COALESCE(SUM(count), 0) FROM stacks WHERE owner_id = a.user_id) "
+            "FROM archaeologists AS a"
+        )
+        for row in cursor:
+            record = dict(zip(columns, row))
+            record["stacks"] = json.loads(row[-2]) if row[-2] not in (None, "{}") else {}
+            yield "archaeologist", record, row[-1]
+
+        rarity_counts = dict(conn.execute("SELECT rarity, COUNT(*) FROM artifacts GROUP BY rarity").fetchall())
+        for rarity, count in conn.execute("SELECT rarity, SUM(count) FROM stacks GROUP BY rarity"):
+            rarity_counts[rarity] = rarity_counts.get(rarity, 0) + count
+        for rarity, count in rarity_counts.items():
+            yield "rarity", rarity, count
+    finally:
+        conn.close()
+
+
+def read_counters(path: str, journal_path: Optional[str] = None) -> Optional[dict]:
+    #Compteurs globaux d'un snapshot (première table du fichier) mis à jour par le journal,
+    #sans décoder le reste (le snapshot est seulement vérifié, en une lecture par blocs).
+    #None si le snapshot est antérieur aux compteurs.
+    with open(readable_snapshot(path), "rb") as raw:
+        stream = snapshot_reader(raw)
+        first = next(iter(stream.items()), None)
+        if first != "counters":
+            return None
+        counters = stream.value()
+
+    for (table, name), value in load_journal_changes(journal_path).items():
+        if table != "counters":
+            continue
+        if value is None:
+            counters.pop(name, None)
+        else:
+            counters[name] = value
+    return counters
+
+
+def read_sqlite_counters(path: str) -> Optional[dict]:
+    #Compteurs globaux d'une base SQLite (table counters), None si elle n'en a pas.
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        return dict(conn.execute("SELECT name, value FROM counters"))
+    except sqlite3.OperationalError:
+        return None
+    finally:
+        conn.close()
+
+
+def database_sources() -> list[tuple]:
+    #Bases de la configuration : [(type, chemin, journal ou None)], une par shard si la base
+    #est répartie (DATABASE_SHARDS, avant la répartition : la base d'un seul fichier).
+    if config.DATABASE_SHARDS:
+        from .sharding import read_manifest, shard_paths
+
+        manifest = read_manifest(config.SHARDS_DIR)
+        if manifest is not None:
+            return [
+                (manifest["type"], *shard_paths(config.SHARDS_DIR, manifest["type"], index))
+                for index in range(manifest["shards"])
+            ]
+    if config.DATABASE_TYPE == "sqlite":
+        return [("sqlite", config.SQLITE_PATH, None)]
+    journal_path = config.JOURNAL_PATH if config.DATABASE_TYPE == "journal" else None
+    return [(config.DATABASE_TYPE, config.DATABASE_PATH, journal_path)]
+
+
+def read_database_counters() -> Optional[dict]:
+    #Compteurs globaux de la base configurée (additionnés entre shards), lus sans parcours.
+    totals = {}
+    for kind, path, journal_path in database_sources():
+        counters = read_sqlite_counters(path) if kind == "sqlite" else read_counters(path, journal_path)
+        if counters is None:
+            return None
+        for name, value in counters.items():
+            totals[name] = totals.get(name, 0) + value
+    return totals
+
+
+def stream_database() -> Iterator[tuple]:
+    #Parcours en flux de la base configurée, shard après shard.
+    for kind, path, journal_path in database_sources():
+        if kind == "sqlite":
+            yield from stream_sqlite(path)
+        else:
+            yield from stream_snapshot(path, journal_path)
+
+
+def read_sqlite_artifact_columns(path: str) -> dict:
+    #Même résultat que read_artifact_columns pour une base SQLite.
+    columns = {
+        "rarities": list(config.RARITY_LEVELS),
+        "owners": [],
+        "rarity": array(COLUMNS["rarity"]),
+        "value": array(COLUMNS["value"]),
+        "owner": array(COLUMNS["owner"]),
+    }
+    codes = {"rarities": {text: code for code, text in enumerate(columns["rarities"])}, "owners": {}}
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        cursor = conn.execute("SELECT rarity, value, discovered_by FROM artifacts")
+        names = [description[0] for description in cursor.description]
+        for row in cursor:
+            _append_artifact(columns, codes, dict(zip(names, row)))
+    finally:
+        conn.close()
+    return columns
+
+
+def _merge_artifact_columns(parts: list) -> dict:
+    #Réunit les colonnes de plusieurs bases en recodant raretés et propriétaires.
+    merged = parts[0]
+    codes = {
+        name: {text: code for code, text in enumerate(merged[name])}
+        for name in ("rarities", "owners")
+    }
+    for part in parts[1:]:
+        for name, column in (("rarities", "rarity"), ("owners", "owner")):
+            recode = []
+            for text in part[name]:
+                code = codes[name].get(text)
+                if code is None:
+                    code = codes[name][text] = len(merged[name])
+                    merged[name].append(text)
+                recode.append(code)
+            merged[column].extend(recode[code] for code in part[column])
+        merged["value"].extend(part["value"])
+    return merged
+
+
+def read_database_artifact_columns() -> dict:
+    #Colonnes des artefacts de la base configurée (réunies entre shards).
+    return _merge_artifact_columns([
+        read_sqlite_artifact_columns(path) if kind == "sqlite" else read_artifact_columns(path, journal_path)
+        for kind, path, journal_path in database_sources()
+    ])
@@ -0,0 +1,213 @@
+#Simulateur Monte Carlo de l'économie : rendement des pioches et progression des niveaux.
+#
+#Usage: python simulate.py [--digs N] [--players N] [--horizon N] [--workers N] [--seed N]
+#Les tirages utilisent les tables de butin compilées du bot (même méthode des alias) et
+#les règles d'expérience d'Archaeologist.add_experience.
+
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:  # dépendance optionnelle
+    np = None
+
+import config
+from database.models import Archaeologist
+from utils.loot import LootEngine
+
+
+CHUNK = 1_000_000
+LEVEL_MILESTONES = (5, 10, 25, 50, 100)
+
+
+def compile_arrays(table) -> dict:
+    """Convertit une table de butin compilée (alias) en tableaux NumPy."""
+    return {
+        "rarities": list(table.rarities),
+        "probabilities": np.array(table.alias.probabilities),
+        "aliases": np.array(table.alias.aliases, dtype=np.int64),
+        "low": np.array([low for low, _ in table.rewards], dtype=np.int64),
+        "span": np.array([span for _, span in table.rewards], dtype=np.int64),
+    }
+
+
+def sample_rewards(arrays: dict, rng, size):
+    """Tire des fouilles : (coins, indice de rareté), par la méthode des alias du bot."""
+    u = rng.random(size) * len(arrays["probabilities"])
+    index = u.astype(np.int64)
+    rarity = np.where(u - index < arrays["probabilities"][index], index, arrays["aliases"][index])
+    coins = arrays["low"][rarity] + (rng.random(size) * arrays["span"][rarity]).astype(np.int64)
+    return coins, rarity
+
+
+def simulate_digs(task: tuple) -> dict:
+    """Agrège `digs` fouilles d'une pioche (exécuté éventuellement dans un autre processus)."""
+    arrays, digs, seed = task
+    rng = np.random.default_rng(seed)
+    total = squares = 0
+    counts = np.zeros(len(arrays["rarities"]), dtype=np.int64)
+
+    remaining = digs
+    while remaining:
+        size = min(CHUNK, remaining)
+        coins, rarity = sample_rewards(arrays, rng, size)
+        total += int(coins.sum())
+        squares += int(np.dot(coins, coins))
+        counts += np.bincount(rarity, minlength=len(counts))
+        remaining -= size
+
+    return {"digs": digs, "sum": total, "squares": squares, "counts": counts}
+
+
+def merge(parts: list) -> dict:
+    """Combine les agrégats de plusieurs workers : moyenne, écart-type, fréquences."""
+    digs = sum(part["digs"] for part in parts)
+    total = sum(part["sum"] for part in parts)
+    squares = sum(part["squares"] for part in parts)
+    counts = sum(part["counts"] for part in parts)
+    mean = total / digs
+    return {
+        "digs": digs,
+        "mean": mean,
+        "std": max(0.0, squares / digs - mean * mean) ** 0.5,
+        "frequencies": counts / digs,
+    }
+
+
+def first_reached(cumulative, threshold):
+    """Numéro de la première fouille où chaque trajectoire atteint le seuil (NaN sinon)."""
+    reached = cumulative >= threshold
+    digs = (reached.argmax(axis=1) + 1).astype(float)
+    digs[~reached.any(axis=1)] = np.nan
+    return digs
+
+
+def levels_from_xp(xp):
+    """Niveau après chaque fouille, pour des trajectoires d'XP (une ligne par joueur)."""
+    cumulative = xp.cumsum(axis=1)
+    if config.EXCAVATION_XP_MAX < config.EXPERIENCE_PER_LEVEL:
+        # Au plus une montée de niveau par fouille : le niveau suit directement l'XP cumulée.
+        return 1 + cumulative // config.EXPERIENCE_PER_LEVEL
+
+    levels = np.empty_like(cumulative)
+    level = np.ones(len(xp), dtype=np.int64)
+    for dig in range(xp.shape[1]):
+        level += cumulative[:, dig] >= level * config.EXPERIENCE_PER_LEVEL
+        levels[:, dig] = level
+    return levels
+
+
+def check_level_rule(rng):
+    """Vérifie levels_from_xp contre Archaeologist.add_experience sur quelques trajectoires."""
+    xp = rng.integers(config.EXCAVATION_XP_MIN, config.EXCAVATION_XP_MAX + 1, size=(5, 500))
+    levels = levels_from_xp(xp)
+    for player, gains in enumerate(xp):
+        archaeologist = Archaeologist("simulation", "simulation")
+        for dig, amount in enumerate(gains):
+            archaeologist.add_experience(int(amount))
+            if archaeologist.level != levels[player, dig]:
+                raise AssertionError("levels_from_xp ne suit plus Archaeologist.add_experience")
+
+
+def percentiles(values) -> str:
+    """p10 / p50 / p90 d'une distribution (NaN = seuil non atteint)."""
+    if np.isnan(values).all():
+        return "non atteint"
+    p10, p50, p90 = np.nanpercentile(values, [10, 50, 90])
+    return f"{p10:.0f} / {p50:.0f} / {p90:.0f}"
+
+
+def run(digs: int, players: int, horizon: int, workers: int, seed, loot_tables: str):
+    """Simule chaque pioche et affiche les rendements, la rentabilité et la progression."""
+    engine = LootEngine(loot_tables)
+    tables = {pickaxe: compile_arrays(engine.table(pickaxe)) for pickaxe in config.PICKAXES}
+    seeds = np.random.SeedSequence(seed)
+    rng = np.random.default_rng(seeds.spawn(1)[0])
+    check_level_rule(rng)
+
+    started = time.perf_counter()
+    tasks = []
+    for arrays in tables.values():
+        part = -(-digs // workers)
+        sizes = [min(part, digs - start) for start in range(0, digs, part)]
+        tasks.append([(arrays, size, child) for size, child in zip(sizes, seeds.spawn(len(sizes)))])
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = {
+                pickaxe: merge(list(executor.map(simulate_digs, pickaxe_tasks)))
+                for pickaxe, pickaxe_tasks in zip(tables, tasks)
+            }
+    else:
+        results = {
+            pickaxe: merge([simulate_digs(task) for task in pickaxe_tasks])
+            for pickaxe, pickaxe_tasks in zip(tables, tasks)
+        }
+    elapsed = time.perf_counter() - started
+
+    print("\n" + "=" * 78)
+    print(f"SIMULATION: {digs:,} fouilles par pioche ({elapsed:.1f}s, {workers} processus)")
+    print("=" * 78)
+
+    print("\nRENDEMENT PAR FOUILLE")
+    print("-" * 78)
+    print(f"{'pioche':10} {'coût':>6} {'coins/fouille':>14} {'écart-type':>11}  fréquences")
+    for pickaxe, result in results.items():
+        frequencies = ", ".join(
+            f"{rarity} {100 * frequency:.1f}%"
+            for rarity, frequency in zip(tables[pickaxe]["rarities"], result["frequencies"])
+        )
+        print(
+            f"{pickaxe:10} {config.PICKAXES[pickaxe]['cost']:6} "
+            f"{result['mean']:14.1f} {result['std']:11.1f}  {frequencies}"
+        )
+
+    # Trajectoires de joueurs : la pioche de base sert de référence.
+    basic = tables["basic"]
+    basic_coins, _ = sample_rewards(basic, rng, (players, horizon))
+    basic_cumulative = basic_coins.cumsum(axis=1)
+
+    print(f"\nRENTABILITÉ ({players:,} joueurs simulés sur {horizon:,} fouilles, p10 / p50 / p90)")
+    print("-" * 78)
+    print(f"{'pioche':10} {'fouilles pour l’acheter':>24} {'fouilles pour la rentabiliser':>30}")
+    for pickaxe, arrays in tables.items():
+        cost = config.PICKAXES[pickaxe]["cost"]
+        if cost == 0:
+            continue
+        coins, _ = sample_rewards(arrays, rng, (players, horizon))
+        # Gain supplémentaire par rapport à la pioche de base, fouille après fouille
+        extra = coins.cumsum(axis=1) - basic_cumulative
+        print(
+            f"{pickaxe:10} {percentiles(first_reached(basic_cumulative, cost)):>24} "
+            f"{percentiles(first_reached(extra, cost)):>30}"
+        )
+
+    xp = rng.integers(config.EXCAVATION_XP_MIN, config.EXCAVATION_XP_MAX + 1, size=(players, horizon))
+    levels = levels_from_xp(xp)
+    print(f"\nPROGRESSION (fouilles pour atteindre un niveau, p10 / p50 / p90)")
+    print("-" * 78)
+    for milestone in LEVEL_MILESTONES:
+        print(f"  Niveau {milestone:3}: {percentiles(first_reached(levels, milestone))}")
+    print(f"  Après {horizon:,} fouilles: niveau moyen {levels[:, -1].mean():.1f}")
+    print("\n" + "=" * 78 + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulateur Monte Carlo de l'économie")
+    parser.add_argument("--digs", type=int, default=10_000_000, help="Fouilles simulées par pioche")
+    parser.add_argument("--players", type=int, default=2_000, help="Trajectoires de joueurs")
+    parser.add_argument("--horizon", type=int, default=2_000, help="Fouilles par trajectoire")
+    parser.add_argument("--workers", type=int, default=1, help="Processus en parallèle")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--loot-tables", default=config.LOOT_TABLES_PATH)
+    args = parser.parse_args()
+
+    if np is None:
+        raise SystemExit("simulate.py nécessite le paquet 'numpy'")
+    run(args.digs, args.players, args.horizon, max(1, args.workers), args.seed, args.loot_tables)
+
+
+if __name__ == "__main__":
+    main()
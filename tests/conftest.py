@@ -0,0 +1,109 @@
+#Configuration commune des tests : le bot n'est pas lancé, chaque test a sa propre base.
+
+import os
+import random
+import sys
+
+if not os.environ.get("DISCORD_TOKEN"):
+    os.environ["DISCORD_TOKEN"] = "test"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import config
+from database.db_manager import DatabaseManager
+from database.sharding import ShardedDatabaseManager
+from database.sqlite_manager import SQLiteDatabaseManager
+
+
+BACKENDS = ("json", "journal", "sqlite", "sharded")
+
+
+def _populate(db, players: int = 12, seed: int = 1):
+    #Quelques joueurs avec des fouilles, de l'expérience, des pièces et une vente.
+    rng = random.Random(seed)
+    for index in range(players):
+        user_id = str(index)
+        archaeologist = db.get_archaeologist(user_id) or db.create_archaeologist(user_id, f"joueur{index}")
+        with db.transaction("excavate"):
+            db.add_finds(archaeologist, [
+                (f"Artefact {rng.randrange(6)}", rng.choice(config.RARITY_LEVELS), "Trouvaille", rng.randrange(1, 90))
+                for _ in range(rng.randrange(1, 6))
+            ])
+            archaeologist.add_experience(rng.randrange(10, 200))
+            archaeologist.coins += rng.randrange(0, 500)
+            archaeologist.total_excavations += 1
+            db.save_archaeologist(archaeologist)
+    db.sell_artifacts_by_rarity("0", "common")
+
+
+def _players(db) -> list:
+    #État comparable de tous les joueurs : profil et inventaire (artefacts et piles).
+    return sorted(
+        (
+            archaeologist.user_id,
+            archaeologist.username,
+            archaeologist.level,
+            archaeologist.experience,
+            archaeologist.coins,
+            archaeologist.total_excavations,
+            sorted((a.name, a.rarity, a.value) for a in db.get_archaeologist_artifacts(archaeologist.user_id)),
+            sorted(archaeologist.stacks.items()),
+        )
+        for archaeologist in db.get_all_archaeologists()
+    )
+
+
+@pytest.fixture
+def populate():
+    return _populate
+
+
+@pytest.fixture
+def players():
+    return _players
+
+
+def _open_backend(kind: str, directory, **options):
+    #Gestionnaire de stockage du type demandé, dans le répertoire du test. options :
+    #arguments nommés communs aux gestionnaires (inventory_mode, durability).
+    if kind == "json":
+        return DatabaseManager(str(directory / "database.json"), **options)
+    if kind == "journal":
+        return DatabaseManager(
+            str(directory / "database.json"), journal_path=str(directory / "database.journal"), **options
+        )
+    if kind == "sqlite":
+        return SQLiteDatabaseManager(str(directory / "database.sqlite3"), **options)
+    return ShardedDatabaseManager(str(directory / "shards"), 3, "json", False, **options)
+
+
+@pytest.fixture(params=BACKENDS)
+def backend_kind(request):
+    #Type de stockage testé ; un test peut restreindre la liste avec
+    #@pytest.mark.parametrize("backend_kind", [...]).
+    return request.param
+
+
+@pytest.fixture
+def open_backend(backend_kind, tmp_path):
+    #Ouvre la base du test (options : voir _open_backend) ; un nouvel appel ferme la
+    #précédente puis la rouvre depuis le disque. La dernière ouverte est fermée à la fin,
+    #sauf si le test l'a fermée lui-même et l'a signalé avec open_backend.release().
+    opened = []
+
+    def open_(**options):
+        if opened:
+            opened.pop().close()
+        opened.append(_open_backend(backend_kind, tmp_path, **options))
+        return opened[0]
+
+    open_.release = opened.clear
+    yield open_
+    for db in opened:
+        db.close()
+
+
+@pytest.fixture
+def backend(open_backend):
+    return open_backend()
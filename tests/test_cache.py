@@ -0,0 +1,24 @@
+import time
+
+import pytest
+
+from database.cache import ArchaeologistCache, CachedDatabase
+from database.sharding import ShardedDatabaseManager
+
+
+@pytest.mark.parametrize("backend_kind", ["json", "journal", "sharded"])
+def test_cache_hits_count_as_activity(backend, monkeypatch):
+    db = CachedDatabase(backend, ArchaeologistCache(10, 1 << 20))
+    for user_id in ("1", "2"):
+        db.create_archaeologist(user_id, f"joueur{user_id}")
+
+    later = time.time() + 10 * 86400
+    monkeypatch.setattr(time, "time", lambda: later)
+    hits = db.cache.hits
+    assert db.get_archaeologist("1") is not None
+    assert db.cache.hits == hits + 1
+
+    # Seul le joueur qui n'a pas été servi depuis dix jours est archivé.
+    assert backend.archive_inactive(7) == 1
+    live = backend._loaded() if isinstance(backend, ShardedDatabaseManager) else [backend]
+    assert {user_id for shard in live for user_id in shard._data["archaeologists"]} == {"1"}
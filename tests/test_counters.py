@@ -0,0 +1,69 @@
+from database import streaming
+from database.db_manager import DatabaseManager
+from database.sharding import ShardedDatabaseManager, rebalance
+from database.sqlite_manager import SQLiteDatabaseManager
+
+
+def test_counters_agree_after_json_to_sqlite_rebalance(tmp_path, populate):
+    directory = str(tmp_path / "shards")
+    db = ShardedDatabaseManager(directory, 2, "json", False)
+    populate(db)
+    # Artefact sans propriétaire : compté comme tout artefact enregistré
+    db.create_artifact("Amulette", "epic", "Orpheline", 40, "3")
+    stats = db.get_global_stats()
+    assert db.verify_counters() == {}
+    db.close()
+
+    rebalance(3, "sqlite", directory)
+    db = ShardedDatabaseManager(directory, 3, "sqlite", False)
+    try:
+        assert db.verify_counters() == {}
+        assert db.get_global_stats() == stats
+    finally:
+        db.close()
+
+
+def test_streaming_totals_match_between_backends(tmp_path, populate):
+    json_path = str(tmp_path / "database.json")
+    db = DatabaseManager(json_path)
+    populate(db)
+    db.create_artifact("Amulette", "epic", "Orpheline", 40, "3")
+    data = db.export_data()
+    db.close()
+
+    sqlite_path = str(tmp_path / "database.sqlite3")
+    db = SQLiteDatabaseManager(sqlite_path)
+    db.import_data(data)
+    assert db.verify_counters() == {}
+    db.close()
+
+    def totals(events):
+        return sorted(event for event in events if event[0] == "rarity" and event[2])
+
+    assert totals(streaming.stream_snapshot(json_path)) == totals(streaming.stream_sqlite(sqlite_path))
+
+
+def test_sqlite_profile_save_updates_the_row_in_place(tmp_path, populate):
+    db = SQLiteDatabaseManager(str(tmp_path / "database.db"))
+    try:
+        populate(db)
+        conn = db._conn
+        conn.execute("CREATE TEMP TABLE fired (trigger TEXT)")
+        conn.execute(
+            "CREATE TEMP TRIGGER log_delete AFTER DELETE ON main.archaeologists "
+            "BEGIN INSERT INTO fired VALUES ('delete'); END"
+        )
+        conn.execute(
+            "CREATE TEMP TRIGGER log_insert AFTER INSERT ON main.archaeologists "
+            "BEGIN INSERT INTO fired VALUES ('insert'); END"
+        )
+        archaeologist = db.get_archaeologist("3")
+        archaeologist.add_coins(25)
+        archaeologist.add_experience(10_000)
+        db.save_archaeologist(archaeologist)
+
+        assert conn.execute("SELECT trigger FROM fired").fetchall() == []
+        assert db.get_archaeologist("3") == archaeologist
+        assert db.verify_counters() == {}
+    finally:
+        db.close()
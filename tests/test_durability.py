@@ -0,0 +1,56 @@
+import os
+
+import pytest
+
+from database.db_manager import DatabaseManager
+from database.durability import backup_path
+from database.serializers import get_serializer
+
+
+def _truncate(payload: bytes) -> bytes:
+    return payload[:len(payload) // 2]
+
+
+def _alter(payload: bytes) -> bytes:
+    # JSON toujours valide : seule la somme de contrôle révèle la modification.
+    assert b"joueur1" in payload
+    return payload.replace(b"joueur1", b"joueuR1", 1)
+
+
+@pytest.mark.parametrize("damage", [_truncate, _alter])
+def test_unreadable_snapshot_falls_back_to_backup(tmp_path, populate, players, damage):
+    path = str(tmp_path / "database.json")
+    db = DatabaseManager(path, serializer=get_serializer("json"))
+    populate(db, players=4)
+    expected = players(db)
+    # Dernier commit : le snapshot précédent (état attendu) devient la sauvegarde.
+    archaeologist = db.get_archaeologist("2")
+    archaeologist.coins += 1000
+    db.save_archaeologist(archaeologist)
+    db.close()
+
+    with open(path, "rb") as f:
+        payload = f.read()
+    with open(path, "wb") as f:
+        f.write(damage(payload))
+
+    db = DatabaseManager(path, serializer=get_serializer("json"))
+    try:
+        assert players(db) == expected
+        assert db.verify_counters() == {}
+    finally:
+        db.close()
+    with open(f"{path}.corrupt", "rb") as f:
+        assert f.read() == damage(payload)
+
+
+def test_startup_fails_when_snapshot_and_backup_are_unreadable(tmp_path):
+    path = str(tmp_path / "database.json")
+    DatabaseManager(path).close()
+    for damaged in (path, backup_path(path)):
+        with open(damaged, "wb") as f:
+            f.write(b"{\"archaeologists\": ")
+
+    with pytest.raises(ValueError):
+        DatabaseManager(path)
+    assert not os.path.exists(f"{path}.corrupt")
@@ -0,0 +1,93 @@
+import asyncio
+import itertools
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from cogs import excavation
+from database.async_manager import AsyncDatabaseManager
+from database.db_manager import DatabaseManager
+from utils.loot import get_loot_engine
+
+XP_SEQUENCE = [30, 170, 55, 400, 80, 260]
+
+
+class FakeInteraction:
+    #Interaction Discord minimale : la réponse différée et les embeds envoyés.
+
+    def __init__(self, user_id: int):
+        self.user = SimpleNamespace(id=user_id, name=f"joueur{user_id}")
+        self.response = SimpleNamespace(defer=self._defer)
+        self.followup = SimpleNamespace(send=self._send)
+        self.embeds = []
+
+    async def _defer(self):
+        pass
+
+    async def _send(self, embed=None, **kwargs):
+        self.embeds.append(embed)
+
+
+def _excavate(backend, monkeypatch, user_id: int, counts: list) -> list:
+    #Lance /excavate pour chaque count, avec les mêmes tirages de butin et d'XP.
+    get_loot_engine().seed(42)
+    xp = itertools.cycle(XP_SEQUENCE)
+    monkeypatch.setattr(random, "randint", lambda low, high: next(xp))
+
+    async def run():
+        db = AsyncDatabaseManager(backend)
+        monkeypatch.setattr(excavation, "get_async_database", lambda: db)
+        cog = excavation.ExcavationCog(bot=None)
+        interactions = []
+        for count in counts:
+            interaction = FakeInteraction(user_id)
+            await cog.excavate.callback(cog, interaction, count)
+            interactions.append(interaction)
+        db._executor.shutdown(wait=True)
+        return [embed for interaction in interactions for embed in interaction.embeds]
+
+    return asyncio.run(run())
+
+
+def _player(backend, user_id: int) -> tuple:
+    archaeologist = backend.get_archaeologist(str(user_id))
+    return (
+        archaeologist.level,
+        archaeologist.experience,
+        archaeologist.coins,
+        archaeologist.total_excavations,
+        sorted((a.rarity, a.value) for a in backend.get_archaeologist_artifacts(str(user_id))),
+    )
+
+
+def _field(embed, name: str):
+    return next((field.value for field in embed.fields if field.name == name), None)
+
+
+@pytest.mark.parametrize("count", [2, 7, 25])
+def test_batched_excavation_matches_single_digs(backend, monkeypatch, count):
+    batched = _excavate(backend, monkeypatch, 1, [count])
+    singles = _excavate(backend, monkeypatch, 2, [1] * count)
+
+    assert _player(backend, 1) == _player(backend, 2)
+    level, experience, coins, excavations, artifacts = _player(backend, 1)
+    expected_xp = sum(itertools.islice(itertools.cycle(XP_SEQUENCE), count))
+    assert (experience, coins, excavations, len(artifacts)) == (expected_xp, 0, count, count)
+    assert level > 1
+    assert backend.verify_counters() == {}
+
+    # Un seul embed récapitulatif, cohérent avec les fouilles une à une.
+    assert len(batched) == 1 and len(singles) == count
+    assert _field(batched[0], "XP gagné") == f"⭐ +{expected_xp} XP"
+    assert _field(batched[0], "Valeur potentielle") == f"💰 {sum(value for _, value in artifacts)}"
+    assert _field(batched[0], "🎉 Montée de niveau!") == f"Vous êtes maintenant niveau {level}"
+
+
+@pytest.mark.parametrize("backend_kind", ["json", "journal"])
+def test_batched_excavation_is_a_single_write(backend, monkeypatch):
+    assert isinstance(backend, DatabaseManager)
+    _excavate(backend, monkeypatch, 1, [1])
+    writes = backend.get_write_stats()["excavate"]["writes"]
+    _excavate(backend, monkeypatch, 1, [20])
+    assert backend.get_write_stats()["excavate"]["writes"] == writes + 1
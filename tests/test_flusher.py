@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from database import streaming
+from database.async_manager import AsyncDatabaseManager
+from database.flusher import WriteFlusher
+from database.sqlite_manager import SQLiteDatabaseManager
+
+pytestmark = pytest.mark.parametrize("backend_kind", ["json", "journal", "sqlite"])
+
+
+def _on_disk(backend) -> dict:
+    #Pièces de chaque archéologue telles qu'écrites sur le disque (lecture indépendante).
+    if isinstance(backend, SQLiteDatabaseManager):
+        events = streaming.stream_sqlite(backend.db_path)
+    else:
+        journal_path = backend.journal.path if backend.journal is not None else None
+        events = streaming.stream_snapshot(backend.db_path, journal_path)
+    return {event[1]["user_id"]: event[1]["coins"] for event in events if event[0] == "archaeologist"}
+
+
+async def _earn(db, user_id: str, coins: int):
+    def earn(backend):
+        archaeologist = backend.get_archaeologist(user_id) or backend.create_archaeologist(user_id, f"joueur{user_id}")
+        archaeologist.coins += coins
+        backend.save_archaeologist(archaeologist)
+
+    await db.run_transaction(earn, "earn")
+
+
+def test_flusher_coalesces_a_burst_into_one_write(backend):
+    async def run():
+        db = AsyncDatabaseManager(backend)
+        flusher = db.start_flusher(window_ms=300)
+        for _ in range(20):
+            await _earn(db, "1", 5)
+        assert _on_disk(backend) == {}
+
+        await asyncio.sleep(1)
+        assert flusher.flushes == 1
+        assert _on_disk(backend) == {"1": 100}
+        await db.flusher.stop()
+        return flusher
+
+    flusher = asyncio.run(run())
+    if isinstance(backend, SQLiteDatabaseManager):
+        # Un seul COMMIT pour les vingt commits de la rafale.
+        assert flusher.records == 20
+    else:
+        # Le dernier état de chaque enregistrement : le joueur et quelques compteurs.
+        assert flusher.records < 20
+        assert backend.get_write_stats()["flush"]["writes"] == 1
+        assert "earn" not in backend.get_write_stats()
+
+
+def test_flusher_writes_early_when_max_pending_is_reached(backend):
+    async def run():
+        db = AsyncDatabaseManager(backend)
+        backend.defer_writes(True)
+        db.flusher = flusher = WriteFlusher(db, window_ms=60_000, max_pending=5)
+        flusher.start()
+        for index in range(5):
+            await _earn(db, str(index), 1)
+
+        # Bien avant la fin de la fenêtre d'une minute.
+        await asyncio.sleep(0.5)
+        assert flusher.flushes >= 1
+        assert _on_disk(backend) == {str(index): 1 for index in range(5)}
+        await flusher.stop()
+
+    asyncio.run(run())
+
+
+def test_close_writes_pending_commits(backend, open_backend):
+    async def run():
+        db = AsyncDatabaseManager(backend)
+        flusher = db.start_flusher(window_ms=60_000)
+        for index in range(3):
+            await _earn(db, str(index), 10)
+            await _earn(db, str(index), 10)
+        assert _on_disk(backend) == {}
+        await db.close()
+        assert flusher.flushes == 0
+
+    asyncio.run(run())
+    open_backend.release()
+    assert _on_disk(backend) == {"0": 20, "1": 20, "2": 20}
+    assert open_backend().get_archaeologist("2").coins == 20
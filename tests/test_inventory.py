@@ -0,0 +1,108 @@
+def _stacks(db, user_id) -> dict:
+    return {key: list(stack) for key, stack in db.get_archaeologist(user_id).stacks.items()}
+
+
+def _dig(db, user_id, finds):
+    archaeologist = db.get_archaeologist(user_id) or db.create_archaeologist(user_id, f"joueur{user_id}")
+    with db.transaction("excavate"):
+        db.add_finds(archaeologist, [(name, rarity, "Trouvaille", value) for name, rarity, value in finds])
+        db.save_archaeologist(archaeologist)
+
+
+FINDS = [
+    ("Vase", "rare", 100),
+    ("Vase", "rare", 50),
+    ("Vase", "epic", 300),
+    ("Pièce", "common", 10),
+    ("Pièce", "common", 13),
+    ("Pièce", "common", 11),
+    ("Fibule", "uncommon", 40),
+]
+
+
+def test_stacks_fold_finds_into_count_and_total(open_backend):
+    db = open_backend(inventory_mode="stacks")
+    _dig(db, "1", FINDS)
+    expected = {
+        "rare|Vase": [2, 150],
+        "epic|Vase": [1, 300],
+        "common|Pièce": [3, 34],
+        "uncommon|Fibule": [1, 40],
+    }
+    assert _stacks(db, "1") == expected
+    assert db.get_archaeologist_artifacts("1") == []
+    assert sum(db.get_global_stats()["artifacts"].values()) == len(FINDS)
+    assert db.verify_counters() == {}
+
+    db = open_backend(inventory_mode="stacks")
+    assert _stacks(db, "1") == expected
+    assert db.get_archaeologist("1").artifact_count == len(FINDS)
+
+
+def test_switching_to_stacks_folds_existing_artifacts(open_backend):
+    db = open_backend(inventory_mode="items")
+    _dig(db, "1", FINDS)
+    assert len(db.get_archaeologist_artifacts("1")) == len(FINDS)
+
+    db = open_backend(inventory_mode="stacks")
+    assert _stacks(db, "1") == {
+        "rare|Vase": [2, 150],
+        "epic|Vase": [1, 300],
+        "common|Pièce": [3, 34],
+        "uncommon|Fibule": [1, 40],
+    }
+    assert db.get_archaeologist_artifacts("1") == []
+    assert db.verify_counters() == {}
+
+
+def test_selling_by_name_takes_the_stack_average_from_the_least_rare_stack(open_backend):
+    db = open_backend(inventory_mode="stacks")
+    _dig(db, "1", FINDS)
+
+    # Pile rare [2, 150] : prix moyen 75, le dernier emporte le reste.
+    assert db.sell_single_artifact("1", "vase") == (75, None)
+    assert _stacks(db, "1")["rare|Vase"] == [1, 75]
+    assert db.sell_single_artifact("1", "Vase") == (75, None)
+    assert "rare|Vase" not in _stacks(db, "1")
+    assert db.sell_single_artifact("1", "Vase") == (300, None)
+    assert db.sell_single_artifact("1", "Vase") == (0, None)
+
+    # Pile [3, 34] : 11, puis 11, puis les 12 restants.
+    assert [db.sell_single_artifact("1", "Pièce")[0] for _ in range(3)] == [11, 11, 12]
+    assert _stacks(db, "1") == {"uncommon|Fibule": [1, 40]}
+    assert db.get_archaeologist("1").coins == 75 + 75 + 300 + 34
+    assert db.verify_counters() == {}
+
+
+def test_selling_by_rarity_sells_whole_stacks(open_backend):
+    db = open_backend(inventory_mode="stacks")
+    _dig(db, "1", FINDS)
+
+    assert db.sell_artifacts_by_rarity("1", "uncommon") == (34 + 40, 4)
+    assert _stacks(db, "1") == {"rare|Vase": [2, 150], "epic|Vase": [1, 300]}
+    assert db.sell_artifacts_by_rarity("1", "rare") == (150, 2)
+    assert db.sell_artifacts_by_rarity("1", "rare") == (0, 0)
+    assert db.get_archaeologist("1").coins == 34 + 40 + 150
+    assert sum(db.get_global_stats()["artifacts"].values()) == 1
+    assert db.verify_counters() == {}
+
+
+def test_ownership_follows_the_saved_artifact_list(open_backend):
+    db = open_backend()
+    _dig(db, "1", FINDS)
+    _dig(db, "2", FINDS[:2])
+    loose = db.create_artifact("Tesson", "common", "Sans propriétaire", 5, "1")
+    archaeologist = db.get_archaeologist("1")
+    dropped = next(iter(archaeologist.artifacts))
+    archaeologist.add_artifact(loose.artifact_id)
+    archaeologist.artifacts.discard(dropped)
+    db.save_archaeologist(archaeologist)
+
+    owned = {artifact.artifact_id for artifact in db.get_archaeologist_artifacts("1")}
+    assert owned == set(archaeologist.artifacts)
+    assert loose.artifact_id in owned and dropped not in owned
+    assert len(db.get_archaeologist_artifacts("2")) == 2
+    assert db.verify_counters() == {}
+
+    db = open_backend()
+    assert list(db.get_archaeologist("1").artifacts) == list(archaeologist.artifacts)
@@ -0,0 +1,100 @@
+import json
+import os
+from collections import Counter
+
+import pytest
+
+import config
+from utils.loot import AliasTable, LootEngine, LootTable
+
+LOOT_TABLES_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), config.LOOT_TABLES_PATH)
+
+
+def _definition() -> dict:
+    with open(LOOT_TABLES_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _rewards(pickaxe: str) -> dict:
+    definition = _definition()
+    return {**definition["rewards"], **definition["pickaxes"][pickaxe].get("rewards", {})}
+
+
+@pytest.mark.parametrize("weights", [[1], [1, 1], [50, 25, 15, 10], [3, 25, 15, 7, 50], [0, 5, 0, 1], [1e-6, 1, 1e6]])
+def test_alias_table_encodes_the_weights_exactly(weights):
+    table = AliasTable(weights)
+    count = len(weights)
+    implied = [probability / count for probability in table.probabilities]
+    for index, alias in enumerate(table.aliases):
+        implied[alias] += (1.0 - table.probabilities[index]) / count
+    assert implied == pytest.approx([weight / sum(weights) for weight in weights], abs=1e-12)
+
+
+@pytest.mark.parametrize("weights", [[], [0, 0], [1, -1]])
+def test_alias_table_rejects_invalid_weights(weights):
+    with pytest.raises(ValueError):
+        AliasTable(weights)
+
+
+@pytest.mark.parametrize("pickaxe", list(config.PICKAXES))
+def test_seeded_draws_follow_the_loot_table_file(pickaxe):
+    weights = _definition()["pickaxes"][pickaxe]["weights"]
+    rewards = _rewards(pickaxe)
+    engine = LootEngine(LOOT_TABLES_PATH, seed=1234)
+    draws = 200_000
+    samples = engine.sample(pickaxe, draws)
+
+    frequencies = Counter(rarity for _, rarity in samples)
+    total = sum(weights.values())
+    for rarity in config.RARITY_LEVELS:
+        expected = weights.get(rarity, 0) / total
+        assert engine.table(pickaxe).probability(rarity) == pytest.approx(expected)
+        assert frequencies[rarity] / draws == pytest.approx(expected, abs=0.005)
+        if not expected:
+            assert frequencies[rarity] == 0
+
+    for rarity in frequencies:
+        low, high = rewards[rarity]
+        values = [coins for coins, drawn in samples if drawn == rarity]
+        assert (min(values), max(values)) == (low, high)
+
+
+def test_seeded_engines_are_reproducible():
+    first = LootEngine(LOOT_TABLES_PATH, seed=7)
+    second = LootEngine(LOOT_TABLES_PATH, seed=7)
+    # Un lot de N tirages est identique à N tirages un par un.
+    assert first.sample("gold", 500) == [second.sample("gold")[0] for _ in range(500)]
+    first.seed(7)
+    assert first.sample("gold", 500) == LootEngine(LOOT_TABLES_PATH, seed=7).sample("gold", 500)
+    assert LootEngine(LOOT_TABLES_PATH, seed=8).sample("gold", 500) != first.sample("gold", 500)
+
+
+def test_unknown_pickaxe_uses_the_basic_table():
+    engine = LootEngine(LOOT_TABLES_PATH, seed=3)
+    assert engine.table("inconnue") is engine.table("basic")
+
+
+def test_invalid_loot_files_are_rejected(tmp_path):
+    definition = _definition()
+    with pytest.raises(ValueError):
+        LootTable("basic", {"mythique": 1}, definition["rewards"])
+
+    del definition["pickaxes"]["diamond"]
+    path = tmp_path / "loot_tables.json"
+    path.write_text(json.dumps(definition), encoding="utf-8")
+    with pytest.raises(ValueError):
+        LootEngine(str(path))
+
+
+def test_reload_recompiles_the_tables(tmp_path):
+    definition = _definition()
+    path = tmp_path / "loot_tables.json"
+    path.write_text(json.dumps(definition), encoding="utf-8")
+    engine = LootEngine(str(path), seed=5)
+    assert engine.table("basic").probability("legendary") == 0
+
+    definition["pickaxes"]["basic"]["weights"] = {"legendary": 1}
+    definition["rewards"]["legendary"] = [7, 7]
+    path.write_text(json.dumps(definition), encoding="utf-8")
+    engine.reload()
+    assert engine.sample("basic", 3) == [(7, "legendary")] * 3
@@ -0,0 +1,36 @@
+import pytest
+
+
+def test_tied_players_share_their_rank(backend):
+    for user_id in ("1", "2", "3"):
+        backend.create_archaeologist(user_id, f"joueur{user_id}")
+    assert [backend.get_rank(user_id) for user_id in ("1", "2", "3")] == [1, 1, 1]
+    assert backend.get_rank("inconnu") is None
+
+
+def test_rank_counts_players_strictly_ahead(backend, populate):
+    populate(backend)
+    tied = backend.get_archaeologist("4")
+    for user_id in ("90", "91"):
+        clone = backend.create_archaeologist(user_id, f"clone{user_id}")
+        clone.level, clone.experience, clone.coins = tied.level, tied.experience, tied.coins
+        backend.save_archaeologist(clone)
+
+    everyone = backend.get_all_archaeologists()
+    keys = {a.user_id: (a.level, a.experience, a.coins) for a in everyone}
+    for user_id, key in keys.items():
+        assert backend.get_rank(user_id) == 1 + sum(other > key for other in keys.values())
+
+    # Les pages restent dans l'ordre du classement, sans doublon ni trou.
+    rows = backend.get_leaderboard(len(everyone), 0)
+    assert len(rows) == len(everyone)
+    assert [row[1:4] for row in rows] == sorted(keys.values(), reverse=True)
+
+
+@pytest.mark.parametrize("backend_kind", ["sharded"])
+def test_sharded_rank_of_archived_player_does_not_rehydrate(backend, populate):
+    populate(backend)
+    ranks = {str(index): backend.get_rank(str(index)) for index in range(12)}
+    assert backend.archive_inactive(1e-9) == 12
+    assert {user_id: backend.get_rank(user_id) for user_id in ranks} == ranks
+    assert not any(shard._data["archaeologists"] for shard in backend._loaded())
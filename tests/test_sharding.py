@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+import config
+from database.db_manager import DatabaseManager
+from database.sharding import ShardedDatabaseManager, rebalance
+from database.sqlite_manager import SQLiteDatabaseManager
+
+
+@pytest.mark.parametrize("source, target", [
+    ((2, "json"), (3, "sqlite")),
+    ((3, "sqlite"), (1, "json")),
+    ((1, "json"), (4, "json")),
+])
+def test_rebalance_keeps_players_inventories_and_counters(tmp_path, populate, players, source, target):
+    directory = str(tmp_path / "shards")
+    db = ShardedDatabaseManager(directory, *source, False)
+    populate(db, players=20)
+    before = players(db)
+    stats = db.get_global_stats()
+    ranks = {user_id: db.get_rank(user_id) for user_id, *_ in before}
+    db.close()
+
+    assert rebalance(*target, directory) == (len(before), sum(stats["artifacts"].values()))
+    assert os.path.isdir(f"{directory}.old")
+
+    db = ShardedDatabaseManager(directory, *target, False)
+    try:
+        assert players(db) == before
+        assert db.get_global_stats() == stats
+        assert db.verify_counters() == {}
+        assert {user_id: db.get_rank(user_id) for user_id in ranks} == ranks
+    finally:
+        db.close()
+
+
+def _single_file_databases(tmp_path, monkeypatch, database_type):
+    monkeypatch.setattr(config, "DATABASE_TYPE", database_type)
+    monkeypatch.setattr(config, "DATABASE_PATH", str(tmp_path / "database.json"))
+    monkeypatch.setattr(config, "JOURNAL_PATH", str(tmp_path / "database.journal"))
+    monkeypatch.setattr(config, "SQLITE_PATH", str(tmp_path / "database.sqlite3"))
+
+
+@pytest.mark.parametrize("database_type, expected", [("journal", "json"), ("sqlite", "sqlite")])
+def test_rebalance_reads_the_single_file_database_of_the_configured_type(
+    tmp_path, monkeypatch, populate, players, database_type, expected
+):
+    _single_file_databases(tmp_path, monkeypatch, database_type)
+    if expected == "json":
+        db = DatabaseManager(config.DATABASE_PATH, journal_path=config.JOURNAL_PATH)
+    else:
+        db = SQLiteDatabaseManager(config.SQLITE_PATH)
+    populate(db)
+    before = players(db)
+    db.close()
+
+    directory = str(tmp_path / "shards")
+    rebalance(2, "json", directory)
+    db = ShardedDatabaseManager(directory, 2, "json", False)
+    try:
+        assert players(db) == before
+    finally:
+        db.close()
+
+
+def test_rebalance_refuses_to_guess_between_two_single_file_databases(tmp_path, monkeypatch, populate):
+    _single_file_databases(tmp_path, monkeypatch, "json")
+    live = DatabaseManager(config.DATABASE_PATH, journal_path=config.JOURNAL_PATH)
+    populate(live)
+    live.close()
+    SQLiteDatabaseManager(config.SQLITE_PATH).close()
+
+    directory = str(tmp_path / "shards")
+    with pytest.raises(ValueError):
+        rebalance(2, "json", directory)
+    assert not os.path.exists(directory)
@@ -0,0 +1,253 @@
+import base64
+import gzip
+import io
+import json
+import os
+import time
+
+import pytest
+
+import config
+from database import streaming
+from database.db_manager import DatabaseManager
+from database.serializers import get_serializer
+from database.sharding import ShardedDatabaseManager
+
+
+def _truncate(payload: bytes) -> bytes:
+    return payload[:len(payload) // 2]
+
+
+def _alter(payload: bytes) -> bytes:
+    # JSON toujours valide : seule la somme de contrôle révèle la modification.
+    return payload.replace(b"joueur1", b"joueuR1", 1)
+
+
+def _snapshot_views(path: str) -> tuple:
+    columns = streaming.read_artifact_columns(path)
+    return (
+        sorted(map(repr, streaming.stream_snapshot(path))),
+        sorted(zip(
+            (columns["rarities"][code] for code in columns["rarity"]),
+            columns["value"],
+            (columns["owners"][code] for code in columns["owner"]),
+        )),
+        streaming.read_counters(path),
+    )
+
+
+@pytest.mark.parametrize("damage", [_truncate, _alter])
+@pytest.mark.parametrize("compression", ["none", "gzip"])
+def test_damaged_snapshot_is_streamed_from_backup(tmp_path, populate, damage, compression):
+    path = str(tmp_path / "database.json")
+    db = DatabaseManager(path, serializer=get_serializer("json", compression))
+    populate(db, players=4)
+    db.close()
+    expected = _snapshot_views(path)
+
+    db = DatabaseManager(path, serializer=get_serializer("json", compression))
+    archaeologist = db.get_archaeologist("2")
+    archaeologist.coins += 1000
+    db.save_archaeologist(archaeologist)
+    db.close()
+    assert _snapshot_views(path) != expected
+
+    with open(path, "rb") as f:
+        payload = f.read()
+    if compression == "gzip" and damage is _alter:
+        payload = gzip.compress(damage(gzip.decompress(payload)))
+    else:
+        payload = damage(payload)
+    with open(path, "wb") as f:
+        f.write(payload)
+
+    assert _snapshot_views(path) == expected
+    # Lecture seule : le snapshot endommagé reste en place.
+    with open(path, "rb") as f:
+        assert f.read() == payload
+
+
+def test_streaming_refuses_a_damaged_snapshot_without_backup(tmp_path, populate):
+    path = str(tmp_path / "database.json")
+    db = DatabaseManager(path, serializer=get_serializer("json"))
+    populate(db, players=4)
+    db.close()
+    with open(path, "rb") as f:
+        payload = f.read()
+    with open(path, "wb") as f:
+        f.write(_alter(payload))
+    (tmp_path / "database.json.bak").unlink()
+
+    events = streaming.stream_snapshot(path)
+    with pytest.raises(ValueError):
+        next(events)
+
+
+# ===== Parcours en flux comparé au chargement complet =====
+
+ODD_NAMES = [
+    'gui"llemets',
+    "anti\\slash\\",
+    "ligne\nsuivante\ttab",
+    "accentué ÉÈ ß",
+    "emoji 🏺⛏️",
+    "\\u00e9 littéral",
+    "x" * 70000,
+]
+
+
+def _fill(db, populate, monkeypatch) -> int:
+    #Joueurs, ventes, noms à échappements, changements après compaction (journal) et joueurs
+    #archivés. Retourne le nombre d'archivés.
+    populate(db, players=30)
+    for index, name in enumerate(ODD_NAMES):
+        archaeologist = db.create_archaeologist(f"odd{index}", name)
+        db.add_finds(archaeologist, [("Clé \"ancienne\"", "rare", "Porte \\ nord", 12)])
+        db.save_archaeologist(archaeologist)
+    for backend in db._loaded() if isinstance(db, ShardedDatabaseManager) else [db]:
+        if isinstance(backend, DatabaseManager):
+            backend.compact(background=False)
+    # Après la compaction : changements qui ne vivent que dans le journal.
+    populate(db, players=40, seed=2)
+    db.sell_artifacts_by_rarity("5", "rare")
+    db.sell_single_artifact("odd1", "Clé \"ancienne\"")
+
+    now = time.time()
+    with monkeypatch.context() as patch:
+        patch.setattr(time, "time", lambda: now + 30 * 86400)
+        archived = db.archive_inactive(7)
+    db.get_archaeologist("3")  # ramené de l'archive
+    return archived
+
+
+def _expected(db, exports: list) -> tuple:
+    players = sorted(
+        (a.user_id, a.username, a.level, a.experience, a.coins, a.total_excavations,
+         len(a.artifacts) + sum(count for count, _ in a.stacks.values()))
+        for a in db.get_all_archaeologists()
+    )
+    artifacts = sorted(
+        (record["rarity"], record["value"], str(record["discovered_by"]))
+        for export in exports
+        for record in export["artifacts"].values()
+    )
+    rarities = {rarity: count for rarity, count in db.get_global_stats()["artifacts"].items() if count}
+    return players, artifacts, rarities
+
+
+def _streamed() -> tuple:
+    players = []
+    rarities = {}
+    for event in streaming.stream_database():
+        if event[0] == "archaeologist":
+            record = event[1]
+            players.append((
+                record["user_id"], record["username"], record["level"], record["experience"],
+                record["coins"], record["total_excavations"], event[2],
+            ))
+        elif event[2]:
+            rarities[event[1]] = rarities.get(event[1], 0) + event[2]
+    columns = streaming.read_database_artifact_columns()
+    artifacts = sorted(zip(
+        (columns["rarities"][code] for code in columns["rarity"]),
+        columns["value"],
+        (columns["owners"][code] for code in columns["owner"]),
+    ))
+    return sorted(players), artifacts, rarities
+
+
+@pytest.mark.parametrize("inventory_mode", ["items", "stacks"])
+@pytest.mark.parametrize("database_type, database_format, compression", [
+    ("json", "json", "none"),
+    ("json", "json-compact", "none"),
+    ("json", "msgpack", "none"),
+    ("json", "json", "gzip"),
+    ("json", "msgpack", "gzip"),
+    ("journal", "json", "none"),
+    ("journal", "msgpack", "gzip"),
+])
+def test_stream_database_matches_database_manager(
+    tmp_path, monkeypatch, populate, inventory_mode, database_type, database_format, compression
+):
+    path = str(tmp_path / "database.json")
+    journal_path = str(tmp_path / "database.journal") if database_type == "journal" else None
+    db = DatabaseManager(
+        path,
+        journal_path=journal_path,
+        serializer=get_serializer(database_format, compression),
+        inventory_mode=inventory_mode,
+    )
+    assert _fill(db, populate, monkeypatch) > 0
+    expected = _expected(db, [db.export_data()])
+    db.close()
+    if journal_path:
+        assert os.path.getsize(journal_path) > 0
+
+    monkeypatch.setattr(config, "DATABASE_SHARDS", 0)
+    monkeypatch.setattr(config, "DATABASE_TYPE", database_type)
+    monkeypatch.setattr(config, "DATABASE_PATH", path)
+    monkeypatch.setattr(config, "JOURNAL_PATH", str(tmp_path / "database.journal"))
+    assert _streamed() == expected
+
+
+@pytest.mark.parametrize("kind", ["json", "journal", "sqlite"])
+def test_stream_database_merges_shards(tmp_path, monkeypatch, populate, kind):
+    directory = str(tmp_path / "shards")
+    db = ShardedDatabaseManager(directory, 3, kind, False)
+    assert (_fill(db, populate, monkeypatch) > 0) == (kind != "sqlite")
+    expected = _expected(db, [shard.export_data() for shard in db._loaded()])
+    db.close()
+
+    monkeypatch.setattr(config, "DATABASE_SHARDS", 3)
+    monkeypatch.setattr(config, "SHARDS_DIR", directory)
+    assert _streamed() == expected
+
+
+# ===== Analyseur JSON incrémental =====
+
+TRICKY = {
+    "chaînes": ['a"b', "c\\d", "\\", "\"", "éé🏺", "/\b\f\n\r\t", "\\u0041", ""],
+    "imbriqués": {"a": [[], {}, [[{"b": [1, [2, [3]]]}]]], "c": {"d": {"e": None}}},
+    "nombres": [0, -1, 1.5, -2.25e-3, 12345678901234567890, 1e300, True, False, None],
+    "clé \"échappée\"\\": "valeur",
+    "piège": '\\"}]{[ "',
+    "dernier": 1234567,
+}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 7, 64])
+@pytest.mark.parametrize("indent", [None, 1])
+def test_json_stream_decodes_values_across_chunk_boundaries(chunk_size, indent):
+    text = json.dumps(TRICKY, indent=indent, ensure_ascii=indent is None)
+    stream = streaming.JsonStream(io.StringIO(text), chunk_size)
+    assert {key: stream.value() for key in stream.items()} == TRICKY
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 7, 64])
+def test_json_stream_skips_values_across_chunk_boundaries(chunk_size):
+    text = json.dumps(TRICKY, indent=1, ensure_ascii=False)
+    stream = streaming.JsonStream(io.StringIO(text), chunk_size)
+    seen = {}
+    for key in stream.items():
+        if key == "dernier":
+            seen[key] = stream.value()
+        else:
+            stream.skip()
+    assert seen == {"dernier": 1234567}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 5, 64])
+def test_json_stream_decodes_base64_columns_in_pieces(chunk_size):
+    payload = bytes(range(256)) * 5
+    text = json.dumps({"colonne": base64.b64encode(payload).decode("ascii")})
+    stream = streaming.JsonStream(io.StringIO(text), chunk_size)
+    for _ in stream.items():
+        assert b"".join(stream.bytes_chunks()) == payload
+
+
+@pytest.mark.parametrize("text", ['{"a": [1, 2', '{"a": "non terminée', '{"a": 1,'])
+def test_json_stream_rejects_truncated_text(text):
+    stream = streaming.JsonStream(io.StringIO(text), 2)
+    with pytest.raises(ValueError):
+        for _ in stream.items():
+            stream.skip()
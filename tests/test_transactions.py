@@ -0,0 +1,38 @@
+import pytest
+
+
+def _state(db, user_id):
+    archaeologist = db.get_archaeologist(user_id)
+    return (
+        archaeologist.coins,
+        archaeologist.level,
+        sorted(archaeologist.artifacts),
+        {rarity: sorted(a.artifact_id for a in items)
+         for rarity, items in db.get_archaeologist_artifacts_by_rarity(user_id).items()},
+        db.get_rank(user_id),
+        db.get_leaderboard(20),
+        db.get_global_stats(),
+    )
+
+
+def test_rollback_restores_coins_indexes_and_rank(backend, open_backend, populate):
+    populate(backend, players=8)
+    user_id = "7"
+    before = _state(backend, user_id)
+    assert before[4] > 1
+
+    with pytest.raises(RuntimeError):
+        with backend.transaction("excavate"):
+            archaeologist = backend.get_archaeologist(user_id)
+            backend.add_finds(archaeologist, [("Couronne", "legendary", "Trésor", 5000)])
+            archaeologist.add_experience(100000)
+            archaeologist.coins += 100000
+            backend.save_archaeologist(archaeologist)
+            assert backend.get_rank(user_id) == 1
+            raise RuntimeError("fouille interrompue")
+
+    assert _state(backend, user_id) == before
+    assert backend.sell_single_artifact(user_id, "Couronne")[1] is None
+    assert backend.verify_counters() == {}
+
+    assert _state(open_backend(), user_id) == before
@@ -6,9 +6,11 @@ from .helpers import (
     get_rarity_color,
     get_rarity_emoji,
     generate_excavation_reward,
+    generate_excavation_rewards,
     format_duration,
     create_embed,
 )
+from .loot import get_loot_engine, reload_loot_tables
 
 __all__ = [
     "get_random_artifact_name",
@@ -16,6 +18,9 @@ __all__ = [
     "get_rarity_color",
     "get_rarity_emoji",
     "generate_excavation_reward",
+    "generate_excavation_rewards",
     "format_duration",
     "create_embed",
+    "get_loot_engine",
+    "reload_loot_tables",
 ]
@@ -4,26 +4,17 @@ import random
 import discord
 from datetime import timedelta
 import config
+from .loot import get_loot_engine
 
 
 def get_random_artifact_name() -> str:
     #Génère un nom d'artefact aléatoire.
-    prefixes = ["Ancient", "Mystical", "Golden", "Sacred", "Lost", "Hidden"]
-    items = ["Amulet", "Scroll", "Sword", "Crown", "Chalice", "Tome", "Statue"]
-    return f"{random.choice(prefixes)} {random.choice(items)}"
+    return f"{random.choice(config.ARTIFACT_PREFIXES)} {random.choice(config.ARTIFACT_ITEMS)}"
 
 
 def get_random_artifact_description() -> str:
     #Génère une description d'artefact aléatoire.
-    descriptions = [
-        "Un objet énigmatique aux origines perdues.",
-        "Gravé avec des symboles anciens indéchiffrés.",
-        "Dégageant une aura mystérieuse.",
-        "Rarissime et d'une grande valeur historique.",
-        "Porteur de secrets d'une civilisation oubliée.",
-        "D'une beauté et d'une finesse exceptionnelles.",
-    ]
-    return random.choice(descriptions)
+    return random.choice(config.ARTIFACT_DESCRIPTIONS)
 
 
 def get_rarity_color(rarity: str) -> discord.Color:
@@ -50,38 +41,14 @@ def get_rarity_emoji(rarity: str) -> str:
     return emojis.get(rarity, "❓")
 
 
+def generate_excavation_rewards(pickaxe: str = "basic", count: int = 1) -> list[tuple[int, str]]:
+    #Génère les récompenses de count fouilles selon la table de butin de la pioche.
+    return get_loot_engine().sample(pickaxe, count)
+
+
 def generate_excavation_reward(pickaxe: str = "basic") -> tuple[int, str]:
     #Génère une récompense aléatoire pour une fouille selon la pioche.
-    legendary_chance = config.PICKAXES.get(pickaxe, {}).get("legendary_chance", 0)
-    
-    # Si pioche basic, pas de légendaire
-    if pickaxe == "basic":
-        weights = [50, 25, 15, 10, 0]
-    else:
-        # Réduit les autres raretés pour augmenter les chances supérieures
-        base_weights = [50, 25, 15, 7, 3]
-        legendary_weight = legendary_chance
-        common_weight = max(0, base_weights[0] - (legendary_weight - 3))
-        weights = [common_weight, base_weights[1], base_weights[2], base_weights[3], legendary_weight]
-    
-    rarity = random.choices(
-        config.RARITY_LEVELS,
-        weights=weights,
-        k=1
-    )[0]
-    
-    reward_multiplier = {
-        "common": 50,
-        "uncommon": 150,
-        "rare": 300,
-        "epic": 500,
-        "legendary": 1000,
-    }
-    
-    base_reward = reward_multiplier[rarity]
-    coins = random.randint(int(base_reward * 0.8), int(base_reward * 1.2))
-    
-    return coins, rarity
+    return generate_excavation_rewards(pickaxe, 1)[0]
 
 
 def format_duration(minutes: int) -> str:
@@ -0,0 +1,136 @@
+#Tables de butin compilées : tirage des raretés par la méthode des alias (O(1)).
+
+import json
+import random
+import threading
+from typing import Optional
+
+import config
+
+
+class AliasTable:
+    #Distribution discrète compilée (méthode des alias de Vose) : chaque tirage coûte un
+    #nombre aléatoire et une comparaison, quel que soit le nombre d'issues.
+
+    __slots__ = ("probabilities", "aliases")
+
+    def __init__(self, weights: list):
+        total = sum(weights)
+        if total <= 0 or any(weight < 0 for weight in weights):
+            raise ValueError(f"Poids invalides: {weights}")
+
+        count = len(weights)
+        scaled = [weight * count / total for weight in weights]
+        self.probabilities = [1.0] * count
+        self.aliases = list(range(count))
+
+        small = [index for index, p in enumerate(scaled) if p < 1.0]
+        large = [index for index, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            lower, upper = small.pop(), large.pop()
+            self.probabilities[lower] = scaled[lower]
+            self.aliases[lower] = upper
+            scaled[upper] -= 1.0 - scaled[lower]
+            (small if scaled[upper] < 1.0 else large).append(upper)
+        # Les restes valent 1 aux erreurs d'arrondi près : ils gardent probabilité 1.
+
+    def draw(self, rng: random.Random) -> int:
+        #Tire l'indice d'une issue.
+        u = rng.random() * len(self.probabilities)
+        index = int(u)
+        return index if u - index < self.probabilities[index] else self.aliases[index]
+
+
+class LootTable:
+    #Butin d'une pioche : distribution des raretés et fourchette de récompense par rareté.
+
+    def __init__(self, pickaxe: str, weights: dict, rewards: dict):
+        unknown = set(weights) - set(config.RARITY_LEVELS)
+        if unknown:
+            raise ValueError(f"Raretés inconnues pour la pioche {pickaxe}: {sorted(unknown)}")
+
+        self.pickaxe = pickaxe
+        self.rarities = [rarity for rarity in config.RARITY_LEVELS if weights.get(rarity, 0) > 0]
+        self.weights = [weights[rarity] for rarity in self.rarities]
+        self.alias = AliasTable(self.weights)
+        # (minimum, nombre de valeurs possibles) par rareté tirable
+        self.rewards = []
+        for rarity in self.rarities:
+            low, high = rewards[rarity]
+            self.rewards.append((int(low), int(high) - int(low) + 1))
+
+    def probability(self, rarity: str) -> float:
+        #Probabilité de tirer une rareté.
+        if rarity not in self.rarities:
+            return 0.0
+        return self.weights[self.rarities.index(rarity)] / sum(self.weights)
+
+    def sample(self, rng: random.Random, count: int = 1) -> list[tuple[int, str]]:
+        #Tire count récompenses : [(coins, rareté), ...].
+        draw, random_value = self.alias.draw, rng.random
+        rarities, rewards = self.rarities, self.rewards
+        results = []
+        for _ in range(count):
+            index = draw(rng)
+            low, span = rewards[index]
+            results.append((low + int(random_value() * span), rarities[index]))
+        return results
+
+
+class LootEngine:
+    #Ensemble des tables de butin, compilées depuis un fichier JSON au chargement
+    #(puis à chaque reload). Le générateur aléatoire peut être initialisé avec une graine
+    #pour obtenir des tirages reproductibles.
+
+    def __init__(self, path: str = config.LOOT_TABLES_PATH, seed: Optional[int] = config.LOOT_SEED):
+        self.path = path
+        self.rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.tables: dict[str, LootTable] = {}
+        self.reload()
+
+    def reload(self):
+        #Relit le fichier et recompile toutes les tables (remplacées d'un coup).
+        with open(self.path, "r", encoding="utf-8") as f:
+            definition = json.load(f)
+
+        default_rewards = definition.get("rewards", {})
+        tables = {
+            pickaxe: LootTable(pickaxe, table["weights"], {**default_rewards, **table.get("rewards", {})})
+            for pickaxe, table in definition["pickaxes"].items()
+        }
+        missing = set(config.PICKAXES) - set(tables)
+        if missing:
+            raise ValueError(f"Tables de butin manquantes pour: {sorted(missing)}")
+        self.tables = tables
+
+    def seed(self, seed: Optional[int]):
+        #Réinitialise le générateur aléatoire.
+        self.rng.seed(seed)
+
+    def table(self, pickaxe: str) -> LootTable:
+        #Table d'une pioche (celle de la pioche de base si elle est inconnue).
+        return self.tables.get(pickaxe) or self.tables["basic"]
+
+    def sample(self, pickaxe: str = "basic", count: int = 1) -> list[tuple[int, str]]:
+        #Tire count récompenses avec la pioche donnée.
+        with self._lock:
+            return self.table(pickaxe).sample(self.rng, count)
+
+
+_shared_engine: Optional[LootEngine] = None
+_shared_engine_lock = threading.Lock()
+
+
+def get_loot_engine() -> LootEngine:
+    #Retourne le moteur de butin partagé (tables compilées au premier appel).
+    global _shared_engine
+    with _shared_engine_lock:
+        if _shared_engine is None:
+            _shared_engine = LootEngine()
+        return _shared_engine
+
+
+def reload_loot_tables():
+    #Recompile les tables de butin après modification du fichier.
+    get_loot_engine().reload()